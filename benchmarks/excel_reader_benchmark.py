@@ -0,0 +1,72 @@
+"""Benchmark of the reading of the monitoring excel files.
+
+Compare, for workbooks of increasing size, the time spent in read_excel_file with the baseline reader, which loaded
+the whole workbook to list its sheets and then read each group sheet with pd.read_excel before normalizing it animal
+per animal. The workbooks are generated with the layout used by the tests and both readers must return the same data.
+
+Usage:
+    python benchmarks/excel_reader_benchmark.py [--sheets 1 5 15] [--animals 40] [--days 30] [--max-baseline-sheets 15]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+# The workbooks are generated and the baseline reader is taken from the tests
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests'))
+
+from baseline_reader import read_excel_file_baseline  # noqa: E402
+from conftest import make_workbook  # noqa: E402
+
+from mousetracker.kernel.readers.excel_reader import read_excel_file  # noqa: E402
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Benchmark read_excel_file against the baseline reader')
+    parser.add_argument('--sheets', nargs='+', type=int, default=[1, 5, 15], help='the numbers of group sheets')
+    parser.add_argument('--animals', type=int, default=40, help='the number of animals per group sheet')
+    parser.add_argument('--days', type=int, default=30, help='the number of days')
+    parser.add_argument('--max-baseline-sheets', type=int, default=15, help='the largest number of sheets read with the baseline reader')
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    warnings.simplefilter('ignore', FutureWarning)
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        print('{:>8} {:>8} {:>12} {:>12} {:>8}'.format('sheets', 'rows', 'baseline (s)', 'current (s)', 'speedup'))
+        for n_sheets in args.sheets:
+
+            excel_file = os.path.join(directory, 'workbook_{}.xlsx'.format(n_sheets))
+            make_workbook(excel_file, n_sheets=n_sheets, n_animals=args.animals, n_days=args.days)
+
+            start = time.perf_counter()
+            data_frame, metadata = read_excel_file(excel_file)
+            new_time = time.perf_counter() - start
+
+            n_rows = len(data_frame.index)
+
+            if n_sheets > args.max_baseline_sheets:
+                print('{:>8} {:>8} {:>12} {:>12.3f} {:>8}'.format(n_sheets, n_rows, '-', new_time, '-'))
+                continue
+
+            start = time.perf_counter()
+            old_data_frame, old_metadata = read_excel_file_baseline(excel_file)
+            old_time = time.perf_counter() - start
+
+            pd.testing.assert_frame_equal(data_frame, old_data_frame)
+            for key, value in old_metadata.items():
+                assert metadata[key] == value, key
+
+            print('{:>8} {:>8} {:>12.3f} {:>12.3f} {:>7.1f}x'.format(n_sheets, n_rows, old_time, new_time, old_time/new_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark of the assembly of the inputs of the student tests.
+
+Compare, for an increasing number of animals per group, the time spent in get_student_tests with the former assembly
+of the (group, value) long-format data frame which appended each value to it with pd.concat.
+
+Usage:
+    python benchmarks/student_tests_benchmark.py [--animals 5 10 20 40 80] [--max-old-animals 80]
+"""
+
+import argparse
+import collections
+import logging
+import time
+import warnings
+
+import numpy as np
+
+import pandas as pd
+
+import scikit_posthocs as sk
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.statistics.group_statistics import get_student_tests
+
+
+def build_group_index(n_animals_per_group, n_groups=4, n_days=10, zones='ABCDE', seed=0):
+    """Build a group index over random data.
+
+    Args:
+        n_animals_per_group (int): the number of animals per group
+        n_groups (int): the number of groups
+        n_days (int): the number of days
+        zones (str): the zones
+        seed (int): the seed of the random generator
+
+    Returns:
+        mousetracker.kernel.data.group_index.GroupIndex: the group index
+    """
+
+    rng = np.random.default_rng(seed)
+
+    n_animals = n_animals_per_group*n_groups
+
+    values = rng.normal(20.0, 3.0, size=(n_animals, len(zones), n_days, 1))
+
+    animals = ['{}'.format(i) for i in range(n_animals)]
+    days = ['J{}'.format(i) for i in range(n_days)]
+
+    cube = MonitoringCube(values, animals, list(zones), days, ['Temp'], 'Souris')
+
+    groups = [('group {}'.format(i), animals[i::n_groups], True) for i in range(n_groups)]
+
+    return GroupIndex(cube, groups)
+
+
+def concat_student_tests(group_index, selected_property, zones):
+    """The former implementation of get_student_tests which appended each value to the input data frame.
+
+    Args:
+        group_index (mousetracker.kernel.data.group_index.GroupIndex): the data and the groups
+        selected_property (str): the selected property
+        zones (list of tuples): the zones for which the student tests should be computed
+
+    Returns:
+        collections.OrderedDict: the p values matrix per zone and per day
+    """
+
+    student_tests = collections.OrderedDict()
+
+    for zone in zones:
+
+        name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+
+        student_tests[name] = collections.OrderedDict()
+
+        values_per_group = [(group_name, group_index.sample(i, selected_property, zone))
+                            for i, (group_name, _, _) in enumerate(group_index.groups)]
+
+        for iday, day in enumerate(group_index.cube.days):
+
+            value_per_group = pd.DataFrame(columns=['groups', 'values'])
+
+            for group_name, values in values_per_group:
+                for v in values[:, iday]:
+                    value_per_group = pd.concat([value_per_group, pd.DataFrame([[group_name, v]], columns=['groups', 'values'])])
+
+            student_tests[name][day] = sk.posthoc_ttest(value_per_group, val_col='values', group_col='groups', p_adjust='holm')
+
+    return student_tests
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Benchmark the student tests against the former pd.concat assembly')
+    parser.add_argument('--animals', nargs='+', type=int, default=[5, 10, 20, 40, 80], help='the numbers of animals per group')
+    parser.add_argument('--max-old-animals', type=int, default=80, help='the largest number of animals per group run with the former assembly')
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    warnings.simplefilter('ignore', FutureWarning)
+
+    zones = [('A', 'B', 'C', 'D'), ('A', 'B'), ('C', 'D'), ('E',)]
+
+    print('{:>8} {:>10} {:>10} {:>8}'.format('animals', 'concat (s)', 'current (s)', 'speedup'))
+    for n_animals_per_group in args.animals:
+
+        group_index = build_group_index(n_animals_per_group)
+
+        start = time.perf_counter()
+        student_tests = get_student_tests(group_index, 'Temp', zones)
+        new_time = time.perf_counter() - start
+
+        if n_animals_per_group > args.max_old_animals:
+            print('{:>8} {:>10} {:>10.3f} {:>8}'.format(n_animals_per_group, '-', new_time, '-'))
+            continue
+
+        start = time.perf_counter()
+        old_student_tests = concat_student_tests(group_index, 'Temp', zones)
+        old_time = time.perf_counter() - start
+
+        for name, p_values in old_student_tests.items():
+            for day, df in p_values.items():
+                pd.testing.assert_frame_equal(df, student_tests[name][day], check_dtype=False, check_names=False)
+
+        print('{:>8} {:>10.3f} {:>10.3f} {:>7.1f}x'.format(n_animals_per_group, old_time, new_time, old_time/new_time))
+
+
+if __name__ == '__main__':
+    main()
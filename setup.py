@@ -9,7 +9,7 @@ exec(open("src/mousetracker/__pkginfo__.py").read(), {}, package_info)
 with open('requirements.txt', 'r') as fin:
     install_requires = fin.readlines()
 
-scripts = glob.glob(os.path.join('scripts', 'mousetracker'))
+scripts = glob.glob(os.path.join('scripts', 'mousetracker*'))
 
 setup(name="mousetracker",
       version=package_info["__version__"],
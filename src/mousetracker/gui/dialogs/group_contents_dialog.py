@@ -5,7 +5,7 @@ from mousetracker.kernel.models.pandas_data_model import PandasDataModel
 
 class GroupContentsDialog(QtWidgets.QDialog):
 
-    def __init__(self, data_frame, selected_mice, selected_property, main_window, *args, **kwargs):
+    def __init__(self, cube, selected_mice, selected_property, main_window, *args, **kwargs):
 
         super(GroupContentsDialog, self).__init__(main_window, *args, **kwargs)
 
@@ -13,15 +13,12 @@ class GroupContentsDialog(QtWidgets.QDialog):
 
         self._selected_property = selected_property
 
-        animal = data_frame.animal
+        # Slice the cube for the selected mice and property
+        data_frame, metadata = cube.to_data_frame(animals=self._selected_mice, properties=[self._selected_property])
 
-        # Keep only the selected mice
-        fylter = data_frame[animal].isin(self._selected_mice)
+        selected_columns = [cube.animal] + list(data_frame.columns[metadata['n_header_properties']:])
 
-        # Build the column names corresponding to the selected property
-        selected_columns = [animal] + ['{}-{}'.format(day, self._selected_property) for day in data_frame.days]
-
-        self._data_frame = data_frame[fylter][selected_columns]
+        self._data_frame = data_frame[selected_columns]
 
         self._main_window = main_window
 
@@ -42,8 +42,14 @@ class PlotDialog(QtWidgets.QDialog):
         self._build_widgets()
         self._build_layout()
 
-    def set_data(self, selected_property, data):
-        """
+    def set_data(self, selected_property, data, confidence_intervals=None):
+        """Plot the averages of each group and zone over the days.
+
+        Args:
+            selected_property (str): the selected property
+            data (collections.OrderedDict): the averages per group
+            confidence_intervals (dict): the lower and upper bounds of the averages per group. If given, they are drawn
+                as bands around the averages.
         """
 
         self._axes.clear()
@@ -52,10 +58,16 @@ class PlotDialog(QtWidgets.QDialog):
 
         for group_name, dataframe in data.items():
             for index in dataframe.index:
-                self._axes.plot(dataframe.loc[index], linestyle='-', marker='^', label='{} - {}'.format(group_name, index))
+                lines = self._axes.plot(dataframe.loc[index], linestyle='-', marker='^', label='{} - {}'.format(group_name, index))
+                if confidence_intervals is not None and group_name in confidence_intervals['lower']:
+                    self._axes.fill_between(dataframe.columns,
+                                            confidence_intervals['lower'][group_name].loc[index],
+                                            confidence_intervals['upper'][group_name].loc[index],
+                                            color=lines[0].get_color(),
+                                            alpha=0.2)
 
         for tick in self._axes.xaxis.get_major_ticks():
-            tick.label.set_fontsize(8)
+            tick.label1.set_fontsize(8)
 
         self._axes.legend()
         self._canvas.draw()
@@ -2,15 +2,16 @@
     - MainWindow
 """
 
+import collections
+import concurrent.futures
 import copy
+import functools
 import logging
 import os
 import sys
 
 import yaml
 
-from openpyxl import load_workbook
-
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 import mousetracker
@@ -18,10 +19,23 @@ from mousetracker.__pkginfo__ import __version__
 from mousetracker.gui.widgets.groups_widget import GroupsWidget
 from mousetracker.gui.widgets.logger_widget import QTextEditLogger
 from mousetracker.gui.widgets.statistics_widget import StatisticsWidget
+from mousetracker.kernel.data.group_index import GroupIndex
 from mousetracker.kernel.models.excel_files_model import ExcelFilesModel, ExcelFileModelError
 from mousetracker.kernel.models.groups_model import GroupsModel
 from mousetracker.kernel.models.mouse_monitoring_model import MouseMonitoringModel
+from mousetracker.kernel.readers.excel_reader import ExcelReaderError, read_excel_file_metadata
+from mousetracker.kernel.readers.workbook_cache import workbook_cache
+from mousetracker.kernel.statistics.group_statistics import get_confidence_intervals_batch, get_statistics_batch, get_student_tests
+from mousetracker.kernel.statistics.statistics_cache import statistics_cache
+from mousetracker.kernel.utils.job_runner import JobRunner
 from mousetracker.kernel.utils.progress_bar import progress_bar
+from mousetracker.kernel.writers.columnar_writer import export_columnar_bundle
+from mousetracker.kernel.writers.excel_writer import export_excel_file
+
+
+class _ExportCancelledError(Exception):
+    """Exception raised for interrupting the writing of a cancelled export.
+    """
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -43,6 +57,29 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self._init_ui()
 
+    def _add_read_excel_file(self, index):
+        """Add an excel file read by the import job to the excel files model.
+
+        Args:
+            index (int): the index of the file in the import
+        """
+
+        result = self._import['results'].pop(index)
+        self._import['next'] = max(self._import['next'], index + 1)
+
+        if isinstance(result, Exception):
+            logging.error(str(result))
+            return
+
+        excel_file = self._import['excel_files'][index]
+        excel_files_model = self._excel_files_listview.model()
+        if self._import['lazy']:
+            excel_files_model.add_metadata(excel_file, result)
+        else:
+            excel_files_model.add_data_frame(excel_file, *result)
+
+        self._import['n_loaded_files'] += 1
+
     def _build_events(self):
         """Build the signal/slots.
         """
@@ -51,6 +88,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.set_groups_model.connect(self._groups_widgets.on_set_groups_model)
         self.set_properties.connect(self._groups_widgets.on_set_properties)
         self._groups_widgets.compute_statistics.connect(self.on_build_statistics_widget)
+        self._cancel_job_button.clicked.connect(self.on_cancel_job)
         self._tabs.tabCloseRequested.connect(lambda index: self._tabs.removeTab(index))
 
     def _build_layout(self):
@@ -79,11 +117,40 @@ class MainWindow(QtWidgets.QMainWindow):
 
         file_menu = menubar.addMenu('&File')
 
-        file_action = QtWidgets.QAction('&Open mousetracker files', self)
-        file_action.setShortcut('Ctrl+O')
-        file_action.setStatusTip('Open mousetracker files')
-        file_action.triggered.connect(self.on_open_mousetracker_files)
-        file_menu.addAction(file_action)
+        self._open_files_action = QtWidgets.QAction('&Open mousetracker files', self)
+        self._open_files_action.setShortcut('Ctrl+O')
+        self._open_files_action.setStatusTip('Open mousetracker files')
+        self._open_files_action.triggered.connect(self.on_open_mousetracker_files)
+        file_menu.addAction(self._open_files_action)
+
+        reimport_action = QtWidgets.QAction('&Reimport selected file', self)
+        reimport_action.setShortcut('Ctrl+R')
+        reimport_action.setStatusTip('Read again the changes made to the selected file since it was opened')
+        reimport_action.triggered.connect(self.on_reimport_excel_file)
+        file_menu.addAction(reimport_action)
+
+        self._parallel_import_action = QtWidgets.QAction('&Parallel import', self)
+        self._parallel_import_action.setCheckable(True)
+        self._parallel_import_action.setChecked(True)
+        self._parallel_import_action.setStatusTip('Read the selected files in parallel')
+        file_menu.addAction(self._parallel_import_action)
+
+        self._lazy_import_action = QtWidgets.QAction('&Lazy import', self)
+        self._lazy_import_action.setCheckable(True)
+        self._lazy_import_action.setChecked(False)
+        self._lazy_import_action.setStatusTip('Read only the headers of the selected files. The data of a file is read when it is first needed')
+        file_menu.addAction(self._lazy_import_action)
+
+        clear_cache_action = QtWidgets.QAction('&Clear workbook cache', self)
+        clear_cache_action.setStatusTip('Remove the workbooks stored in the cache')
+        clear_cache_action.triggered.connect(self.on_clear_workbook_cache)
+        file_menu.addAction(clear_cache_action)
+
+        export_columnar_bundle_action = QtWidgets.QAction('Export &columnar bundle', self)
+        export_columnar_bundle_action.setStatusTip('Export the data, the groups, the statistics and the student tests of the selected file as '
+                                                   'columnar files')
+        export_columnar_bundle_action.triggered.connect(self.on_export_columnar_bundle)
+        file_menu.addAction(export_columnar_bundle_action)
 
         file_menu.addSeparator()
 
@@ -151,11 +218,129 @@ class MainWindow(QtWidgets.QMainWindow):
         self.statusBar().addPermanentWidget(self._progress_label)
         self.statusBar().addPermanentWidget(self._progress_bar)
 
+        self._job = None
+        self._import = None
+        self._export = None
+        self._cancel_job_button = QtWidgets.QPushButton('Cancel')
+        self._cancel_job_button.setEnabled(False)
+        self.statusBar().addPermanentWidget(self._cancel_job_button)
+
         icon_path = os.path.join(mousetracker.__path__[0], 'icons', 'mousetracker.png')
         self.setWindowIcon(QtGui.QIcon(icon_path))
 
         self.show()
 
+    @staticmethod
+    def _compute_property_results(group_index, selected_property, statistics_zones, student_tests_zones, kinds):
+        """Compute some results of a property. It runs in a worker thread of the export job.
+
+        Args:
+            group_index (mousetracker.kernel.data.group_index.GroupIndex): the index of the groups
+            selected_property (str): the property
+            statistics_zones (list of tuples): the zones of the statistics and of the confidence intervals
+            student_tests_zones (list of tuples): the zones of the student tests
+            kinds (list of str): the kinds of results to compute
+
+        Returns:
+            dict: the results per kind
+        """
+
+        results = {}
+
+        if 'statistics' in kinds:
+            results['statistics'] = get_statistics_batch(group_index, [selected_property], statistics_zones)[selected_property]
+
+        if 'confidence intervals' in kinds:
+            results['confidence intervals'] = get_confidence_intervals_batch(group_index, [selected_property], statistics_zones)[selected_property]
+
+        if 'student tests' in kinds:
+            results['student tests'] = get_student_tests(group_index, selected_property, student_tests_zones)
+
+        return results
+
+    @staticmethod
+    def _export_results(runner, write, n_write_steps, cube, groups, selected_properties, cached_results, statistics_zones,
+                        student_tests_zones, n_workers=None):
+        """Job which computes the results of some properties and writes them. It runs in a background thread hence it
+        must not access the GUI.
+
+        The properties whose results are not all cached are computed in parallel by a pool of threads. The results are
+        written in the order of the properties once they have all been computed.
+
+        Args:
+            runner (mousetracker.kernel.utils.job_runner.JobRunner): the runner of the job
+            write (callable): the function which writes the statistics, the student tests and the confidence intervals
+            n_write_steps (int): the number of steps reported by the write function
+            cube (mousetracker.kernel.data.monitoring_cube.MonitoringCube): the data
+            groups (list of 3-tuples): the name, the animals and the selection state of each group
+            selected_properties (list of str): the properties to export
+            cached_results (dict): the results already computed per property
+            statistics_zones (list of tuples): the zones of the statistics and of the confidence intervals
+            student_tests_zones (list of tuples): the zones of the student tests
+            n_workers (int): the number of worker threads. If None, the default of concurrent.futures is used.
+        """
+
+        kinds = ['statistics', 'confidence intervals', 'student tests']
+
+        n_properties = len(selected_properties)
+
+        # One step per property and one per written part
+        n_steps = n_properties + n_write_steps
+
+        results = collections.OrderedDict([(prop, dict(cached_results[prop])) for prop in selected_properties])
+
+        missing_properties = [prop for prop in selected_properties if len(results[prop]) < len(kinds)]
+
+        n_done = n_properties - len(missing_properties)
+        runner.report_progress(n_done, n_steps)
+
+        if missing_properties:
+            # The job uses its own index such as the groups can be edited while it runs
+            group_index = GroupIndex(cube, groups)
+            # The zone statistics are built once before being shared by the workers
+            group_index.zone_statistics
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=n_workers) as executor:
+                futures = {}
+                for prop in missing_properties:
+                    missing_kinds = [kind for kind in kinds if kind not in results[prop]]
+                    future = executor.submit(MainWindow._compute_property_results,
+                                             group_index,
+                                             prop,
+                                             statistics_zones,
+                                             student_tests_zones,
+                                             missing_kinds)
+                    futures[future] = prop
+
+                for future in concurrent.futures.as_completed(futures):
+                    prop = futures[future]
+                    computed_results = future.result()
+                    results[prop].update(computed_results)
+                    runner.send_result((prop, computed_results))
+                    n_done += 1
+                    runner.report_progress(n_done, n_steps)
+                    if runner.is_cancelled():
+                        for f in futures:
+                            f.cancel()
+                        return
+
+        def report_write_progress(step):
+            # The write is interrupted at its next step. The files are complete only once the last step is done.
+            if runner.is_cancelled() and step < n_write_steps:
+                raise _ExportCancelledError()
+            runner.report_progress(n_properties + step, n_steps)
+
+        try:
+            report_write_progress(0)
+            write(collections.OrderedDict([(prop, results[prop]['statistics']) for prop in selected_properties]),
+                  collections.OrderedDict([(prop, results[prop]['student tests']) for prop in selected_properties]),
+                  collections.OrderedDict([(prop, results[prop]['confidence intervals']) for prop in selected_properties]),
+                  callback=report_write_progress)
+        except _ExportCancelledError:
+            return
+
+        runner.send_result((None, None))
+
     def _init_ui(self):
         """Initializes the ui.
         """
@@ -168,6 +353,97 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self._build_events()
 
+    @staticmethod
+    def _read_excel_files(runner, excel_files, parallel, lazy):
+        """Job which reads excel files. It runs in a background thread hence it must not access the GUI.
+
+        Args:
+            runner (mousetracker.kernel.utils.job_runner.JobRunner): the runner of the job
+            excel_files (list of str): the excel files to read
+            parallel (bool): whether the files should be read in parallel
+            lazy (bool): whether only the metadata of the files should be read
+        """
+
+        n_excel_files = len(excel_files)
+
+        # The progress is computed sheet-wise
+        fractions = [0.0]*n_excel_files
+
+        def report_progress(index, sheet, n_sheets):
+            fractions[index] = sheet/n_sheets
+            runner.report_progress(int(100*sum(fractions)), 100*n_excel_files)
+
+        # Reading the headers is fast enough for not being worth a pool of processes
+        if lazy:
+            for index, excel_file in enumerate(excel_files):
+                if runner.is_cancelled():
+                    break
+                try:
+                    result = read_excel_file_metadata(excel_file)
+                except ExcelReaderError as error:
+                    result = error
+                report_progress(index, 1, 1)
+                runner.send_result((index, result))
+            return
+
+        for index, result in workbook_cache.read_excel_files(excel_files, parallel=parallel, callback=report_progress):
+            report_progress(index, 1, 1)
+            runner.send_result((index, result))
+            if runner.is_cancelled():
+                break
+
+    def _run_export_job(self, write, n_write_steps, destination, selected_properties):
+        """Export the data, the groups, the statistics, the confidence intervals and the student tests of the current
+        excel file in a background job.
+
+        The results already computed are taken from the statistics cache and the ones computed by the job are stored in
+        it. The data frame is rebuilt from the cube and the groups are copied such as they can be edited while the job runs.
+
+        Args:
+            write (callable): the function which writes the data, the metadata, the groups, the statistics, the student
+                tests and the confidence intervals
+            n_write_steps (int): the number of steps reported by the write function
+            destination (str): the exported file or directory
+            selected_properties (list of str): the properties to export
+
+        Returns:
+            mousetracker.kernel.utils.job_runner.JobRunner: the runner of the job or None if it could not be started
+        """
+
+        index = self._excel_files_listview.currentIndex()
+        if not index.isValid():
+            logging.error('No excel file selected')
+            return None
+
+        excel_files_model = self._excel_files_listview.model()
+        dataframe = excel_files_model.data(index, ExcelFilesModel.data_frame)
+        metadata = copy.deepcopy(excel_files_model.data(index, ExcelFilesModel.metadata))
+
+        groups_model = self._groups_widgets.groups_listview.model()
+        groups = groups_model.contents
+
+        cached_results = {prop: groups_model.get_cached_results(prop) for prop in selected_properties}
+
+        runner = self.run_job(MainWindow._export_results,
+                              functools.partial(write, dataframe, metadata, groups),
+                              n_write_steps,
+                              groups_model.cube,
+                              groups,
+                              selected_properties,
+                              cached_results,
+                              groups_model.get_statistics_zones(),
+                              groups_model.get_student_tests_zones(),
+                              on_result=functools.partial(self.on_export_result, groups_model, groups_model.version),
+                              on_finished=self.on_export_finished)
+        if runner is None:
+            return None
+
+        self._export = {'destination': destination, 'written': False}
+
+        self.statusBar().showMessage('Exporting {} property(ies) to {} ...'.format(len(selected_properties), destination))
+
+        return runner
+
     @property
     def excel_files_listview(self):
 
@@ -185,6 +461,88 @@ class MainWindow(QtWidgets.QMainWindow):
         self._tabs.addTab(statistics_widget, 'Statistics')
         self._tabs.setTabsClosable(True)
 
+    def on_cancel_job(self):
+        """Event handler which cancels the running job.
+        """
+
+        if self._job is None:
+            return
+
+        self.statusBar().showMessage('Cancelling ...')
+        self._job.cancel()
+
+    def on_clear_workbook_cache(self):
+        """Event handler which removes all the workbooks stored in the cache.
+        """
+
+        workbook_cache.clear()
+        logging.info('Workbook cache cleared')
+
+    def on_excel_file_read(self, result):
+        """Event handler called each time the import job has read an excel file.
+
+        The files are added to the model in the order of the selection, such as the files already read can be browsed
+        while the others are still being read.
+
+        Args:
+            result (tuple): the index of the file and the data frame and its metadata or the exception raised while
+            reading the file
+        """
+
+        index, result = result
+
+        self._import['results'][index] = result
+        self._import['n_read_files'] += 1
+
+        while self._import['next'] in self._import['results']:
+            self._add_read_excel_file(self._import['next'])
+
+    def on_excel_files_read(self):
+        """Event handler called when the import job is finished.
+        """
+
+        # Add the files which are still waiting for a cancelled one
+        for index in sorted(self._import['results']):
+            self._add_read_excel_file(index)
+
+        n_cancelled_files = len(self._import['excel_files']) - self._import['n_read_files']
+        if n_cancelled_files > 0:
+            logging.info('Import cancelled: {} file(s) not read'.format(n_cancelled_files))
+
+        logging.info('Loaded successfully {} file(s) out of {}'.format(self._import['n_loaded_files'], self._import['n_selected_files']))
+
+        workbook_cache.log_statistics()
+
+    def on_export_columnar_bundle(self):
+        """Export all the properties of the selected file as a columnar bundle.
+        """
+
+        index = self._excel_files_listview.currentIndex()
+        if not index.isValid():
+            logging.error('No excel file selected')
+            return
+
+        directory = QtWidgets.QFileDialog.getSaveFileName(self, caption='Export columnar bundle as ...')
+        if not directory:
+            return
+
+        directory = directory[0]
+        if not directory:
+            return
+
+        metadata = self._excel_files_listview.model().data(index, ExcelFilesModel.metadata)
+
+        self.export_columnar_bundle(directory, list(metadata['properties']))
+
+    def on_export_finished(self):
+        """Event handler called when the export job is finished.
+        """
+
+        if not self._export['written']:
+            logging.warning('The export to {} has not been completed'.format(self._export['destination']))
+
+        statistics_cache.log_statistics()
+
     def on_export_groups(self):
         """Export groups.
         """
@@ -217,6 +575,26 @@ class MainWindow(QtWidgets.QMainWindow):
         with open(yaml_file, 'w') as f:
             yaml.dump(exportable_data, f)
 
+    def on_export_result(self, groups_model, version, result):
+        """Event handler called each time the export job has computed the results of a property and once the results
+        have been written.
+
+        Args:
+            groups_model (mousetracker.kernel.models.groups_model.GroupsModel): the model of the exported groups
+            version (int): the version of the groups when the export started
+            result (tuple): the property and its computed results per kind or (None, None) once the results have been
+                written
+        """
+
+        prop, results = result
+
+        if prop is None:
+            self._export['written'] = True
+            logging.info('Exported to {}'.format(self._export['destination']))
+            return
+
+        groups_model.put_cached_results(prop, results, version)
+
     def on_import_groups(self):
         """Import groups.
         """
@@ -239,7 +617,7 @@ class MainWindow(QtWidgets.QMainWindow):
             excel_file = group_dict['excel_file']
 
             try:
-                excel_files_model.add_excel_file(excel_file)
+                excel_files_model.add_excel_file(excel_file, lazy=self._lazy_import_action.isChecked())
             except ExcelFileModelError as e:
                 logging.error(str(e))
                 continue
@@ -255,40 +633,73 @@ class MainWindow(QtWidgets.QMainWindow):
                 for item in group_contents:
                     group_contents_model.add_item(item)
 
+        workbook_cache.log_statistics()
+
+    def on_job_finished(self):
+        """Event handler called when the running job is finished.
+        """
+
+        self._job = None
+        self._cancel_job_button.setEnabled(False)
+        self._open_files_action.setEnabled(True)
+        self.statusBar().showMessage('')
+
+    def on_job_progress(self, step, n_steps):
+        """Event handler which updates the progress bar with the progress of the running job.
+
+        Args:
+            step (int): the current step
+            n_steps (int): the total number of steps
+        """
+
+        progress_bar.reset(n_steps)
+        progress_bar.update(step)
+
     def on_open_mousetracker_files(self):
         """Event handler which opens a dialog for selecting data files.
         """
 
+        # The results of a running import would be mixed up with the ones of this import
+        if self._job is not None:
+            logging.warning('A job is already running. Wait for it to finish or cancel it.')
+            return
+
         # Pop up a file browser for selecting the workbooks
         excel_files = QtWidgets.QFileDialog.getOpenFileNames(self, 'Open data files', '', 'Data Files (*.xls *.xlsx)')[0]
         if not excel_files:
             return
 
-        n_excel_files = len(excel_files)
-        progress_bar.reset(n_excel_files)
-
-        n_loaded_files = 0
-
         excel_files_model = self._excel_files_listview.model()
 
-        # Loop over the pig directories
-        for progress, data_file in enumerate(excel_files):
-
-            # Read the pdf file and add the data to the model. Any kind of error must be caught here.
-            try:
-                self.statusBar().showMessage('Reading {} file ...'.format(data_file))
-                excel_files_model.add_excel_file(data_file)
+        # The files already loaded are not read again
+        new_excel_files = []
+        for excel_file in excel_files:
+            if excel_file in excel_files_model.excel_files:
+                logging.info('The file {} is already stored in the model'.format(excel_file))
+            else:
+                new_excel_files.append(excel_file)
 
-            except Exception as error:
-                logging.error(str(error))
+        lazy = self._lazy_import_action.isChecked()
 
-            else:
-                n_loaded_files += 1
+        runner = self.run_job(MainWindow._read_excel_files,
+                              new_excel_files,
+                              self._parallel_import_action.isChecked(),
+                              lazy,
+                              on_result=self.on_excel_file_read,
+                              on_finished=self.on_excel_files_read)
+        if runner is None:
+            return
 
-            progress_bar.update(progress+1)
+        # The results of the job are queued to the GUI thread, hence they are handled after this method returns
+        self._import = {'excel_files': new_excel_files,
+                        'n_selected_files': len(excel_files),
+                        'n_loaded_files': len(excel_files) - len(new_excel_files),
+                        'n_read_files': 0,
+                        'results': {},
+                        'next': 0,
+                        'lazy': lazy}
 
-        self.statusBar().showMessage('')
-        logging.info('Loaded successfully {} file(s) out of {}'.format(n_loaded_files, n_excel_files))
+        self.statusBar().showMessage('Reading {} file(s) ...'.format(len(new_excel_files)))
 
     def on_quit_application(self):
         """Event handler which quits the application.
@@ -296,8 +707,34 @@ class MainWindow(QtWidgets.QMainWindow):
 
         choice = QtWidgets.QMessageBox.question(self, 'Quit', "Do you really want to quit ?", QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if choice == QtWidgets.QMessageBox.Yes:
+            if self._job is not None:
+                self._job.cancel()
+                self._job.wait()
+            statistics_cache.log_statistics()
             sys.exit()
 
+    def on_reimport_excel_file(self):
+        """Event handler which reads again the changes made to the selected excel file.
+        """
+
+        index = self._excel_files_listview.currentIndex()
+        if not index.isValid():
+            logging.warning('No file selected')
+            return
+
+        excel_files_model = self._excel_files_listview.model()
+        excel_file = excel_files_model.data(index, QtCore.Qt.DisplayRole)
+
+        try:
+            days = excel_files_model.reimport_excel_file(excel_file)
+        except ExcelFileModelError as error:
+            logging.error(str(error))
+            return
+
+        if days:
+            # Refresh the contents of the file and the available animals
+            self.on_select_excel_file(self._excel_files_listview.selectionModel().selection())
+
     def on_select_excel_file(self, selection):
         """Event handler which displays the contents of an excel file.
         """
@@ -309,112 +746,98 @@ class MainWindow(QtWidgets.QMainWindow):
 
         excel_files_model = self._excel_files_listview.model()
 
+        # For a lazily imported file, this is where the data is actually read
         data_frame = excel_files_model.data(indexes[0], ExcelFilesModel.data_frame)
+        if data_frame is None:
+            return
+
         groups_model = excel_files_model.data(indexes[0], ExcelFilesModel.group_model)
+        metadata = excel_files_model.data(indexes[0], ExcelFilesModel.metadata)
 
         excel_file_contents_model = self._excel_file_contents_tableview.model()
-        excel_file_contents_model.set_data_frame(data_frame)
-
-        animal = data_frame.animal
-        n_zones = data_frame.n_zones
+        excel_file_contents_model.set_data_frame(data_frame, metadata)
 
-        animals = data_frame[animal][0::n_zones].to_list()
+        animals = data_frame[metadata['animal']][0::metadata['n_zones']].to_list()
 
         self.set_groups_model.emit(groups_model, animals)
 
-        properties = data_frame.properties
-        self.set_properties.emit(properties)
+        self.set_properties.emit(metadata['properties'])
 
-    def export(self, filename, selected_properties):
+    def run_job(self, job, *args, on_result=None, on_finished=None, **kwargs):
+        """Run a job in a background thread. Only one job can run at a time.
+
+        The progress of the job is displayed in the progress bar and the job can be cancelled from the status bar.
+
+        Args:
+            job (callable): the job. Its first argument is the runner of the job.
+            args (list): the positional arguments of the job
+            on_result (callable): the slot called with each result sent by the job
+            on_finished (callable): the slot called when the job is finished
+            kwargs (dict): the keyword arguments of the job
+
+        Returns:
+            mousetracker.kernel.utils.job_runner.JobRunner: the runner of the job or None if a job is already running
         """
+
+        if self._job is not None:
+            logging.warning('A job is already running. Wait for it to finish or cancel it.')
+            return None
+
+        self._job = JobRunner(job, *args, parent=self, **kwargs)
+        self._job.progress.connect(self.on_job_progress)
+        self._job.failed.connect(logging.error)
+        if on_result is not None:
+            self._job.result_ready.connect(on_result)
+        self._job.finished.connect(self.on_job_finished)
+        if on_finished is not None:
+            self._job.finished.connect(on_finished)
+
+        self._cancel_job_button.setEnabled(True)
+        self._open_files_action.setEnabled(False)
+
+        self._job.start()
+
+        return self._job
+
+    def export(self, filename, selected_properties):
+        """Export the data, the groups, the statistics, the confidence intervals and the student tests of the current
+        excel file. The export runs in a background job.
+
+        Args:
+            filename (str): the excel file
+            selected_properties (list of str): the properties to export
+
+        Returns:
+            mousetracker.kernel.utils.job_runner.JobRunner: the runner of the job or None if it could not be started
         """
 
         _, ext = os.path.splitext(filename)
 
         if ext != '.xlsx':
             logging.error('Invalid file extension. Must be .xlsx')
-            return
+            return None
 
-        # Export the current data to 'data' sheet
-        index = self._excel_files_listview.currentIndex()
-        excel_files_model = self._excel_files_listview.model()
-        dataframe = excel_files_model.data(index, ExcelFilesModel.data_frame)
-        dataframe.to_excel(filename, sheet_name='data', index=False)
+        def write(dataframe, metadata, groups, statistics, student_tests, confidence_intervals, callback):
+            export_excel_file(filename, dataframe, groups, statistics, student_tests, confidence_intervals, callback=callback)
 
-        workbook = load_workbook(filename=filename)
+        # The data sheet, the groups sheet, the sheets of each property and the saving of the file
+        n_write_steps = 3 + len(selected_properties)
 
-        groups_model = self._groups_widgets.groups_listview.model()
+        return self._run_export_job(write, n_write_steps, filename, selected_properties)
 
-        # Export the groups
-        groups_sheet = workbook.create_sheet('groups')
-        comp = 0
-        for group, model, selected in groups_model.groups:
-            if not selected:
-                continue
-            comp += 1
-            groups_sheet.cell(row=1, column=comp).value = group
-            for i in range(model.rowCount()):
-                index = model.index(i, 0)
-                mouse = model.data(index, QtCore.Qt.DisplayRole)
-                groups_sheet.cell(row=i+2, column=comp).value = mouse
-
-        # Export the statistics
-        for prop in selected_properties:
-            statistics_sheet = workbook.create_sheet('statistics {}'.format(prop))
-
-            all_zones = groups_model.get_statistics_zones()
-            statistics = groups_model.get_statistics(prop, all_zones)
-
-            comp = 1
-            statistics_sheet.cell(row=comp, column=1).value = 'selected property'
-            statistics_sheet.cell(row=comp, column=2).value = prop
-            for s in ['mean', 'std', 'n']:
-                comp += 1
-                statistics_sheet.cell(row=comp, column=1).value = s
-                for group, df in statistics[s].items():
-                    comp += 1
-                    statistics_sheet.cell(row=comp, column=1).value = group
-                    # Write the column of the dataframe
-                    comp += 1
-                    for i, c in enumerate(df.columns):
-                        statistics_sheet.cell(row=comp, column=i+2).value = c
-                    # Write the index and data of the dataframe
-                    for i in range(len(df.index)):
-                        comp += 1
-                        statistics_sheet.cell(row=comp, column=1).value = df.index[i]
-                        for j in range(len(df.columns)):
-                            statistics_sheet.cell(row=comp, column=j+2).value = df.iloc[i, j]
-                    comp += 1
-
-            # Export the student test to 'student test' sheet
-            student_test_sheet = workbook.create_sheet('student tests {}'.format(prop))
-            comp = 1
-            student_test_sheet.cell(row=comp, column=1).value = 'selected property'
-            student_test_sheet.cell(row=comp, column=2).value = prop
-
-            student_tests_zones = groups_model.get_student_tests_zones()
-            student_tests = groups_model.get_student_tests(prop, student_tests_zones)
-
-            for zone, df_dict in student_tests.items():
-                comp += 1
-                student_test_sheet.cell(row=comp, column=1).value = zone
-                for day, df in df_dict.items():
-                    comp += 1
-                    student_test_sheet.cell(row=comp, column=1).value = day
-                    # Write the column of the dataframe
-                    comp += 1
-                    for i, c in enumerate(df.columns):
-                        student_test_sheet.cell(row=comp, column=i+2).value = c
-                    # Write the index and data of the dataframe
-                    for i in range(len(df.index)):
-                        comp += 1
-                        student_test_sheet.cell(row=comp, column=1).value = df.index[i]
-                        for j in range(len(df.columns)):
-                            student_test_sheet.cell(row=comp, column=j+2).value = df.iloc[i, j]
-                    comp += 1
+    def export_columnar_bundle(self, directory, selected_properties):
+        """Export the data, the groups, the statistics, the confidence intervals and the student tests of the current
+        excel file to a directory of columnar files. The export runs in a background job.
 
-        try:
-            workbook.save(filename)
-        except PermissionError as error:
-            logging.error(str(error))
-            return
+        Args:
+            directory (str): the directory of the bundle
+            selected_properties (list of str): the properties to export
+
+        Returns:
+            mousetracker.kernel.utils.job_runner.JobRunner: the runner of the job or None if it could not be started
+        """
+
+        # The four tables and the manifest
+        n_write_steps = 5
+
+        return self._run_export_job(functools.partial(export_columnar_bundle, directory), n_write_steps, directory, selected_properties)
@@ -85,7 +85,7 @@ class GroupsWidget(QtWidgets.QWidget):
 
         self._groups_listview = GroupsListView()
         self._groups_listview.setSelectionMode(QtWidgets.QListView.SingleSelection)
-        self._groups_listview.setModel(GroupsModel(self))
+        self._groups_listview.setModel(GroupsModel(None, {}, None, self))
 
         self._samples_per_group_listview = DroppableListView(self._available_samples_listview.model(), self)
         self._samples_per_group_listview.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
@@ -166,7 +166,7 @@ class GroupsWidget(QtWidgets.QWidget):
 
         current_index = self._main_window.excel_files_listview.currentIndex()
         excel_files_model = self._main_window.excel_files_listview.model()
-        data_frame = excel_files_model.data(current_index, ExcelFilesModel.data_frame)
+        cube = excel_files_model.data(current_index, ExcelFilesModel.cube)
 
         selected_group_model = groups_model.data(index, GroupsModel.model)
 
@@ -174,7 +174,7 @@ class GroupsWidget(QtWidgets.QWidget):
 
         selected_property = self._selected_property_combobox.currentText()
 
-        dialog = GroupContentsDialog(data_frame, mice, selected_property, self._main_window)
+        dialog = GroupContentsDialog(cube, mice, selected_property, self._main_window)
         dialog.show()
 
     def on_clear(self):
@@ -194,7 +194,8 @@ class GroupsWidget(QtWidgets.QWidget):
             samples_per_group_model.clear()
 
     def on_export_all(self):
-        """Export the data, the groups, the statistics and the student tests performed for all properties
+        """Export the data, the groups, the statistics and the student tests performed for all properties. The export
+        runs in a background job.
         """
 
         excel_file = QtWidgets.QFileDialog.getSaveFileName(self, caption='Export data as ...', filter="Excel files (*.xls *.xlsx)")
@@ -12,6 +12,8 @@ class EnhancedTextEdit(QtWidgets.QPlainTextEdit):
     """This class implements a text edit bound to a contexttual menu.
     """
 
+    message_logged = QtCore.pyqtSignal(str)
+
     def contextMenuEvent(self, event):
         popup_menu = self.createStandardContextMenu()
 
@@ -21,6 +23,17 @@ class EnhancedTextEdit(QtWidgets.QPlainTextEdit):
         popup_menu.addAction('Save as ...', self.on_save_logger)
         popup_menu.exec_(event.globalPos())
 
+    def on_append_message(self, msg):
+        """Append a message to the logger.
+
+        Args:
+            msg (str): the message
+        """
+
+        self.appendPlainText(msg)
+        # Will act as a flush
+        self.repaint()
+
     def on_clear_logger(self):
         """Clear the logger
         """
@@ -43,6 +56,7 @@ class QTextEditLogger(logging.Handler):
     """This class implements a QTextEdit based handler for the application's logger.
 
     Every logging call will be written in the QTextEdit. The logbook can be saved to a text file or cleared.
+    The logging calls made from a background thread are queued to the GUI thread.
     """
 
     def __init__(self, parent):
@@ -50,15 +64,14 @@ class QTextEditLogger(logging.Handler):
         super().__init__()
         self._widget = EnhancedTextEdit(parent)
         self._widget.setReadOnly(True)
+        self._widget.message_logged.connect(self._widget.on_append_message)
 
     def emit(self, record):
         """
         """
 
         msg = self.format(record)
-        self._widget.appendPlainText(msg)
-        # Will act as a flush
-        self._widget.repaint()
+        self._widget.message_logged.emit(msg)
 
     @property
     def widget(self):
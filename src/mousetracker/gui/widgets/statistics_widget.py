@@ -1,7 +1,8 @@
 import collections
+import functools
 import logging
 
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore, QtWidgets
 
 from mousetracker.gui.dialogs.plot_dialog import PlotDialog
 from mousetracker.gui.views.copy_pastable_tableview import CopyPastableTableView
@@ -24,8 +25,18 @@ class StatisticsWidget(QtWidgets.QWidget):
 
         self.setToolTip('statistics for {} property'.format(self._selected_property))
 
-        # Compute the student test once for all for saving time later on
-        self._student_tests = self._groups_model.get_student_tests(self._selected_property, self._groups_model.get_student_tests_zones())
+        # The tests are computed only when a zone and a day are selected and are cached per (test, zone, day)
+        self._student_tests_zones = collections.OrderedDict()
+        for zone in self._groups_model.get_student_tests_zones():
+            self._student_tests_zones['{} vs {}'.format(''.join(zone), ''.join(zone))] = zone
+        self._student_tests = {}
+
+        # The days for which the data changed since the student tests were computed
+        self._stale_days = []
+
+        # The bootstrap is too slow for each refresh of the statistics, hence the confidence intervals are computed only
+        # when the CI tab is shown. The version of the groups, the zones and the group of the displayed ones.
+        self._displayed_confidence_intervals = None
 
         self._init_ui()
 
@@ -34,11 +45,16 @@ class StatisticsWidget(QtWidgets.QWidget):
         """
 
         self._selected_group_combobox.currentIndexChanged.connect(self.on_select_group)
+        self._statistics_tab.currentChanged.connect(self.on_select_statistics_tab)
         self._selected_zone_combobox.view().clicked.connect(self.on_select_zone_for_statistics)
         self._plot_button.clicked.connect(self.on_plot_averages)
+        self._selected_test_combobox.currentIndexChanged.connect(self.on_select_test)
         self._selected_zone_for_ttest_combobox.currentIndexChanged.connect(self.on_select_zone_for_student_test)
         self._selected_day_combobox.currentIndexChanged.connect(self.on_select_day_for_student_test)
         self._export_all_button.clicked.connect(self.on_export_all)
+        self._update_student_tests_button.clicked.connect(self.on_update_student_tests)
+        self._groups_model.data_updated.connect(self.on_data_updated)
+        self._groups_model.contents_updated.connect(self.on_contents_updated)
 
     def _build_layout(self):
         """Build the layout of the widget.
@@ -66,11 +82,15 @@ class StatisticsWidget(QtWidgets.QWidget):
         student_test_inner_layout.addWidget(self._student_test_tableview)
 
         hlayout1 = QtWidgets.QHBoxLayout()
+        hlayout1.addWidget(self._selected_test_label)
+        hlayout1.addWidget(self._selected_test_combobox)
         hlayout1.addWidget(self._selected_zone_for_ttest_label)
         hlayout1.addWidget(self._selected_zone_for_ttest_combobox)
         hlayout1.addWidget(self._selected_day_label)
         hlayout1.addWidget(self._selected_day_combobox)
         hlayout1.addStretch()
+        hlayout1.addWidget(self._stale_label)
+        hlayout1.addWidget(self._update_student_tests_button)
         student_test_inner_layout.addLayout(hlayout1)
 
         self._student_test_groupbox.setLayout(student_test_inner_layout)
@@ -90,10 +110,12 @@ class StatisticsWidget(QtWidgets.QWidget):
         self._averages_tableview = CopyPastableTableView('\t')
         self._stds_tableview = CopyPastableTableView('\t')
         self._ns_tableview = CopyPastableTableView('\t')
+        self._cis_tableview = CopyPastableTableView('\t')
 
         self._statistics_tab.addTab(self._averages_tableview, 'Averages')
         self._statistics_tab.addTab(self._stds_tableview, 'Std Dev')
         self._statistics_tab.addTab(self._ns_tableview, 'N')
+        self._statistics_tab.addTab(self._cis_tableview, 'CI')
 
         self._selected_group_label = QtWidgets.QLabel('Group')
         self._selected_group_combobox = QtWidgets.QComboBox()
@@ -111,19 +133,80 @@ class StatisticsWidget(QtWidgets.QWidget):
 
         self._student_test_tableview = CopyPastableTableView('\t')
 
+        self._selected_test_label = QtWidgets.QLabel('Test')
+        self._selected_test_combobox = QtWidgets.QComboBox()
+        self._selected_test_combobox.addItems(['Student', 'Permutation'])
+
         self._selected_zone_for_ttest_label = QtWidgets.QLabel('Zone')
         self._selected_zone_for_ttest_combobox = QtWidgets.QComboBox()
-        self._selected_zone_for_ttest_combobox.addItems(self._student_tests.keys())
+        self._selected_zone_for_ttest_combobox.addItems(self._student_tests_zones.keys())
 
         self._selected_day_label = QtWidgets.QLabel('Day')
         self._selected_day_combobox = QtWidgets.QComboBox()
-        # Get one of the self._student_test primary key no matter which one is selected to get the days
-        first_key = list(self._student_tests.keys())[0]
-        days = list(self._student_tests[first_key].keys())
-        self._selected_day_combobox.addItems(days)
+        self._selected_day_combobox.addItems(self._groups_model.days)
+
+        self._stale_label = QtWidgets.QLabel()
+        self._stale_label.setStyleSheet('color: red')
+        self._stale_label.hide()
+
+        self._update_student_tests_button = QtWidgets.QPushButton('Update')
+        self._update_student_tests_button.hide()
 
         self._export_all_button = QtWidgets.QPushButton('Export')
 
+    def _display_student_test(self):
+        """Display the selected test for the selected zone and day. The student tests of the neighbouring days are
+        computed afterwards when the application is idle.
+        """
+
+        selected_test = self._selected_test_combobox.currentText()
+        selected_zone = self._selected_zone_for_ttest_combobox.currentText()
+        selected_day = self._selected_day_combobox.currentText()
+        if not selected_zone or not selected_day:
+            self._student_test_tableview.setModel(None)
+            return
+
+        dataframe = self._student_test(selected_test, selected_zone, selected_day)
+        dataframe = dataframe.round(3)
+
+        model = PandasDataModel(self)
+        model.set_data_frame(dataframe)
+        self._student_test_tableview.setModel(model)
+
+        # The permutation tests are computed for all the days of a zone at once
+        if selected_test == 'Permutation':
+            return
+
+        QtCore.QTimer.singleShot(0, functools.partial(self._prefetch_student_tests, selected_zone, self._selected_day_combobox.currentIndex()))
+
+    def _display_confidence_intervals(self):
+        """Display the confidence intervals of the selected group and zones if the CI tab is shown. They are computed
+        again only when the groups, the zones or the group changed since they were displayed.
+        """
+
+        if self._statistics_tab.currentWidget() is not self._cis_tableview:
+            return
+
+        selected_zones = [tuple(v.text()) for v in self._selected_zone_combobox.checked_items()]
+        if self._selected_group_combobox.currentIndex() < 0 or not selected_zones:
+            return
+
+        selected_group = self._selected_group_combobox.currentText()
+
+        key = (self._groups_model.version, tuple(selected_zones), selected_group)
+        if key == self._displayed_confidence_intervals:
+            return
+
+        confidence_intervals = self._groups_model.get_confidence_intervals(self._selected_property, selected_zones)
+        lower = confidence_intervals['lower'][selected_group].round(3)
+        upper = confidence_intervals['upper'][selected_group].round(3)
+
+        ci_model = PandasDataModel(self)
+        ci_model.set_data_frame('[' + lower.astype(str) + ', ' + upper.astype(str) + ']')
+        self._cis_tableview.setModel(ci_model)
+
+        self._displayed_confidence_intervals = key
+
     def _init_ui(self):
         """Initialize the ui.
         """
@@ -134,6 +217,77 @@ class StatisticsWidget(QtWidgets.QWidget):
 
         self.on_select_zone_for_student_test(0)
 
+    def _prefetch_student_tests(self, zone, index):
+        """Compute the student tests of the days before and after a given day if they have not been computed yet.
+
+        Args:
+            zone (str): the zone
+            index (int): the index of the day in the day combobox
+        """
+
+        days = [self._selected_day_combobox.itemText(i) for i in (index - 1, index + 1) if 0 <= i < self._selected_day_combobox.count()]
+        days = [day for day in days if ('Student', zone, day) not in self._student_tests]
+        if not days or zone not in self._student_tests_zones:
+            return
+
+        student_tests = self._groups_model.get_student_tests(self._selected_property, [self._student_tests_zones[zone]], days=days)
+        for day, dataframe in student_tests[zone].items():
+            self._student_tests[('Student', zone, day)] = dataframe
+
+    def _student_test(self, test, zone, day):
+        """Return a test for a zone and a day. The test is computed the first time it is requested. The permutation
+        tests are computed for all the days of the zone at once.
+
+        Args:
+            test (str): the test (Student or Permutation)
+            zone (str): the zone
+            day (str): the day
+
+        Returns:
+            pandas.DataFrame: the p values matrix
+        """
+
+        key = (test, zone, day)
+        if key not in self._student_tests:
+            if test == 'Permutation':
+                permutation_tests = self._groups_model.get_permutation_tests(self._selected_property, [self._student_tests_zones[zone]])
+                for zone_day, dataframe in permutation_tests[zone].items():
+                    self._student_tests[(test, zone, zone_day)] = dataframe
+            else:
+                student_tests = self._groups_model.get_student_tests(self._selected_property, [self._student_tests_zones[zone]], days=[day])
+                self._student_tests[key] = student_tests[zone][day]
+
+        return self._student_tests[key]
+
+    def on_contents_updated(self):
+        """Event handler called when the animals of a group changed. The statistics tables and the student test are
+        refreshed.
+        """
+
+        self._student_tests = {}
+        self._display_student_test()
+
+        if self._selected_group_combobox.currentIndex() < 0 or not self._selected_zone_combobox.checked_items():
+            return
+
+        self.on_select_group(self._selected_group_combobox.currentIndex())
+
+    def on_data_updated(self, days):
+        """Event handler called when the data of some days changed. The student tests computed so far are kept but
+        marked as stale.
+
+        Args:
+            days (list of str): the days whose data changed
+        """
+
+        for day in days:
+            if day not in self._stale_days:
+                self._stale_days.append(day)
+
+        self._stale_label.setText('Student tests out of date for day(s) {}'.format(', '.join(self._stale_days)))
+        self._stale_label.show()
+        self._update_student_tests_button.show()
+
     def on_export_all(self):
         """Export all data to an excel file.
         """
@@ -159,8 +313,10 @@ class StatisticsWidget(QtWidgets.QWidget):
 
         statistics = self._groups_model.get_statistics(self._selected_property, selected_zones)
 
+        confidence_intervals = self._groups_model.get_confidence_intervals(self._selected_property, selected_zones)
+
         dialog = PlotDialog(self)
-        dialog.set_data(self._selected_property, statistics['mean'])
+        dialog.set_data(self._selected_property, statistics['mean'], confidence_intervals)
         dialog.show()
 
     def on_select_group(self, index):
@@ -188,6 +344,24 @@ class StatisticsWidget(QtWidgets.QWidget):
         n_model.set_data_frame(statistics['n'][selected_group])
         self._ns_tableview.setModel(n_model)
 
+        self._display_confidence_intervals()
+
+    def on_select_statistics_tab(self, index):
+        """Event handler called when a tab of the statistics is selected. The confidence intervals are displayed when
+        the CI tab is selected.
+
+        Args:
+            index (int): the index of the selected tab
+        """
+
+        self._display_confidence_intervals()
+
+    def on_select_test(self, index):
+        """Event which fetch the selected test and update the student test tableview accordingly.
+        """
+
+        self._display_student_test()
+
     def on_select_zone_for_statistics(self):
 
         selected_zones = [tuple(v.text()) for v in self._selected_zone_combobox.checked_items()]
@@ -202,32 +376,41 @@ class StatisticsWidget(QtWidgets.QWidget):
         """Event which fetch the selected zone and day and update the student test tableview accordingly.
         """
 
-        selected_zone = self._selected_zone_for_ttest_combobox.currentText()
-        selected_day = self._selected_day_combobox.currentText()
-
-        dataframe = self._student_tests[selected_zone][selected_day]
-        dataframe = dataframe.round(3)
-
-        model = PandasDataModel(self)
-        model.set_data_frame(dataframe)
-        self._student_test_tableview.setModel(model)
+        self._display_student_test()
 
     def on_select_day_for_student_test(self, index):
         """Event which fetch the selected zone and day and update the student test tableview accordingly.
         """
 
-        selected_zone = self._selected_zone_for_ttest_combobox.currentText()
+        self._display_student_test()
+
+    def on_update_student_tests(self):
+        """Event handler which computes again the student tests after the data changed.
+        """
+
         selected_day = self._selected_day_combobox.currentText()
 
-        dataframe = self._student_tests[selected_zone][selected_day]
-        dataframe = dataframe.round(3)
+        self._student_tests = {}
 
-        model = PandasDataModel(self)
-        model.set_data_frame(dataframe)
-        self._student_test_tableview.setModel(model)
+        self._stale_days = []
+        self._stale_label.hide()
+        self._update_student_tests_button.hide()
+
+        # New days may have been added
+        days = self._groups_model.days
+        self._selected_day_combobox.blockSignals(True)
+        self._selected_day_combobox.clear()
+        self._selected_day_combobox.addItems(days)
+        if selected_day in days:
+            self._selected_day_combobox.setCurrentIndex(days.index(selected_day))
+        self._selected_day_combobox.blockSignals(False)
+
+        self._display_student_test()
 
     def reset_statistics_tables(self):
 
         self._averages_tableview.setModel(None)
         self._stds_tableview.setModel(None)
         self._ns_tableview.setModel(None)
+        self._cis_tableview.setModel(None)
+        self._displayed_confidence_intervals = None
@@ -0,0 +1,255 @@
+"""This module implements the following classes and functions:
+    - BatchProcessor
+"""
+
+import collections
+import glob
+import logging
+import os
+import time
+
+import yaml
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.readers.workbook_cache import workbook_cache
+from mousetracker.kernel.statistics.group_statistics import (get_confidence_intervals_batch,
+                                                             get_statistics_batch,
+                                                             get_statistics_zones,
+                                                             get_student_tests,
+                                                             get_student_tests_zones)
+from mousetracker.kernel.writers.columnar_writer import export_columnar_bundle
+from mousetracker.kernel.writers.excel_writer import export_excel_file
+
+
+class BatchProcessor:
+    """This class processes a whole directory of excel files without any GUI.
+
+    The groups of each file are read from a YAML file written by the GUI (File > Export groups). For each file which
+    has groups, the statistics, the confidence intervals and the student tests are computed for all the properties and
+    exported to an excel file with the same layout as the one exported from the GUI and optionally to a columnar
+    bundle.
+
+    The files are read in parallel and each file is processed as soon as it has been read. The data of a file is
+    released once the file has been processed, hence only the files which have been read but not processed yet are
+    kept in memory.
+    """
+
+    stages = ['reading', 'cube', 'statistics', 'confidence intervals', 'student tests', 'export', 'columnar export']
+
+    def __init__(self, groups_file, output_directory, properties=None, parallel=True, n_workers=None,
+                 parallel_student_tests=False, columnar=False):
+        """Constructor.
+
+        Args:
+            groups_file (str): the YAML file which stores the groups
+            output_directory (str): the directory where the exported files will be written
+            properties (list of str): the properties to process. If None, all the properties are processed.
+            parallel (bool): whether the excel files should be read in parallel
+            n_workers (int): the number of worker processes used for reading the excel files and for the student tests
+            parallel_student_tests (bool): whether the student tests of each property should be computed by a pool of
+                processes
+            columnar (bool): whether the results should also be exported to a columnar bundle
+        """
+
+        self._groups = BatchProcessor._load_groups(groups_file)
+
+        self._output_directory = output_directory
+
+        self._properties = properties
+
+        self._parallel = parallel
+
+        self._n_workers = n_workers
+
+        self._parallel_student_tests = parallel_student_tests
+
+        self._columnar = columnar
+
+        self._timings = collections.OrderedDict([(stage, 0.0) for stage in BatchProcessor.stages])
+
+    @staticmethod
+    def _load_groups(groups_file):
+        """Load the groups from a YAML file written by the GUI.
+
+        Args:
+            groups_file (str): the YAML file
+
+        Returns:
+            dict: the groups per excel file. The groups are stored both under the path of the excel file and under
+            its basename such as the YAML file can be used for a directory which has been moved.
+        """
+
+        with open(groups_file, 'r') as fin:
+            imported_groups = yaml.load(fin, Loader=yaml.FullLoader)
+
+        groups = {}
+        for group_dict in imported_groups or []:
+            excel_file = group_dict['excel_file']
+            contents = [(group_name, list(group_contents), selected) for group_name, group_contents, selected in group_dict['groups']]
+            groups[os.path.abspath(excel_file)] = contents
+            groups.setdefault(os.path.basename(excel_file), contents)
+
+        return groups
+
+    def _find_groups(self, excel_file):
+        """Return the groups of an excel file.
+
+        Args:
+            excel_file (str): the excel file
+
+        Returns:
+            list of 3-tuples: the name, the animals and the selection state of each group or None if the file has no
+            groups
+        """
+
+        groups = self._groups.get(os.path.abspath(excel_file))
+        if groups is None:
+            groups = self._groups.get(os.path.basename(excel_file))
+
+        return groups
+
+    def _process(self, excel_file, data_frame, metadata, groups):
+        """Compute the statistics, the confidence intervals and the student tests of an excel file and export them.
+
+        Args:
+            excel_file (str): the excel file
+            data_frame (pandas.DataFrame): the data read from the excel file
+            metadata (dict): the metadata of the data
+            groups (list of 3-tuples): the name, the animals and the selection state of each group
+
+        Returns:
+            str: the exported file
+        """
+
+        start = time.perf_counter()
+        cube = MonitoringCube.from_data_frame(data_frame, metadata)
+        group_index = GroupIndex(cube, groups)
+        self._timings['cube'] += time.perf_counter() - start
+
+        if self._properties is None:
+            properties = cube.properties
+        else:
+            properties = [prop for prop in self._properties if prop in cube.properties]
+
+        statistics_zones = get_statistics_zones(cube.animal)
+
+        start = time.perf_counter()
+        statistics = get_statistics_batch(group_index, properties, statistics_zones)
+        self._timings['statistics'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        confidence_intervals = get_confidence_intervals_batch(group_index, properties, statistics_zones)
+        self._timings['confidence intervals'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        student_tests = collections.OrderedDict()
+        student_tests_zones = get_student_tests_zones(cube.animal)
+        for prop in properties:
+            student_tests[prop] = get_student_tests(group_index,
+                                                    prop,
+                                                    student_tests_zones,
+                                                    parallel=self._parallel_student_tests,
+                                                    n_workers=self._n_workers)
+        self._timings['student tests'] += time.perf_counter() - start
+
+        basename, _ = os.path.splitext(os.path.basename(excel_file))
+        output_file = os.path.join(self._output_directory, '{}_statistics.xlsx'.format(basename))
+
+        start = time.perf_counter()
+        export_excel_file(output_file, data_frame, groups, statistics, student_tests, confidence_intervals)
+        self._timings['export'] += time.perf_counter() - start
+
+        if self._columnar:
+            start = time.perf_counter()
+            export_columnar_bundle(os.path.join(self._output_directory, '{}_statistics'.format(basename)),
+                                   data_frame,
+                                   metadata,
+                                   groups,
+                                   statistics,
+                                   student_tests,
+                                   confidence_intervals)
+            self._timings['columnar export'] += time.perf_counter() - start
+
+        return output_file
+
+    def run(self, directory):
+        """Process all the excel files of a directory.
+
+        Args:
+            directory (str): the directory
+
+        Returns:
+            tuple: the number of processed files and the number of files which could not be processed
+        """
+
+        excel_files = sorted(glob.glob(os.path.join(directory, '*.xlsx')) + glob.glob(os.path.join(directory, '*.xls')))
+
+        # The files without groups are not even read
+        groups = []
+        selected_files = []
+        for excel_file in excel_files:
+            file_groups = self._find_groups(excel_file)
+            if file_groups is None:
+                logging.warning('No groups defined for {}. Skip it.'.format(excel_file))
+                continue
+            selected_files.append(excel_file)
+            groups.append(file_groups)
+
+        os.makedirs(self._output_directory, exist_ok=True)
+
+        n_processed_files = 0
+        n_failed_files = 0
+
+        results = workbook_cache.read_excel_files(selected_files, parallel=self._parallel, n_workers=self._n_workers)
+
+        start = time.perf_counter()
+        for index, result in results:
+            self._timings['reading'] += time.perf_counter() - start
+
+            excel_file = selected_files[index]
+            if isinstance(result, Exception):
+                logging.error(str(result))
+                n_failed_files += 1
+            else:
+                try:
+                    output_file = self._process(excel_file, *result, groups[index])
+                except Exception as error:
+                    logging.error('Could not process {}: {}'.format(excel_file, error))
+                    n_failed_files += 1
+                else:
+                    logging.info('Processed {} -> {}'.format(excel_file, output_file))
+                    n_processed_files += 1
+
+            # Do not keep the data of the processed file while the next one is being read
+            del result
+
+            start = time.perf_counter()
+
+        return n_processed_files, n_failed_files
+
+    @property
+    def timings(self):
+        """Return the time spent in each stage of the processing.
+
+        Returns:
+            collections.OrderedDict: the time in seconds per stage
+        """
+
+        return self._timings
+
+    def timings_summary(self):
+        """Return a printable summary of the time spent in each stage of the processing.
+
+        Returns:
+            str: the summary
+        """
+
+        total = sum(self._timings.values())
+
+        lines = ['{:<20s} {:>10s} {:>7s}'.format('stage', 'time (s)', '%')]
+        for stage, timing in self._timings.items():
+            lines.append('{:<20s} {:>10.2f} {:>7.1f}'.format(stage, timing, 100.0*timing/total if total > 0 else 0.0))
+        lines.append('{:<20s} {:>10.2f}'.format('total', total))
+
+        return '\n'.join(lines)
@@ -0,0 +1,134 @@
+"""This module implements the following classes and functions:
+    - GroupIndex
+"""
+
+import numpy as np
+
+from mousetracker.kernel.statistics.zone_statistics import ZoneStatistics
+
+
+class GroupIndex:
+    """This class implements an inverted index from groups of animals to the positions of their (animal, zone) couples
+    in a cube.
+
+    The animals of each group are resolved once when the index is built and the positions of a group for a set of zones
+    are computed the first time they are requested. Selecting the data of a group then costs only the size of the
+    group instead of a scan of the whole data. The index must be built again when the groups are added, removed,
+    renamed or reordered. When the animals of a group change, the group can be updated in place.
+    """
+
+    def __init__(self, cube, groups):
+        """Constructor.
+
+        Args:
+            cube (mousetracker.kernel.data.monitoring_cube.MonitoringCube): the data
+            groups (list of 3-tuples): the name, the animals and the selection state of each group
+        """
+
+        self._cube = cube
+
+        self._groups = [(group_name, list(animals), selected) for group_name, animals, selected in groups]
+
+        self._animal_indexes = [cube.animal_indexes(animals) for _, animals, _ in self._groups]
+
+        self._rows = {}
+
+        self._zone_statistics = None
+
+    @property
+    def cube(self):
+        """Return the data.
+
+        Returns:
+            mousetracker.kernel.data.monitoring_cube.MonitoringCube: the data
+        """
+
+        return self._cube
+
+    @property
+    def groups(self):
+        """Return the groups.
+
+        Returns:
+            list of 3-tuples: the name, the animals and the selection state of each group
+        """
+
+        return self._groups
+
+    def rows(self, group, zones):
+        """Return the positions of the (animal, zone) couples of a group for a set of zones.
+
+        Args:
+            group (int): the index of the group
+            zones (iterable of str): the zones
+
+        Returns:
+            numpy.ndarray: the positions of the rows of the cube flattened on its animal and zone axes
+        """
+
+        key = (group, tuple(zones))
+
+        rows = self._rows.get(key)
+        if rows is None:
+            rows = self._cube.rows(self._animal_indexes[group], self._cube.zone_indexes(zones))
+            self._rows[key] = rows
+
+        return rows
+
+    def sample(self, group, selected_property, zones):
+        """Return the values of a property for a group and a set of zones.
+
+        Args:
+            group (int): the index of the group
+            selected_property (str): the property
+            zones (iterable of str): the zones
+
+        Returns:
+            numpy.ndarray: the values with shape (n_couples, n_days)
+        """
+
+        return self._cube.take(self.rows(group, zones), selected_property)
+
+    def update_group(self, group, animals):
+        """Update the animals of a group. The per-zone statistics are updated with the rows of the added and removed
+        animals only.
+
+        Args:
+            group (int): the index of the group
+            animals (list of str): the new animals of the group
+        """
+
+        group_name, old_animals, selected = self._groups[group]
+
+        old_animal_indexes = self._animal_indexes[group]
+        animal_indexes = self._cube.animal_indexes(animals)
+
+        self._groups[group] = (group_name, list(animals), selected)
+        self._animal_indexes[group] = animal_indexes
+
+        for key in [key for key in self._rows if key[0] == group]:
+            del self._rows[key]
+
+        if self._zone_statistics is None:
+            return
+
+        added = np.setdiff1d(animal_indexes, old_animal_indexes, assume_unique=True)
+        if added.size:
+            self._zone_statistics.add(group, *ZoneStatistics.of_animals(self._cube, added))
+
+        removed = np.setdiff1d(old_animal_indexes, animal_indexes, assume_unique=True)
+        if removed.size:
+            self._zone_statistics.remove(group, *ZoneStatistics.of_animals(self._cube, removed))
+
+    @property
+    def zone_statistics(self):
+        """Return the per-zone statistics of the groups. They are computed the first time they are requested.
+
+        Returns:
+            mousetracker.kernel.statistics.zone_statistics.ZoneStatistics: the statistics
+        """
+
+        if self._zone_statistics is None:
+            self._zone_statistics = ZoneStatistics.from_group_index(self)
+
+        return self._zone_statistics
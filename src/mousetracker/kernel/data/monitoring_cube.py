@@ -0,0 +1,417 @@
+"""This module implements the following classes and functions:
+    - MonitoringCube
+"""
+
+import collections
+
+import numpy as np
+
+import pandas as pd
+
+
+class MonitoringCube:
+    """This class stores the monitoring data of an excel file as a dense array whose axes are animal x zone x day x
+    property.
+
+    The labels of each axis are integer-coded and the missing values are stored as NaN. The header columns of the
+    data (e.g. Exposé for rabbits) are stored per animal and zone. The cube can be built from the data frame read from
+    an excel file and can be converted back to such a data frame.
+    """
+
+    def __init__(self, values, animals, zones, days, properties, animal, headers=None, present=None, index=None,
+                 rows=None):
+        """Constructor.
+
+        Args:
+            values (numpy.ndarray): the data. Its shape must be (n_animals, n_zones, n_days, n_properties).
+            animals (list of str): the names of the animals
+            zones (list of str): the zones
+            days (list of str): the days
+            properties (list of str): the properties
+            animal (str): the type of the animal (e.g. Souris, Lapins)
+            headers (collections.OrderedDict): the extra header columns. Each value is an array of shape
+                (n_animals, n_zones).
+            present (numpy.ndarray): the (animal, zone) couples which are defined in the data. If None, all couples
+                are defined.
+            index (numpy.ndarray): the label of the row of each (animal, zone) couple in the original data frame
+            rows (numpy.ndarray): the position of the row of each (animal, zone) couple in the original data frame
+        """
+
+        self._values = np.asarray(values, dtype=np.float64)
+
+        self._animals = list(animals)
+
+        self._zones = list(zones)
+
+        self._days = list(days)
+
+        self._properties = list(properties)
+
+        self._animal = animal
+
+        self._headers = headers if headers is not None else collections.OrderedDict()
+
+        n_animals, n_zones = self._values.shape[:2]
+
+        self._present = present if present is not None else np.ones((n_animals, n_zones), dtype=bool)
+
+        self._rows = rows if rows is not None else np.arange(n_animals*n_zones).reshape(n_animals, n_zones)
+
+        self._index = index if index is not None else self._rows
+
+        self._animal_codes = {name: i for i, name in enumerate(self._animals)}
+
+        self._zone_codes = {zone: i for i, zone in enumerate(self._zones)}
+
+        self._day_codes = {day: i for i, day in enumerate(self._days)}
+
+        self._property_codes = {prop: i for i, prop in enumerate(self._properties)}
+
+    @staticmethod
+    def _codes(codes, labels):
+        """Return the codes of a sequence of labels. The unknown labels are skipped.
+
+        Args:
+            codes (dict): the code of each label
+            labels (iterable): the labels
+
+        Returns:
+            numpy.ndarray: the sorted unique codes
+        """
+
+        return np.unique(np.array([codes[label] for label in labels if label in codes], dtype=np.intp))
+
+    @property
+    def animal(self):
+        """Return the type of the animal (e.g. Souris, Lapins).
+
+        Returns:
+            str: the type of the animal
+        """
+
+        return self._animal
+
+    def animal_indexes(self, animals):
+        """Return the indexes of some animals in the cube. The unknown animals are skipped.
+
+        Args:
+            animals (list of str): the animals
+
+        Returns:
+            numpy.ndarray: the indexes
+        """
+
+        return MonitoringCube._codes(self._animal_codes, animals)
+
+    @property
+    def animals(self):
+        """Return the names of the animals.
+
+        Returns:
+            list of str: the animals
+        """
+
+        return self._animals
+
+    @property
+    def days(self):
+        """Return the days.
+
+        Returns:
+            list of str: the days
+        """
+
+        return self._days
+
+    def day_indexes(self, days):
+        """Return the indexes of some days in the cube. The unknown days are skipped.
+
+        Args:
+            days (list of str): the days
+
+        Returns:
+            numpy.ndarray: the indexes
+        """
+
+        return MonitoringCube._codes(self._day_codes, days)
+
+    @classmethod
+    def from_data_frame(cls, data_frame, metadata):
+        """Build a cube from a data frame read from an excel file.
+
+        Args:
+            data_frame (pandas.DataFrame): the data frame
+            metadata (dict): the metadata of the data frame (days, properties, zones, animal, n_header_properties)
+
+        Returns:
+            MonitoringCube: the cube
+        """
+
+        animal = metadata['animal']
+        zones = list(metadata['zones'])
+        days = list(metadata['days'])
+        properties = list(metadata['properties'])
+        n_header_properties = metadata['n_header_properties']
+
+        animal_codes, animals = pd.factorize(data_frame[animal])
+        zone_codes = {zone: i for i, zone in enumerate(zones)}
+        row_zone_codes = np.array([zone_codes.get(zone, -1) for zone in data_frame['Zone']], dtype=np.intp)
+
+        # Skip the rows whose zone is unknown (should not happen for well-formed files)
+        valid_rows = (animal_codes >= 0) & (row_zone_codes >= 0)
+        animal_codes = animal_codes[valid_rows]
+        row_zone_codes = row_zone_codes[valid_rows]
+
+        n_animals = len(animals)
+        n_zones = len(zones)
+
+        present = np.zeros((n_animals, n_zones), dtype=bool)
+        present[animal_codes, row_zone_codes] = True
+
+        index = np.zeros((n_animals, n_zones), dtype=data_frame.index.dtype)
+        index[animal_codes, row_zone_codes] = data_frame.index.to_numpy()[valid_rows]
+
+        rows = np.zeros((n_animals, n_zones), dtype=np.intp)
+        rows[animal_codes, row_zone_codes] = np.arange(len(data_frame))[valid_rows]
+
+        # Each day-property column is scattered to its location in the cube
+        day_codes = {day: i for i, day in enumerate(days)}
+        property_codes = {prop: i for i, prop in enumerate(properties)}
+        columns = []
+        column_days = []
+        column_properties = []
+        for column in data_frame.columns[n_header_properties:]:
+            day, prop = column.rsplit('-', 1)
+            if day in day_codes and prop in property_codes:
+                columns.append(column)
+                column_days.append(day_codes[day])
+                column_properties.append(property_codes[prop])
+
+        data = data_frame[columns]
+        if any(dtype == object for dtype in data.dtypes):
+            data = data.apply(pd.to_numeric, errors='coerce')
+
+        values = np.full((n_animals, n_zones, len(days), len(properties)), np.nan)
+        values[animal_codes[:, np.newaxis],
+               row_zone_codes[:, np.newaxis],
+               np.array(column_days, dtype=np.intp)[np.newaxis, :],
+               np.array(column_properties, dtype=np.intp)[np.newaxis, :]] = data.to_numpy(dtype=np.float64)[valid_rows]
+
+        headers = collections.OrderedDict()
+        for column in data_frame.columns[2:n_header_properties]:
+            header = np.empty((n_animals, n_zones), dtype=object)
+            header[animal_codes, row_zone_codes] = data_frame[column].to_numpy()[valid_rows]
+            headers[column] = header
+
+        animals = [str(v) for v in animals]
+
+        return cls(values, animals, zones, days, properties, animal, headers=headers, present=present, index=index,
+                   rows=rows)
+
+    @property
+    def mask(self):
+        """Return the mask of the valid (i.e. non NaN) values.
+
+        Returns:
+            numpy.ndarray: the mask
+        """
+
+        return ~np.isnan(self._values)
+
+    @property
+    def present(self):
+        """Return the mask of the (animal, zone) couples which are defined in the data.
+
+        Returns:
+            numpy.ndarray: the mask with shape (n_animals, n_zones)
+        """
+
+        return self._present
+
+    @property
+    def properties(self):
+        """Return the properties.
+
+        Returns:
+            list of str: the properties
+        """
+
+        return self._properties
+
+    def property_index(self, prop):
+        """Return the index of a property in the cube.
+
+        Args:
+            prop (str): the property
+
+        Returns:
+            int: the index
+
+        Raises:
+            KeyError: if the property is unknown
+        """
+
+        return self._property_codes[prop]
+
+    def rows(self, animal_indexes, zone_indexes):
+        """Return the positions of the (animal, zone) couples of a selection which are defined in the data. The
+        positions are those of the rows of the cube flattened on its animal and zone axes.
+
+        Args:
+            animal_indexes (numpy.ndarray): the indexes of the animals
+            zone_indexes (numpy.ndarray): the indexes of the zones
+
+        Returns:
+            numpy.ndarray: the positions
+        """
+
+        rows = (animal_indexes[:, np.newaxis]*len(self._zones) + zone_indexes[np.newaxis, :]).ravel()
+
+        return rows[self._present.ravel()[rows]]
+
+    def sample(self, selected_property, animals, zones):
+        """Return the values of a property for the (animal, zone) couples of a selection which are defined in the data.
+
+        Args:
+            selected_property (str): the property
+            animals (list of str): the animals
+            zones (iterable of str): the zones
+
+        Returns:
+            numpy.ndarray: the values with shape (n_couples, n_days)
+        """
+
+        return self.take(self.rows(self.animal_indexes(animals), self.zone_indexes(zones)), selected_property)
+
+    def select(self, animals=None, zones=None, days=None, properties=None):
+        """Select a sub-cube.
+
+        Args:
+            animals (list of str): the animals to select. If None, select all the animals.
+            zones (list of str): the zones to select. If None, select all the zones.
+            days (list of str): the days to select. If None, select all the days.
+            properties (list of str): the properties to select. If None, select all the properties.
+
+        Returns:
+            numpy.ndarray: the selected values with shape (n_animals, n_zones, n_days, n_properties)
+        """
+
+        indexes = [self.animal_indexes(animals) if animals is not None else slice(None),
+                   self.zone_indexes(zones) if zones is not None else slice(None),
+                   self.day_indexes(days) if days is not None else slice(None),
+                   MonitoringCube._codes(self._property_codes, properties) if properties is not None else slice(None)]
+
+        values = self._values
+        for axis, index in enumerate(indexes):
+            if isinstance(index, slice):
+                continue
+            values = np.take(values, index, axis=axis)
+
+        return values
+
+    @property
+    def shape(self):
+        """Return the shape of the cube.
+
+        Returns:
+            tuple: the shape
+        """
+
+        return self._values.shape
+
+    def take(self, rows, selected_property):
+        """Return the values of a property for some rows of the cube flattened on its animal and zone axes.
+
+        Args:
+            rows (numpy.ndarray): the positions of the rows as returned by rows
+            selected_property (str): the property
+
+        Returns:
+            numpy.ndarray: the values with shape (n_rows, n_days)
+        """
+
+        n_animals, n_zones, n_days, n_properties = self._values.shape
+
+        return self._values.reshape(n_animals*n_zones, n_days, n_properties)[rows, :, self._property_codes[selected_property]]
+
+    def to_data_frame(self, animals=None, properties=None):
+        """Convert the cube to a data frame with the same layout as the one read from an excel file.
+
+        The rows are ordered as in the original data frame.
+
+        Args:
+            animals (list of str): the animals to convert. If None, convert all the animals.
+            properties (list of str): the properties to convert. If None, convert all the properties.
+
+        Returns:
+            tuple: the data frame and its metadata (days, properties, zones, animal ...)
+        """
+
+        animal_indexes = self.animal_indexes(animals) if animals is not None else np.arange(len(self._animals))
+        properties = self._properties if properties is None else [p for p in properties if p in self._property_codes]
+        property_indexes = np.array([self._property_codes[p] for p in properties], dtype=np.intp)
+
+        present = self._present[animal_indexes].ravel()
+
+        n_days = len(self._days)
+        values = self._values[animal_indexes][:, :, :, property_indexes]
+        values = values.reshape(-1, n_days*len(property_indexes))[present]
+
+        data = collections.OrderedDict()
+        data[self._animal] = np.repeat(np.array(self._animals, dtype=object)[animal_indexes], len(self._zones))[present]
+        data['Zone'] = np.tile(np.array(self._zones, dtype=object), len(animal_indexes))[present]
+        for column, header in self._headers.items():
+            data[column] = header[animal_indexes].ravel()[present]
+        columns = ['{}-{}'.format(day, prop) for day in self._days for prop in properties]
+        for i, column in enumerate(columns):
+            data[column] = values[:, i]
+
+        data_frame = pd.DataFrame(data, index=self._index[animal_indexes].ravel()[present])
+
+        # Restore the order of the rows of the original data frame
+        order = np.argsort(self._rows[animal_indexes].ravel()[present], kind='stable')
+        data_frame = data_frame.iloc[order]
+
+        metadata = collections.OrderedDict()
+        metadata['n_days'] = n_days
+        metadata['days'] = list(self._days)
+        metadata['n_properties'] = len(properties)
+        metadata['properties'] = list(properties)
+        metadata['n_zones'] = len(self._zones)
+        metadata['zones'] = list(self._zones)
+        metadata['animal'] = self._animal
+        metadata['n_header_properties'] = 2 + len(self._headers)
+
+        return data_frame, metadata
+
+    @property
+    def values(self):
+        """Return the data.
+
+        Returns:
+            numpy.ndarray: the data with shape (n_animals, n_zones, n_days, n_properties)
+        """
+
+        return self._values
+
+    def zone_indexes(self, zones):
+        """Return the indexes of some zones in the cube. The unknown zones are skipped.
+
+        Args:
+            zones (iterable of str): the zones
+
+        Returns:
+            numpy.ndarray: the indexes
+        """
+
+        return MonitoringCube._codes(self._zone_codes, zones)
+
+    @property
+    def zones(self):
+        """Return the zones.
+
+        Returns:
+            list of str: the zones
+        """
+
+        return self._zones
@@ -1,17 +1,13 @@
 import collections
+import functools
 import logging
-import os
-import re
-
-import openpyxl
-
-import numpy as np
-
-import pandas as pd
 
 from PyQt5 import QtCore
 
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
 from mousetracker.kernel.models.groups_model import GroupsModel
+from mousetracker.kernel.readers.excel_reader import ExcelReaderError, read_excel_file_metadata, update_excel_file
+from mousetracker.kernel.readers.workbook_cache import workbook_cache
 
 
 class ExcelFileModelError(Exception):
@@ -24,6 +20,10 @@ class ExcelFilesModel(QtCore.QAbstractListModel):
 
     group_model = QtCore.Qt.UserRole + 2
 
+    cube = QtCore.Qt.UserRole + 3
+
+    metadata = QtCore.Qt.UserRole + 4
+
     def __init__(self, *args, **kwargs):
         """Constructor.
         """
@@ -32,120 +32,103 @@ class ExcelFilesModel(QtCore.QAbstractListModel):
 
         self._excel_files = []
 
-    def add_excel_file(self, excel_file):
-        """Add an excel file to the model.
+    def _load(self, row):
+        """Read the data of a lazily added excel file. Does nothing if the data has already been read.
 
         Args:
-            excel_file (str): the excel file
+            row (int): the row of the excel file in the model
+
+        Raises:
+            ExcelFileModelError: if the file could not be read
         """
 
-        excel_files = [v[0] for v in self._excel_files]
-        if excel_file in excel_files:
-            logging.info('The file {} is already stored in the model'.format(excel_file))
+        excel_file, groups_model, cube, metadata = self._excel_files[row]
+        if cube is not None:
             return
 
-        # Fetch the shhet names
-        xls = openpyxl.load_workbook(excel_file)
-        sheet_names = xls.sheetnames
-        group_sheets = [sheet for sheet in sheet_names if re.match(r'^groupe.*', sheet.strip(), re.I)]
+        try:
+            data_frame, metadata = workbook_cache.read_excel_file(excel_file)
+        except ExcelReaderError as error:
+            raise ExcelFileModelError(str(error))
 
-        data_frame = pd.DataFrame([])
+        # Only the cube is kept, the data frame is rebuilt from it when needed
+        self._excel_files[row][2] = MonitoringCube.from_data_frame(data_frame, metadata)
+        self._excel_files[row][3] = metadata
 
-        for group_sheet in group_sheets:
+        logging.info('Loaded data of {}'.format(excel_file))
 
-            # Any exception must be caught here
-            try:
-
-                # Read the excel spreadsheet
-                df = pd.read_excel(excel_file, sheet_name=group_sheet, header=(0, 1))
+    def _load_cube(self, excel_file):
+        """Return the data of an excel file as a cube, reading the file first if it was lazily added.
 
-                # Find the number of zones (this must always be the 3rd column of the file)
-                zones = list(collections.OrderedDict.fromkeys(df.iloc[:, 2]))
-                n_zones = len(zones)
+        Args:
+            excel_file (str): the excel file
 
-                # Retrieve the name of the animal (e.g. Lapin, Souris). Take care this is a 2-level column name
-                animal = df.columns[1][1]
+        Returns:
+            mousetracker.kernel.data.monitoring_cube.MonitoringCube: the cube
+        """
 
-                # For rabbit files there is an extra header column (Exposé)
-                n_header_properties = 3 if animal == 'Lapins' else 2
+        row = self.excel_files.index(excel_file)
 
-                n_animals = len(df.index)//n_zones
+        self._load(row)
 
-                # Drop the first column
-                df = df.drop(('Unnamed: 0_level_0', 'Num expé'), axis=1)
+        return self._excel_files[row][2]
 
-                # Expand the souris number for all zones and not only zone A such as zone A B C D E for a given mouse have the same mouse number
-                for i in range(n_animals):
-                    df.loc[n_zones*i+1:n_zones*(i+1)-1, ('Unnamed: 1_level_0', animal)] = df.loc[n_zones*i, ('Unnamed: 1_level_0', animal)]
-                df[('Unnamed: 1_level_0', animal)] = df[('Unnamed: 1_level_0', animal)].astype(int)
+    def add_data_frame(self, excel_file, data_frame, metadata):
+        """Add an already read excel file to the model.
 
-                # Find the unique days
-                days = [col[0] for col in df.columns[n_header_properties:]]
-                days = list(collections.OrderedDict.fromkeys(days))
-                n_days = len(days)
+        Args:
+            excel_file (str): the excel file
+            data_frame (pandas.DataFrame): the data read from the excel file
+            metadata (dict): the metadata of the data (days, properties, zones ...)
+        """
 
-                # Find the duplicate properties i.e. the ones which are written through two columns in the excel file
-                duplicate_properties = []
-                for _, prop in df.columns[n_header_properties:]:
-                    if prop.strip()[-2:] == '.1':
-                        prop = prop.split('.1')[0]
-                        if prop not in duplicate_properties:
-                            duplicate_properties.append(prop)
+        if excel_file in self.excel_files:
+            logging.info('The file {} is already stored in the model'.format(excel_file))
+            return
 
-                # Loop over the days
-                for day in days:
+        cube = MonitoringCube.from_data_frame(data_frame, metadata)
 
-                    # Expand the Poid which is written in only one cell
-                    for i in range(n_animals):
-                        df.loc[n_zones*i+1:n_zones*(i+1)-1, (day, 'Poids')] = df.loc[n_zones*i, (day, 'Poids')]
+        groups_model = GroupsModel(excel_file, metadata, functools.partial(self._load_cube, excel_file), self)
 
-                    # For each duplicate property, compute the average
-                    for p in duplicate_properties:
-                        df[(day, p)] = df[[(day, p), (day, '{}.1'.format(p))]].agg(np.nanmean, axis=1)
+        self._excel_files.append([excel_file, groups_model, cube, metadata])
 
-                # Remove the second instance of the duplicate (the one that ends with .1)
-                for p in duplicate_properties:
-                    df = df.drop('{}.1'.format(p), axis=1, level=1)
+        self.layoutChanged.emit()
 
-                columns = df.columns
-                columns = ['-'.join(col) for col in columns]
-                columns[0] = animal
-                columns[1] = 'Zone'
-                if animal == 'Lapins':
-                    columns[2] = 'Exposé'
-                df.columns = columns
+    def add_excel_file(self, excel_file, lazy=False):
+        """Add an excel file to the model.
 
-                # Retrieve all the unique properties
-                properties = list(collections.OrderedDict.fromkeys([col.split('-')[-1] for col in df.columns[n_header_properties:]]))
-                n_properties = len(properties)
+        Args:
+            excel_file (str): the excel file
+            lazy (bool): if True, only the metadata of the file is read. The data is read when first needed.
+        """
 
-                data_frame = pd.concat([data_frame, df])
+        if excel_file in self.excel_files:
+            logging.info('The file {} is already stored in the model'.format(excel_file))
+            return
 
-            except:
-                raise ExcelFileModelError('The file {} could not be properly imported'.format(excel_file))
+        try:
+            if lazy:
+                self.add_metadata(excel_file, read_excel_file_metadata(excel_file))
+            else:
+                self.add_data_frame(excel_file, *workbook_cache.read_excel_file(excel_file))
+        except ExcelReaderError as error:
+            raise ExcelFileModelError(str(error))
 
-        n_total_animals = len(data_frame.index)//n_zones
+    def add_metadata(self, excel_file, metadata):
+        """Add an excel file whose only the metadata has been read so far to the model.
 
-        # Check and correct for redundant animal names
-        data_frame[animal] = data_frame[animal].astype(int)
-        animal_names = [data_frame.iloc[n_zones*i, 0] for i in range(n_animals)]
-        animal_names = [str(v) + '_' + str(animal_names[:i].count(v) + 1) if animal_names.count(v) > 1 else str(v)
-                        for i, v in enumerate(animal_names)]
-        for i in range(n_total_animals):
-            data_frame.iloc[n_zones*i:n_zones*i+n_zones, 0] = animal_names[i]
+        Args:
+            excel_file (str): the excel file
+            metadata (dict): the metadata of the data (days, properties, zones ...)
+        """
 
-        data_frame = data_frame.round(1)
+        if excel_file in self.excel_files:
+            logging.info('The file {} is already stored in the model'.format(excel_file))
+            return
 
-        setattr(data_frame, 'n_days', n_days)
-        setattr(data_frame, 'days', days)
-        setattr(data_frame, 'n_properties', n_properties)
-        setattr(data_frame, 'properties', properties)
-        setattr(data_frame, 'n_zones', n_zones)
-        setattr(data_frame, 'zones', zones)
-        setattr(data_frame, 'animal', animal)
-        setattr(data_frame, 'n_header_properties', n_header_properties)
+        groups_model = GroupsModel(excel_file, metadata, functools.partial(self._load_cube, excel_file), self)
 
-        self._excel_files.append((excel_file, data_frame, GroupsModel(data_frame, self)))
+        self._excel_files.append([excel_file, groups_model, None, metadata])
 
         self.layoutChanged.emit()
 
@@ -182,11 +165,109 @@ class ExcelFilesModel(QtCore.QAbstractListModel):
             return self._excel_files[idx][0]
 
         elif role == ExcelFilesModel.data_frame:
-            return self._excel_files[idx][1]
+            try:
+                self._load(idx)
+            except ExcelFileModelError as error:
+                logging.error(str(error))
+                return None
+            return self._excel_files[idx][2].to_data_frame()[0]
 
         elif role == ExcelFilesModel.group_model:
+            return self._excel_files[idx][1]
+
+        elif role == ExcelFilesModel.cube:
+            try:
+                self._load(idx)
+            except ExcelFileModelError as error:
+                logging.error(str(error))
+                return None
             return self._excel_files[idx][2]
 
+        elif role == ExcelFilesModel.metadata:
+            return self._excel_files[idx][3]
+
+    @property
+    def excel_files(self):
+        """Return the excel files stored in the model.
+
+        Returns:
+            list of str: the excel files
+        """
+
+        return [v[0] for v in self._excel_files]
+
+    def is_loaded(self, excel_file):
+        """Return true if the data of an excel file has been read.
+
+        Args:
+            excel_file (str): the excel file
+
+        Returns:
+            bool: whether the data has been read
+        """
+
+        for v in self._excel_files:
+            if v[0] == excel_file:
+                return v[2] is not None
+
+        return False
+
+    def reimport_excel_file(self, excel_file):
+        """Read again an excel file which has been modified since it was added to the model.
+
+        Only the group sheets and the days which changed are read again and patched in the stored data. The groups
+        defined for the file are kept and the statistics depending on the changed days are marked as stale.
+
+        Args:
+            excel_file (str): the excel file
+
+        Returns:
+            list of str: the days whose data changed
+
+        Raises:
+            ExcelFileModelError: if the file could not be read
+        """
+
+        if excel_file not in self.excel_files:
+            raise ExcelFileModelError('The file {} is not stored in the model'.format(excel_file))
+
+        row = self.excel_files.index(excel_file)
+        _, groups_model, cube, metadata = self._excel_files[row]
+
+        try:
+            # The data of a lazily added file has not been read yet, hence only its metadata has to be updated
+            if cube is None:
+                metadata = read_excel_file_metadata(excel_file)
+                groups_model.set_metadata(metadata)
+                self._excel_files[row][3] = metadata
+                return []
+
+            data_frame, metadata, changed_days = update_excel_file(excel_file, cube.to_data_frame()[0], metadata)
+        except ExcelReaderError as error:
+            raise ExcelFileModelError(str(error))
+
+        if changed_days == {}:
+            logging.info('The file {} did not change'.format(excel_file))
+            return []
+
+        if changed_days is None:
+            logging.info('The structure of {} changed. The whole file has been read again'.format(excel_file))
+            days = list(metadata['days'])
+        else:
+            for sheet, sheet_days in changed_days.items():
+                logging.info('{}: sheet {} updated for day(s) {}'.format(excel_file, sheet, ', '.join(sheet_days) if sheet_days else '-'))
+            days = list(collections.OrderedDict.fromkeys([day for sheet_days in changed_days.values() for day in sheet_days]))
+
+        self._excel_files[row][2] = MonitoringCube.from_data_frame(data_frame, metadata)
+        self._excel_files[row][3] = metadata
+
+        workbook_cache.save(excel_file, data_frame, metadata)
+
+        groups_model.set_metadata(metadata)
+        groups_model.mark_stale(days)
+
+        return days
+
     def rowCount(self, parent=None):
         """Returns the number of samples.
         """
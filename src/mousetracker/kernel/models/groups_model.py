@@ -1,16 +1,14 @@
 import collections
+import functools
 import itertools
-import logging
-
-import numpy as np
-
-import pandas as pd
-
-import scikit_posthocs as sk
 
 from PyQt5 import QtCore, QtGui
 
+from mousetracker.kernel.data.group_index import GroupIndex
 from mousetracker.kernel.models.droppable_model import DroppableModel
+from mousetracker.kernel.statistics.group_statistics import (get_confidence_intervals_batch, get_permutation_tests, get_statistics_batch,
+                                                             get_statistics_zones, get_student_tests, get_student_tests_zones)
+from mousetracker.kernel.statistics.statistics_cache import statistics_cache
 from mousetracker.kernel.utils.progress_bar import progress_bar
 
 
@@ -20,14 +18,157 @@ class GroupsModel(QtCore.QAbstractListModel):
 
     selected = QtCore.Qt.UserRole + 2
 
-    def __init__(self, excel_dataframe, *args, **kwargs):
+    data_updated = QtCore.pyqtSignal(list)
+
+    contents_updated = QtCore.pyqtSignal()
+
+    # The versions of the groups of all the models such as two models never share a version
+    _versions = itertools.count()
+
+    def __init__(self, excel_file, metadata, load_cube, *args, **kwargs):
+        """Constructor.
+
+        Args:
+            excel_file (str): the excel file of the data
+            metadata (dict): the metadata of the data (days, properties, zones, animal ...)
+            load_cube (callable): the function which returns the data as a cube. The data is read only when first
+                needed.
+        """
 
         super(GroupsModel, self).__init__(*args, **kwargs)
 
-        self._excel_dataframe = excel_dataframe
+        self._excel_file = excel_file
+
+        self._metadata = metadata
+
+        self._load_cube = load_cube
 
         self._groups = []
 
+        self._group_index = None
+
+        self._version = next(GroupsModel._versions)
+
+    def _get_cached_batch(self, kind, compute, selected_properties, zones):
+        """Return some results per property from the statistics cache. The properties which are not cached are computed
+        together and cached.
+
+        Args:
+            kind (str): the kind of results
+            compute (callable): the function which computes the results of some properties from the group index
+            selected_properties (list of str): the selected properties
+            zones (list of tuples): the zones
+
+        Returns:
+            collections.OrderedDict: the results per property
+        """
+
+        zones_key = tuple(tuple(zone) for zone in zones)
+
+        results = {}
+        for prop in selected_properties:
+            cached_results = statistics_cache.get((self._excel_file, kind, prop, zones_key, self._version))
+            if cached_results is not None:
+                results[prop] = cached_results
+
+        missing_properties = [prop for prop in selected_properties if prop not in results]
+        if missing_properties:
+            for prop, prop_results in compute(self.group_index, missing_properties, zones).items():
+                statistics_cache.put((self._excel_file, kind, prop, zones_key, self._version), prop_results)
+                results[prop] = prop_results
+
+        return collections.OrderedDict([(prop, results[prop]) for prop in selected_properties])
+
+    def _get_cached_tests(self, kind, compute, selected_property, zones, days):
+        """Return some tests per zone and per day from the statistics cache. The zones with missing days are computed
+        together and cached.
+
+        Args:
+            kind (str): the kind of tests
+            compute (callable): the function which computes the tests of some zones for some days
+            selected_property (str): the selected property
+            zones (list of tuples): the zones
+            days (list of str): the days. If None, all the days.
+
+        Returns:
+            collections.OrderedDict: the p values matrix per zone and per day
+        """
+
+        days = [day for day in self.days if days is None or day in days]
+
+        def key(zone, day):
+            return (self._excel_file, kind, selected_property, tuple(zone), day, self._version)
+
+        tests = collections.OrderedDict()
+        missing_zones = []
+        missing_days = set()
+        for zone in zones:
+            name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+            tests[name] = collections.OrderedDict()
+            for day in days:
+                tests[name][day] = statistics_cache.get(key(zone, day))
+                if tests[name][day] is None:
+                    missing_days.add(day)
+                    if zone not in missing_zones:
+                        missing_zones.append(zone)
+
+        if missing_zones:
+            progress_bar.reset(len(missing_zones))
+            computed_tests = compute(missing_zones, [day for day in days if day in missing_days])
+            for zone in missing_zones:
+                name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+                for day, dataframe in computed_tests[name].items():
+                    statistics_cache.put(key(zone, day), dataframe)
+                    if day in tests[name]:
+                        tests[name][day] = dataframe
+
+        return tests
+
+    def _on_group_contents_changed(self, model, *args):
+        """Event handler called when the animals of a group changed. Only the added and removed animals are taken into
+        account in the group index and the version of the groups is incremented such as the cached statistics are not
+        used anymore.
+
+        Args:
+            model (mousetracker.kernel.models.droppable_model.DroppableModel): the contents of the group
+        """
+
+        self._version = next(GroupsModel._versions)
+
+        # When the index has been dropped, it is built again the next time it is needed
+        if self._group_index is not None:
+            for row, (_, group_model, _) in enumerate(self._groups):
+                if group_model is model:
+                    self._group_index.update_group(row, list(model.items))
+                    break
+            else:
+                self._group_index = None
+
+        self.contents_updated.emit()
+
+    def _on_groups_changed(self, *args):
+        """Event handler called when the groups or their contents changed. The group index is built again the next time
+        it is needed and the version of the groups is incremented such as the cached statistics are not used anymore.
+        """
+
+        self._group_index = None
+
+        self._version = next(GroupsModel._versions)
+
+    def _watch_group_contents(self, model):
+        """Track the changes of the contents of a group.
+
+        Args:
+            model (mousetracker.kernel.models.droppable_model.DroppableModel): the contents of the group
+        """
+
+        on_group_contents_changed = functools.partial(self._on_group_contents_changed, model)
+
+        model.rowsInserted.connect(on_group_contents_changed)
+        model.rowsRemoved.connect(on_group_contents_changed)
+        model.layoutChanged.connect(on_group_contents_changed)
+        model.modelReset.connect(on_group_contents_changed)
+
     def add_group(self, group_name, selected=True):
         """Add a new group to the model.
 
@@ -41,10 +182,15 @@ class GroupsModel(QtCore.QAbstractListModel):
 
         self.beginInsertRows(QtCore.QModelIndex(), self.rowCount(), self.rowCount())
 
-        self._groups.append([group_name, DroppableModel(self), selected])
+        model = DroppableModel(self)
+        self._watch_group_contents(model)
+
+        self._groups.append([group_name, model, selected])
 
         self.endInsertRows()
 
+        self._on_groups_changed()
+
     def clear(self):
         """Clear the model.
         """
@@ -53,7 +199,7 @@ class GroupsModel(QtCore.QAbstractListModel):
 
     def get_zones_combinations(self):
 
-        zones = self._excel_dataframe.zones
+        zones = self._metadata['zones']
 
         combinations = []
         for i in range(1, len(zones)+1):
@@ -66,31 +212,52 @@ class GroupsModel(QtCore.QAbstractListModel):
         """Return the zones used for the statistics.
         """
 
-        animal = self._excel_dataframe.animal
-
-        if animal == 'Souris':
-            return [('A', 'B', 'C', 'D', 'E'), ('A', 'B', 'C', 'D'), ('A', 'B'), ('C', 'D'), ('E',)]
-        elif animal == 'Lapins':
-            return [('G', 'D'), ('G',), ('D',)]
-        else:
-            return []
+        return get_statistics_zones(self._metadata['animal'])
 
     def get_student_tests_zones(self):
         """Return the zones used for the student tests.
         """
 
-        animal = self._excel_dataframe.animal
+        return get_student_tests_zones(self._metadata['animal'])
 
-        if animal == 'Souris':
-            return [('A', 'B', 'C', 'D'), ('A', 'B'), ('C', 'D'), ('E',)]
-        elif animal == 'Lapins':
-            return [('G',), ('D')]
-        else:
-            return []
+    def get_cached_results(self, selected_property):
+        """Return the results of a selected property for the export zones which are in the statistics cache. The
+        missing results are not computed.
+
+        Args:
+            selected_property (str): the selected property
+
+        Returns:
+            dict: the cached statistics, confidence intervals and student tests of the property per kind
+        """
+
+        results = {}
+
+        zones_key = tuple(tuple(zone) for zone in self.get_statistics_zones())
+        for kind in ['statistics', 'confidence intervals']:
+            cached_results = statistics_cache.get((self._excel_file, kind, selected_property, zones_key, self._version))
+            if cached_results is not None:
+                results[kind] = cached_results
+
+        student_tests = collections.OrderedDict()
+        for zone in self.get_student_tests_zones():
+            name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+            student_tests[name] = collections.OrderedDict()
+            for day in self.days:
+                dataframe = statistics_cache.get((self._excel_file, 'student tests', selected_property, tuple(zone), day, self._version))
+                if dataframe is None:
+                    return results
+                student_tests[name][day] = dataframe
+
+        results['student tests'] = student_tests
+
+        return results
 
     def get_statistics(self, selected_property, zones):
         """Average the data for a selected property for different zones
 
+        The statistics are cached until the groups change. The returned statistics must not be modified.
+
         Args:
             selected_property (str): the selected property
             zones (list of tuples): the zones for which the average should be computed
@@ -99,92 +266,153 @@ class GroupsModel(QtCore.QAbstractListModel):
             collections.OrderedDict: the average data per group
         """
 
-        animal = self._excel_dataframe.animal
-        days = self._excel_dataframe.days
-        properties = ['{}-{}'.format(day, selected_property) for day in days]
+        return self.get_statistics_batch([selected_property], zones)[selected_property]
 
-        statistics = {}
-        statistics['mean'] = collections.OrderedDict()
-        statistics['std'] = collections.OrderedDict()
-        statistics['n'] = collections.OrderedDict()
+    def get_statistics_batch(self, selected_properties, zones):
+        """Average the data for several properties for different zones. The properties which are not cached are
+        computed together.
 
-        # Loop over the group
-        for i, (group_name, model, selected) in enumerate(self._groups):
+        The statistics are cached until the groups change. The returned statistics must not be modified.
 
-            # If the group is not selected, skip it
-            if not selected:
-                continue
+        Args:
+            selected_properties (list of str): the selected properties
+            zones (list of tuples): the zones for which the average should be computed
 
-            # Fetch from mice that compose the running group
-            mice_in_group = [model.data(model.index(i, 0), QtCore.Qt.DisplayRole) for i in range(model.rowCount())]
+        Returns:
+            collections.OrderedDict: the average data per group for each property
+        """
 
-            mean_df = pd.DataFrame(index=days)
-            std_df = pd.DataFrame(index=days)
-            n_df = pd.DataFrame(index=days)
-            # Loop over the zone
-            for tz in zones:
-                # Build a filter for filtering the data frame for the selected mice and zones
-                fylter = self._excel_dataframe[animal].isin(mice_in_group) & self._excel_dataframe['Zone'].isin(tz)
+        return self._get_cached_batch('statistics', get_statistics_batch, selected_properties, zones)
 
-                name = ''.join(tz)
-                mean_df[name] = self._excel_dataframe[fylter][properties].apply(np.nanmean, axis=0).values
-                std_df[name] = self._excel_dataframe[fylter][properties].apply(np.nanstd, axis=0).values
-                n_df[name] = len(mice_in_group)
+    def get_confidence_intervals(self, selected_property, zones):
+        """Compute the bootstrap confidence intervals of the averages of a selected property for different zones.
 
-            statistics['mean'][group_name] = mean_df.T
-            statistics['std'][group_name] = std_df.T
-            statistics['n'][group_name] = n_df.T
+        The confidence intervals are cached until the groups change. The returned confidence intervals must not be
+        modified.
 
-        return statistics
+        Args:
+            selected_property (str): the selected property
+            zones (list of tuples): the zones for which the confidence intervals should be computed
 
-    def get_student_tests(self, selected_property, zones):
-        """Compute the student test for a selected property.
+        Returns:
+            dict: the lower and upper bounds per group
         """
 
-        student_tests = collections.OrderedDict()
+        return self.get_confidence_intervals_batch([selected_property], zones)[selected_property]
+
+    def get_confidence_intervals_batch(self, selected_properties, zones):
+        """Compute the bootstrap confidence intervals of the averages of several properties for different zones. The
+        properties which are not cached are computed together.
+
+        The confidence intervals are cached until the groups change. The returned confidence intervals must not be
+        modified.
 
-        animal = self._excel_dataframe.animal
+        Args:
+            selected_properties (list of str): the selected properties
+            zones (list of tuples): the zones for which the confidence intervals should be computed
 
-        days = self._excel_dataframe.days
+        Returns:
+            collections.OrderedDict: the lower and upper bounds per group for each property
+        """
 
-        progress_bar.reset(len(zones))
+        return self._get_cached_batch('confidence intervals', get_confidence_intervals_batch, selected_properties, zones)
 
-        for izone, zone in enumerate(zones):
+    def get_permutation_tests(self, selected_property, zones, days=None):
+        """Compute the permutation tests for a selected property. The zones which are not cached are computed for all
+        the days.
 
-            name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+        The permutation tests are cached until the groups change. The returned permutation tests must not be modified.
 
-            student_tests[name] = collections.OrderedDict()
+        Args:
+            selected_property (str): the selected property
+            zones (list of tuples): the zones for which the permutation tests should be computed
+            days (list of str): the days for which the permutation tests should be computed. If None, the permutation
+                tests are computed for all the days.
 
-            for day in days:
+        Returns:
+            collections.OrderedDict: the p values matrix per zone and per day
+        """
+
+        def compute(missing_zones, missing_days):
+            return get_permutation_tests(self.group_index, selected_property, missing_zones, callback=progress_bar.update)
+
+        return self._get_cached_tests('permutation tests', compute, selected_property, zones, days)
+
+    def get_student_tests(self, selected_property, zones, parallel=False, days=None):
+        """Compute the student test for a selected property. Only the zones and days which are not cached are
+        computed.
+
+        The student tests are cached until the groups change. The returned student tests must not be modified.
+
+        Args:
+            selected_property (str): the selected property
+            zones (list of tuples): the zones for which the student tests should be computed
+            parallel (bool): whether the tests should be computed by a pool of processes
+            days (list of str): the days for which the student tests should be computed. If None, the student tests are
+                computed for all the days.
+
+        Returns:
+            collections.OrderedDict: the p values matrix per zone and per day
+        """
+
+        def compute(missing_zones, missing_days):
+            return get_student_tests(self.group_index,
+                                     selected_property,
+                                     missing_zones,
+                                     callback=progress_bar.update,
+                                     parallel=parallel,
+                                     days=missing_days)
+
+        return self._get_cached_tests('student tests', compute, selected_property, zones, days)
+
+    @property
+    def contents(self):
+        """Return the contents of the groups.
+
+        Returns:
+            list of 3-tuples: the name, the animals and the selection state of each group
+        """
+
+        contents = []
+        for group_name, model, selected in self._groups:
+            mice_in_group = [model.data(model.index(i, 0), QtCore.Qt.DisplayRole) for i in range(model.rowCount())]
+            contents.append((group_name, mice_in_group, selected))
 
-                prop = '{}-{}'.format(day, selected_property)
+        return contents
 
-                value_per_group = pd.DataFrame(columns=['groups', 'values'])
+    @property
+    def cube(self):
+        """Return the data of the groups. The data is read if this has not been done yet.
 
-                selected_group_names = []
+        Returns:
+            mousetracker.kernel.data.monitoring_cube.MonitoringCube: the data
+        """
 
-                for i, (group_name, model, selected) in enumerate(self._groups):
+        return self._load_cube()
 
-                    if not selected:
-                        continue
+    @property
+    def group_index(self):
+        """Return the index of the positions of the animals of each group in the data. The index is built only when
+        the groups changed since the last call.
 
-                    selected_group_names.append(group_name)
-                    mice_in_group = [model.data(model.index(i, 0), QtCore.Qt.DisplayRole) for i in range(model.rowCount())]
+        Returns:
+            mousetracker.kernel.data.group_index.GroupIndex: the index
+        """
 
-                    fylter = self._excel_dataframe[animal].isin(mice_in_group) & self._excel_dataframe['Zone'].isin(zone)
-                    for v in self._excel_dataframe[prop][fylter]:
-                        value_per_group = pd.concat([value_per_group, pd.DataFrame([[group_name, v]], columns=['groups', 'values'])])
+        if self._group_index is None:
+            self._group_index = GroupIndex(self.cube, self.contents)
 
-                try:
-                    student_tests[name][day] = sk.posthoc_ttest(value_per_group, val_col='values', group_col='groups', p_adjust='holm')
-                except:
-                    logging.error('Can not compute student test for group {} and day {}. Skip it.'.format(name, day))
-                    student_tests[name][day] = pd.DataFrame(np.nan, index=selected_group_names, columns=selected_group_names)
-                    continue
+        return self._group_index
 
-            progress_bar.update(izone+1)
+    @property
+    def days(self):
+        """Return the days of the data.
 
-        return student_tests
+        Returns:
+            list of str: the days
+        """
+
+        return list(self._metadata['days'])
 
     def data(self, index, role):
         """Get the data at a given index for a given role.
@@ -267,11 +495,49 @@ class GroupsModel(QtCore.QAbstractListModel):
             samples_per_group_model = DroppableModel()
             for sample in samples:
                 samples_per_group_model.add_item(sample)
+            self._watch_group_contents(samples_per_group_model)
 
             self._groups.append([group, samples_per_group_model, True])
 
+        self._on_groups_changed()
+
         self.layoutChanged.emit()
 
+    def mark_stale(self, days):
+        """Notify that the data changed for some days such as the statistics computed so far for those days are stale.
+
+        Args:
+            days (list of str): the days whose data changed
+        """
+
+        if days:
+            self.data_updated.emit(list(days))
+
+    def put_cached_results(self, selected_property, results, version):
+        """Store in the statistics cache the results of a selected property for the export zones which have been
+        computed outside of the model, for example by a background job.
+
+        Args:
+            selected_property (str): the selected property
+            results (dict): the statistics, confidence intervals and student tests of the property per kind
+            version (int): the version of the groups for which the results have been computed. The results are not
+                stored if the groups changed since.
+        """
+
+        if version != self._version:
+            return
+
+        zones_key = tuple(tuple(zone) for zone in self.get_statistics_zones())
+        for kind in ['statistics', 'confidence intervals']:
+            if kind in results:
+                statistics_cache.put((self._excel_file, kind, selected_property, zones_key, self._version), results[kind])
+
+        if 'student tests' in results:
+            for zone in self.get_student_tests_zones():
+                name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+                for day, dataframe in results['student tests'][name].items():
+                    statistics_cache.put((self._excel_file, 'student tests', selected_property, tuple(zone), day, self._version), dataframe)
+
     @ property
     def reduced_data(self):
         """Returns the reduced data.
@@ -303,11 +569,14 @@ class GroupsModel(QtCore.QAbstractListModel):
             del self._groups[idx]
             self.endRemoveRows()
 
+        self._on_groups_changed()
+
     def reset(self):
         """Reset the model.
         """
 
         self._groups = []
+        self._on_groups_changed()
         self.layoutChanged.emit()
 
     def rowCount(self, parent=None):
@@ -316,6 +585,18 @@ class GroupsModel(QtCore.QAbstractListModel):
 
         return len(self._groups)
 
+    def set_metadata(self, metadata):
+        """Set the metadata of the data (e.g. after the excel file has been read again).
+
+        Args:
+            metadata (dict): the metadata of the data (days, properties, zones, animal ...)
+        """
+
+        self._metadata = metadata
+
+        # The data has been read again
+        self._on_groups_changed()
+
     def setData(self, index, value, role):
         """Set the data for a given index and given role.
 
@@ -335,6 +616,8 @@ class GroupsModel(QtCore.QAbstractListModel):
 
             self._groups[row][0] = value
 
+        self._on_groups_changed()
+
         return super(GroupsModel, self).setData(index, value, role)
 
     def sort(self):
@@ -342,4 +625,15 @@ class GroupsModel(QtCore.QAbstractListModel):
         """
 
         self._groups.sort(key=lambda x: x[0])
+        self._on_groups_changed()
         self.layoutChanged.emit()
+
+    @property
+    def version(self):
+        """Return the version of the groups. The version is incremented each time the groups or their contents change.
+
+        Returns:
+            int: the version
+        """
+
+        return self._version
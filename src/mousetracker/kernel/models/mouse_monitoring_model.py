@@ -9,11 +9,13 @@ from mousetracker.kernel.models.pandas_data_model import PandasDataModel
 
 class MouseMonitoringModel(PandasDataModel):
 
-    def __init__(self, parent, data_frame=None):
+    def __init__(self, parent, data_frame=None, metadata=None):
         """Constructor.
         """
         super(MouseMonitoringModel, self).__init__(parent, data_frame)
 
+        self._metadata = metadata
+
     def data(self, index, role=QtCore.Qt.DisplayRole):
 
         if not index.isValid():
@@ -35,14 +37,13 @@ class MouseMonitoringModel(PandasDataModel):
             row = index.row()
             col = index.column()
 
-            animal = self._data_frame.animal
+            animal = self._metadata['animal']
 
             # Compute the mouse number as it appears in the 'Souris' column
             animal_id = self._data_frame.iloc[row, 0]
             df = self._data_frame[self._data_frame[animal] == animal_id]
-            n_days = self._data_frame.n_days
-            n_properties = self._data_frame.n_properties
-            n_header_properties = self._data_frame.n_header_properties
+            n_properties = self._metadata['n_properties']
+            n_header_properties = self._metadata['n_header_properties']
 
             if col >= n_header_properties:
 
@@ -67,3 +68,15 @@ class MouseMonitoringModel(PandasDataModel):
                 return QtGui.QBrush(QtCore.Qt.white)
 
         return None
+
+    def set_data_frame(self, data_frame, metadata):
+        """Set the data frame.
+
+        Args:
+            data_frame (pandas.DataFrame): the data frame
+            metadata (dict): the metadata of the data frame (days, properties, zones, animal ...)
+        """
+
+        self._metadata = metadata
+
+        super(MouseMonitoringModel, self).set_data_frame(data_frame)
@@ -0,0 +1,33 @@
+"""This module implements the following classes and functions:
+    - read_columnar_bundle
+"""
+
+import collections
+import json
+import os
+
+from pyarrow import feather
+
+
+def read_columnar_bundle(directory, memory_map=True):
+    """Read a bundle written by export_columnar_bundle.
+
+    Args:
+        directory (str): the directory of the bundle
+        memory_map (bool): whether the tables should be memory-mapped instead of being read in memory
+
+    Returns:
+        2-tuple: the manifest and the tables (pyarrow.Table) per name. A table can be converted with to_pandas.
+
+    Raises:
+        FileNotFoundError: if the directory is not a complete bundle
+    """
+
+    with open(os.path.join(directory, 'manifest.json'), 'r') as fin:
+        manifest = json.load(fin)
+
+    tables = collections.OrderedDict()
+    for name, table in manifest['tables'].items():
+        tables[name] = feather.read_table(os.path.join(directory, table['file']), memory_map=memory_map)
+
+    return manifest, tables
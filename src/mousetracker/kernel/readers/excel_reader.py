@@ -0,0 +1,713 @@
+"""This module implements the following classes and functions:
+    - ExcelReaderError
+    - normalize_sheet
+    - read_excel_file
+    - read_excel_file_metadata
+    - read_excel_files
+    - read_sheet
+    - rename_duplicates
+    - sheet_fingerprints
+    - update_excel_file
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+import posixpath
+import queue
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+
+import openpyxl
+from openpyxl.cell.cell import ERROR_CODES
+
+import numpy as np
+
+import pandas as pd
+
+# The version of the parser. Must be increased each time a change in the parser modifies the data read from the files.
+PARSER_VERSION = 2
+
+# The strings which are interpreted as missing values by pandas.read_excel
+NA_VALUES = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                       '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+
+
+# The queue used by the processes of read_excel_files to report their progress
+_progress_queue = None
+
+
+class ExcelReaderError(Exception):
+    pass
+
+
+def _convert_cell(value):
+    """Convert the value of an excel cell the same way pandas.read_excel does.
+
+    Args:
+        value (any): the value of the cell
+
+    Returns:
+        any: the converted value
+    """
+
+    if value is None:
+        return ''
+
+    if isinstance(value, str) and value in ERROR_CODES:
+        return np.nan
+
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+
+    return value
+
+
+def _fill_header(row, control_row):
+    """Forward fill the blank cells of a header row, those cells being usually coming from merged cells.
+
+    Args:
+        row (list): the header row
+        control_row (list of bool): the columns for which the forward fill is still allowed
+
+    Returns:
+        tuple: the filled row and the updated control row
+    """
+
+    last = row[0]
+    for i in range(1, len(row)):
+        if not control_row[i]:
+            last = row[i]
+
+        if row[i] == '':
+            row[i] = last
+        else:
+            control_row[i] = False
+            last = row[i]
+
+    return row, control_row
+
+
+def _to_array(values):
+    """Convert a column of cell values to a numpy array whose type is inferred the same way pandas.read_excel does.
+
+    Args:
+        values (list): the values of the column
+
+    Returns:
+        numpy.ndarray: the column
+    """
+
+    values = [np.nan if isinstance(v, str) and v in NA_VALUES else v for v in values]
+
+    if values and all(type(v) is int for v in values):
+        return np.array(values, dtype=np.int64)
+
+    if values and all(type(v) is bool for v in values):
+        return np.array(values, dtype=bool)
+
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    return pd.Series(values, dtype=object).infer_objects().to_numpy()
+
+
+def read_sheet(sheet, head=False):
+    """Read a group sheet whose two first rows make the header of the data.
+
+    The sheet rows are streamed once and the resulting data frame is the same as the one returned by
+    pandas.read_excel(excel_file, sheet_name=sheet, header=(0, 1)).
+
+    Args:
+        sheet (openpyxl.worksheet._read_only.ReadOnlyWorksheet): the sheet
+        head (bool): if True, the streaming stops after the first animal block (i.e. when the first zone comes back),
+            which is enough to get the metadata of the sheet
+
+    Returns:
+        pandas.DataFrame: the contents of the sheet
+    """
+
+    sheet.reset_dimensions()
+
+    rows = []
+    last_row_with_data = -1
+    first_zone = None
+    for i, row in enumerate(sheet.iter_rows(values_only=True)):
+        row = [_convert_cell(v) for v in row]
+        if head and i >= 2:
+            zone = row[2] if len(row) > 2 else ''
+            if i == 2:
+                first_zone = zone
+            elif zone == first_zone:
+                break
+        # Trim the trailing empty cells
+        while row and row[-1] == '':
+            row.pop()
+        if row:
+            last_row_with_data = i
+        rows.append(row)
+    rows = rows[:last_row_with_data+1]
+
+    if len(rows) < 2:
+        raise ExcelReaderError('Sheet {} has no header'.format(sheet.title))
+
+    n_columns = max(len(row) for row in rows)
+    rows = [row + [''] * (n_columns - len(row)) for row in rows]
+
+    # Build the 2-levels columns in the same way as pandas does
+    control_row = [True] * n_columns
+    header = []
+    for level in range(2):
+        if level == 0:
+            rows[level], control_row = _fill_header(rows[level], control_row)
+        header.append(['Unnamed: {}_level_{}'.format(i, level) if v == '' else v for i, v in enumerate(rows[level])])
+    columns = list(zip(*header))
+
+    # Mangle the duplicate columns (e.g. Temp, Temp.1, Temp.2 ...)
+    counts = collections.defaultdict(int)
+    for i, col in enumerate(columns):
+        cur_count = counts[col]
+        while cur_count > 0:
+            counts[col] = cur_count + 1
+            col = col[:-1] + ('{}.{}'.format(col[-1], cur_count),)
+            cur_count = counts[col]
+        columns[i] = col
+        counts[col] = cur_count + 1
+
+    body = rows[2:]
+
+    data = collections.OrderedDict()
+    for i, values in enumerate(zip(*body)):
+        data[i] = _to_array(values)
+
+    if not body:
+        data = collections.OrderedDict((i, np.array([], dtype=object)) for i in range(n_columns))
+
+    df = pd.DataFrame(data)
+    df.columns = pd.MultiIndex.from_tuples(columns)
+
+    return df
+
+
+def _same_values(a, b):
+    """Return true if two columns hold the same values, NaN being equal to NaN.
+
+    Args:
+        a (numpy.ndarray): the first column
+        b (numpy.ndarray): the second column
+
+    Returns:
+        bool: whether the columns are equal
+    """
+
+    if len(a) != len(b):
+        return False
+
+    try:
+        return np.array_equal(a.astype(np.float64), b.astype(np.float64), equal_nan=True)
+    except (TypeError, ValueError):
+        return pd.Series(a, dtype=object).equals(pd.Series(b, dtype=object))
+
+
+def _fill_blocks(df, columns, n_animals, n_zones):
+    """Propagate the values written in the first row of each animal block to the other rows (i.e. zones) of the block.
+
+    Args:
+        df (pandas.DataFrame): the data frame to fill in place
+        columns (list): the columns to fill
+        n_animals (int): the number of animals
+        n_zones (int): the number of zones per animal
+    """
+
+    n_rows = n_animals*n_zones
+
+    rows = np.arange(len(df.index))
+    rows[:n_rows] = np.repeat(np.arange(0, n_rows, n_zones), n_zones)
+
+    df[columns] = df[columns].iloc[rows].set_axis(df.index, axis=0)
+
+
+def normalize_sheet(df):
+    """Normalize the raw contents of a group sheet.
+
+    The animal number and the weight which are written only for the first zone of each animal are expanded to the
+    other zones, the properties written through two columns are averaged and the columns are flattened to day-property.
+
+    Args:
+        df (pandas.DataFrame): the raw contents of the sheet as returned by read_sheet
+
+    Returns:
+        tuple: the normalized data frame and the metadata of the sheet
+    """
+
+    # Find the number of zones (this must always be the 3rd column of the file)
+    zones = list(collections.OrderedDict.fromkeys(df.iloc[:, 2]))
+    n_zones = len(zones)
+
+    # Retrieve the name of the animal (e.g. Lapin, Souris). Take care this is a 2-level column name
+    animal = df.columns[1][1]
+
+    # For rabbit files there is an extra header column (Exposé)
+    n_header_properties = 3 if animal == 'Lapins' else 2
+
+    n_animals = len(df.index)//n_zones
+
+    # Drop the first column
+    df = df.drop(('Unnamed: 0_level_0', 'Num expé'), axis=1)
+
+    # Expand the souris number for all zones and not only zone A such as zone A B C D E for a given mouse have the same mouse number
+    _fill_blocks(df, [('Unnamed: 1_level_0', animal)], n_animals, n_zones)
+    df[('Unnamed: 1_level_0', animal)] = df[('Unnamed: 1_level_0', animal)].astype(int)
+
+    # Find the unique days
+    days = [col[0] for col in df.columns[n_header_properties:]]
+    days = list(collections.OrderedDict.fromkeys(days))
+
+    # Find the duplicate properties i.e. the ones which are written through two columns in the excel file
+    duplicate_properties = []
+    for _, prop in df.columns[n_header_properties:]:
+        if prop.strip()[-2:] == '.1':
+            prop = prop.split('.1')[0]
+            if prop not in duplicate_properties:
+                duplicate_properties.append(prop)
+
+    # Expand the Poids which is written in only one cell for all the days at once
+    _fill_blocks(df, [(day, 'Poids') for day in days], n_animals, n_zones)
+
+    # Average the duplicate properties for all the days at once
+    if duplicate_properties:
+        first_columns = [(day, p) for p in duplicate_properties for day in days]
+        second_columns = [(day, '{}.1'.format(p)) for p in duplicate_properties for day in days]
+
+        values = np.stack([df[first_columns].to_numpy(dtype=np.float64), df[second_columns].to_numpy(dtype=np.float64)])
+        mask = ~np.isnan(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df[first_columns] = np.where(mask, values, 0.0).sum(axis=0)/mask.sum(axis=0)
+
+        # Remove the second instance of the duplicate (the one that ends with .1)
+        df = df.drop(second_columns, axis=1)
+
+    columns = df.columns
+    columns = ['-'.join(col) for col in columns]
+    columns[0] = animal
+    columns[1] = 'Zone'
+    if animal == 'Lapins':
+        columns[2] = 'Exposé'
+    df.columns = columns
+
+    # Retrieve all the unique properties
+    properties = list(collections.OrderedDict.fromkeys([col.split('-')[-1] for col in df.columns[n_header_properties:]]))
+
+    metadata = collections.OrderedDict()
+    metadata['days'] = days
+    metadata['properties'] = properties
+    metadata['zones'] = zones
+    metadata['animal'] = animal
+    metadata['n_header_properties'] = n_header_properties
+
+    return df, metadata
+
+
+def rename_duplicates(names):
+    """Rename the animals which share the same name. The duplicates of 1 are renamed 1_1, 1_2 ...
+
+    Args:
+        names (list): the names of the animals
+
+    Returns:
+        list of str: the renamed animals
+    """
+
+    counts = collections.Counter(names)
+
+    occurrences = collections.defaultdict(int)
+
+    renamed = []
+    for name in names:
+        if counts[name] > 1:
+            occurrences[name] += 1
+            renamed.append('{}_{}'.format(name, occurrences[name]))
+        else:
+            renamed.append(str(name))
+
+    return renamed
+
+
+def read_excel_file(excel_file, callback=None):
+    """Read a monitoring excel file. Only the sheets whose name starts with 'groupe' are read.
+
+    The workbook is opened only once in read-only mode and each group sheet is streamed into the data frame.
+
+    Args:
+        excel_file (str): the excel file
+        callback (callable): if not None, called with the number of sheets read so far and the total number of sheets
+
+    Returns:
+        tuple: the data frame and its metadata (days, properties, zones, animal ...)
+    """
+
+    try:
+        workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+    except Exception:
+        raise ExcelReaderError('The file {} could not be opened'.format(excel_file))
+
+    try:
+        group_sheets = [sheet for sheet in workbook.sheetnames if re.match(r'^groupe.*', sheet.strip(), re.I)]
+        if not group_sheets:
+            raise ExcelReaderError('The file {} does not contain any group sheet'.format(excel_file))
+
+        data_frame = pd.DataFrame([])
+
+        n_rows = []
+
+        for i, group_sheet in enumerate(group_sheets):
+
+            # Any exception must be caught here
+            try:
+
+                # Read the excel spreadsheet
+                df = read_sheet(workbook[group_sheet])
+
+                df, sheet_metadata = normalize_sheet(df)
+
+                data_frame = pd.concat([data_frame, df])
+
+                n_rows.append(len(df.index))
+
+            except Exception:
+                raise ExcelReaderError('The file {} could not be properly imported'.format(excel_file))
+
+            if callback is not None:
+                callback(i+1, len(group_sheets))
+
+    finally:
+        workbook.close()
+
+    zones = sheet_metadata['zones']
+    n_zones = len(zones)
+    animal = sheet_metadata['animal']
+
+    n_total_animals = len(data_frame.index)//n_zones
+
+    # Check and correct for redundant animal names
+    data_frame[animal] = data_frame[animal].astype(int)
+    animal_names = data_frame[animal].to_numpy(dtype=object)
+    animal_names[:n_total_animals*n_zones] = np.repeat(rename_duplicates(animal_names[:n_total_animals*n_zones:n_zones]), n_zones)
+    data_frame[animal] = animal_names
+
+    data_frame = data_frame.round(1)
+
+    metadata = collections.OrderedDict()
+    metadata['n_days'] = len(sheet_metadata['days'])
+    metadata['days'] = sheet_metadata['days']
+    metadata['n_properties'] = len(sheet_metadata['properties'])
+    metadata['properties'] = sheet_metadata['properties']
+    metadata['n_zones'] = n_zones
+    metadata['zones'] = zones
+    metadata['animal'] = animal
+    metadata['n_header_properties'] = sheet_metadata['n_header_properties']
+
+    # Keep track of the rows and of the fingerprint of each group sheet for the incremental re-import
+    fingerprints = sheet_fingerprints(excel_file)
+    metadata['sheets'] = [[sheet, n, fingerprints.get(sheet)] for sheet, n in zip(group_sheets, n_rows)]
+
+    return data_frame, metadata
+
+
+def read_excel_file_metadata(excel_file):
+    """Read the metadata of a monitoring excel file without reading the data.
+
+    Only the header and the first animal block of the last group sheet are read, the metadata being the same as the
+    one returned by read_excel_file.
+
+    Args:
+        excel_file (str): the excel file
+
+    Returns:
+        collections.OrderedDict: the metadata (days, properties, zones, animal ...)
+    """
+
+    try:
+        workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+    except Exception:
+        raise ExcelReaderError('The file {} could not be opened'.format(excel_file))
+
+    try:
+        group_sheets = [sheet for sheet in workbook.sheetnames if re.match(r'^groupe.*', sheet.strip(), re.I)]
+        if not group_sheets:
+            raise ExcelReaderError('The file {} does not contain any group sheet'.format(excel_file))
+
+        try:
+            _, sheet_metadata = normalize_sheet(read_sheet(workbook[group_sheets[-1]], head=True))
+        except Exception:
+            raise ExcelReaderError('The file {} could not be properly imported'.format(excel_file))
+
+    finally:
+        workbook.close()
+
+    metadata = collections.OrderedDict()
+    metadata['n_days'] = len(sheet_metadata['days'])
+    metadata['days'] = sheet_metadata['days']
+    metadata['n_properties'] = len(sheet_metadata['properties'])
+    metadata['properties'] = sheet_metadata['properties']
+    metadata['n_zones'] = len(sheet_metadata['zones'])
+    metadata['zones'] = sheet_metadata['zones']
+    metadata['animal'] = sheet_metadata['animal']
+    metadata['n_header_properties'] = sheet_metadata['n_header_properties']
+
+    return metadata
+
+
+def sheet_fingerprints(excel_file):
+    """Return the fingerprint of each sheet of an excel file.
+
+    The fingerprint of a sheet is the hash of its XML part in the excel archive, hence it can be computed without
+    parsing the sheet. Any edit of a cell of the sheet changes its fingerprint.
+
+    Args:
+        excel_file (str): the excel file
+
+    Returns:
+        collections.OrderedDict: the fingerprint per sheet name. Empty if the fingerprints could not be computed
+        (e.g. not a xlsx file).
+    """
+
+    fingerprints = collections.OrderedDict()
+
+    try:
+        with zipfile.ZipFile(excel_file) as archive:
+            relationships = {}
+            for relationship in ET.fromstring(archive.read('xl/_rels/workbook.xml.rels')):
+                target = relationship.get('Target')
+                if target.startswith('/'):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join('xl', target))
+                relationships[relationship.get('Id')] = target
+
+            for element in ET.fromstring(archive.read('xl/workbook.xml')).iter():
+                if not element.tag.endswith('}sheet'):
+                    continue
+                r_id = [v for k, v in element.attrib.items() if k.endswith('}id')][0]
+                fingerprints[element.get('name')] = hashlib.sha1(archive.read(relationships[r_id])).hexdigest()
+
+    except Exception:
+        return collections.OrderedDict()
+
+    return fingerprints
+
+
+def update_excel_file(excel_file, data_frame, metadata):
+    """Update the data of an excel file previously read by read_excel_file after the file has been modified.
+
+    Only the group sheets whose fingerprint changed are read again and only the days whose values changed are patched
+    in place in the data frame, the days which were not in the data frame being appended. If the structure of the file
+    changed (group sheets added, removed or renamed, animals or zones changed), the whole file is read again.
+
+    Args:
+        excel_file (str): the excel file
+        data_frame (pandas.DataFrame): the data previously read from the excel file
+        metadata (dict): the metadata previously read from the excel file
+
+    Returns:
+        tuple: the updated data frame, its metadata and the changed days per changed sheet. The changed days are None
+        if the whole file has been read again.
+    """
+
+    fingerprints = sheet_fingerprints(excel_file)
+
+    group_sheets = [sheet for sheet in fingerprints if re.match(r'^groupe.*', sheet.strip(), re.I)]
+
+    sheets = metadata.get('sheets')
+    if not sheets or [sheet[0] for sheet in sheets] != group_sheets or any(sheet[2] is None for sheet in sheets):
+        return read_excel_file(excel_file) + (None,)
+
+    changed_days = collections.OrderedDict()
+
+    changed_sheets = [i for i, (sheet, _, fingerprint) in enumerate(sheets) if fingerprints[sheet] != fingerprint]
+    if not changed_sheets:
+        return data_frame, metadata, changed_days
+
+    animal = metadata['animal']
+    n_header_properties = metadata['n_header_properties']
+
+    offsets = np.cumsum([0] + [n_rows for _, n_rows, _ in sheets])
+
+    try:
+        workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+    except Exception:
+        raise ExcelReaderError('The file {} could not be opened'.format(excel_file))
+
+    try:
+        patches = []
+        for i in changed_sheets:
+            sheet = sheets[i][0]
+            try:
+                df, sheet_metadata = normalize_sheet(read_sheet(workbook[sheet]))
+            except Exception:
+                raise ExcelReaderError('The file {} could not be properly imported'.format(excel_file))
+
+            df = df.round(1)
+
+            start, stop = offsets[i], offsets[i+1]
+            block = data_frame.iloc[start:stop]
+
+            # The animals, the zones and the other header columns must be the same, otherwise read the whole file
+            same_structure = len(df.index) == len(block.index) and sheet_metadata['animal'] == animal
+            if same_structure:
+                names = [str(v) for v in df[animal]]
+                same_structure = all(old == new or old.startswith(new + '_') for old, new in zip(block[animal], names))
+            if same_structure:
+                same_structure = all(_same_values(block[col].to_numpy(), df[col].to_numpy()) for col in df.columns[1:n_header_properties])
+            if not same_structure:
+                patches = None
+                break
+
+            patches.append((i, sheet, df, sheet_metadata))
+
+    finally:
+        workbook.close()
+
+    if patches is None:
+        return read_excel_file(excel_file) + (None,)
+
+    n_rows = len(data_frame.index)
+
+    for i, sheet, df, sheet_metadata in patches:
+
+        start, stop = offsets[i], offsets[i+1]
+
+        # The columns appended while patching a previous sheet must be patched for this sheet as well
+        data_columns = list(data_frame.columns[n_header_properties:])
+        data_columns += [col for col in df.columns[n_header_properties:] if col not in data_frame.columns]
+
+        days = []
+        for col in data_columns:
+            new = df[col].to_numpy() if col in df.columns else np.full(stop - start, np.nan)
+            if col in data_frame.columns:
+                old = data_frame[col].to_numpy()
+                if _same_values(old[start:stop], new):
+                    continue
+            else:
+                old = np.full(n_rows, np.nan)
+
+            try:
+                dtype = np.result_type(old.dtype, new.dtype)
+            except TypeError:
+                dtype = object
+            patched = old.astype(dtype)
+            patched[start:stop] = new
+            data_frame[col] = patched
+
+            day = col.rsplit('-', 1)[0]
+            if day not in days:
+                days.append(day)
+
+        changed_days[sheet] = days
+
+        sheets[i][2] = fingerprints[sheet]
+
+        # As for read_excel_file, the metadata of the data is the one of the last sheet
+        if i == len(sheets) - 1:
+            metadata['n_days'] = len(sheet_metadata['days'])
+            metadata['days'] = sheet_metadata['days']
+            metadata['n_properties'] = len(sheet_metadata['properties'])
+            metadata['properties'] = sheet_metadata['properties']
+
+    return data_frame, metadata, changed_days
+
+
+def _init_worker(progress_queue):
+    """Initialize a process of the pool used by read_excel_files.
+
+    Args:
+        progress_queue (multiprocessing.Queue): the queue through which the progress of the reading is sent back
+    """
+
+    global _progress_queue
+
+    _progress_queue = progress_queue
+
+
+def _read_excel_file_in_worker(index, excel_file):
+    """Read an excel file from a process of the pool used by read_excel_files.
+
+    Args:
+        index (int): the index of the file
+        excel_file (str): the excel file
+
+    Returns:
+        tuple: the data frame and its metadata
+    """
+
+    callback = None
+    if _progress_queue is not None:
+        def callback(sheet, n_sheets):
+            _progress_queue.put((index, sheet, n_sheets))
+
+    return read_excel_file(excel_file, callback=callback)
+
+
+def read_excel_files(excel_files, n_workers=None, callback=None):
+    """Read several monitoring excel files in parallel using a pool of processes.
+
+    Stopping the iteration (e.g. on user cancellation) cancels the files which have not been started yet.
+
+    Args:
+        excel_files (list of str): the excel files
+        n_workers (int): the number of processes. If None, use as many processes as available cores.
+        callback (callable): if not None, called with the index of a file, the number of sheets read so far for that
+            file and its total number of sheets each time a sheet has been read
+
+    Yields:
+        tuple: the index of the file in excel_files and the result of read_excel_file or the exception raised when
+        reading the file. The files are yielded in the order of completion.
+    """
+
+    if not excel_files:
+        return
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(excel_files))
+
+    # Spawn the processes rather than forking the (possibly multi-threaded) application
+    context = multiprocessing.get_context('spawn')
+
+    progress_queue = context.Queue() if callback is not None else None
+
+    def flush_progress():
+        while progress_queue is not None:
+            try:
+                callback(*progress_queue.get_nowait())
+            except queue.Empty:
+                break
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=n_workers,
+                                                      mp_context=context,
+                                                      initializer=_init_worker,
+                                                      initargs=(progress_queue,))
+    try:
+        futures = {executor.submit(_read_excel_file_in_worker, i, excel_file): i for i, excel_file in enumerate(excel_files)}
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, timeout=0.1, return_when=concurrent.futures.FIRST_COMPLETED)
+            flush_progress()
+            # The yielded futures and results are dropped such as they do not keep the data of their file in memory
+            while done:
+                future = done.pop()
+                try:
+                    result = future.result()
+                except Exception as error:
+                    result = error
+                index = futures.pop(future)
+                del future
+                yield index, result
+                del result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if progress_queue is not None:
+            progress_queue.close()
@@ -0,0 +1,381 @@
+"""This module implements the following classes and functions:
+    - WorkbookCache
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import pandas as pd
+
+from mousetracker.kernel.readers.excel_reader import PARSER_VERSION, read_excel_file, read_excel_files
+
+
+def default_cache_directory():
+    """Return the default directory of the cache depending on the platform.
+
+    The directory can be set with the MOUSETRACKER_CACHE_DIR environment variable.
+
+    Returns:
+        str: the directory
+    """
+
+    directory = os.environ.get('MOUSETRACKER_CACHE_DIR')
+    if directory:
+        return directory
+
+    if os.name == 'nt':
+        root = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        root = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+
+    return os.path.join(root, 'mousetracker', 'workbooks')
+
+
+class WorkbookCache:
+    """This class implements an on-disk cache of the data read from the excel files.
+
+    The entries are keyed by the hash of the contents of the excel file and by the version of the parser, hence a
+    modified file or a new parser is never served from the cache. Each entry is made of a feather file which stores the
+    data frame and a json file which stores its metadata. When the size of the cache exceeds its limit, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, directory=None, max_size=512*1024*1024):
+        """Constructor.
+
+        Args:
+            directory (str): the directory of the cache. If None, use the directory given by the
+                MOUSETRACKER_CACHE_DIR environment variable or a default per-user directory.
+            max_size (int): the maximum size of the cache in bytes
+        """
+
+        self._directory = directory if directory is not None else default_cache_directory()
+
+        self._max_size = max_size
+
+        self._enabled = True
+
+        self.hits = 0
+
+        self.misses = 0
+
+    def _entry(self, key):
+        """Return the files of a cache entry.
+
+        Args:
+            key (str): the key of the entry
+
+        Returns:
+            tuple: the data and the metadata files
+        """
+
+        return os.path.join(self._directory, key + '.feather'), os.path.join(self._directory, key + '.json')
+
+    def _evict(self):
+        """Remove the least recently used entries until the size of the cache is below its limit.
+        """
+
+        entries = []
+        total_size = 0
+        for filename in os.listdir(self._directory):
+            key, ext = os.path.splitext(filename)
+            if ext != '.feather':
+                continue
+            data_file, metadata_file = self._entry(key)
+            try:
+                stat = os.stat(data_file)
+                size = stat.st_size + os.path.getsize(metadata_file)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, key, size))
+            total_size += size
+
+        entries.sort()
+
+        for _, key, size in entries:
+            if total_size <= self._max_size:
+                break
+            self._remove(key)
+            total_size -= size
+
+    def _load(self, key):
+        """Load a cache entry.
+
+        Args:
+            key (str): the key of the entry
+
+        Returns:
+            tuple: the data frame and its metadata or None if there is no such entry
+        """
+
+        try:
+            data_file, metadata_file = self._entry(key)
+            with open(metadata_file, 'r') as fin:
+                metadata = json.load(fin)
+            data_frame = pd.read_feather(data_file).set_index('__index__')
+        except Exception:
+            self.misses += 1
+            return None
+
+        data_frame.index.name = None
+
+        # Mark the entry as recently used
+        os.utime(data_file)
+
+        self.hits += 1
+
+        return data_frame, metadata
+
+    def _remove(self, key):
+        """Remove an entry from the cache.
+
+        Args:
+            key (str): the key of the entry
+        """
+
+        for filename in self._entry(key):
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+    def _save(self, key, data_frame, metadata):
+        """Save a cache entry.
+
+        Args:
+            key (str): the key of the entry
+            data_frame (pandas.DataFrame): the data frame
+            metadata (dict): the metadata of the data frame
+        """
+
+        tmp_files = []
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            data_file, metadata_file = self._entry(key)
+
+            # Write to temporary files first such as a concurrent reader never sees a partial entry
+            for _ in range(2):
+                fd, tmp_file = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+                os.close(fd)
+                tmp_files.append(tmp_file)
+
+            data_frame.rename_axis('__index__').reset_index().to_feather(tmp_files[0])
+            with open(tmp_files[1], 'w') as fout:
+                json.dump(metadata, fout)
+
+            os.replace(tmp_files[1], metadata_file)
+            os.replace(tmp_files[0], data_file)
+
+        except ImportError:
+            logging.warning('pyarrow is not installed. The workbook cache is disabled.')
+            self._enabled = False
+            return
+
+        except Exception as error:
+            logging.warning('The entry {} could not be cached: {}'.format(key, error))
+            return
+
+        finally:
+            for tmp_file in tmp_files:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+
+        self._evict()
+
+    def clear(self):
+        """Remove all the entries of the cache.
+        """
+
+        if not os.path.isdir(self._directory):
+            return
+
+        for filename in os.listdir(self._directory):
+            key, ext = os.path.splitext(filename)
+            if ext == '.feather':
+                self._remove(key)
+
+    @property
+    def directory(self):
+        """Return the directory of the cache.
+
+        Returns:
+            str: the directory
+        """
+
+        return self._directory
+
+    @directory.setter
+    def directory(self, directory):
+        """Set the directory of the cache. The entries stored in the previous directory are left there.
+
+        Args:
+            directory (str): the directory
+        """
+
+        self._directory = directory
+
+    def invalidate(self, excel_file):
+        """Remove the entry of an excel file from the cache.
+
+        Args:
+            excel_file (str): the excel file
+        """
+
+        try:
+            self._remove(self.key(excel_file))
+        except OSError:
+            pass
+
+    def key(self, excel_file):
+        """Return the key of an excel file.
+
+        Args:
+            excel_file (str): the excel file
+
+        Returns:
+            str: the key
+        """
+
+        sha = hashlib.sha256()
+        with open(excel_file, 'rb') as fin:
+            for chunk in iter(lambda: fin.read(1024*1024), b''):
+                sha.update(chunk)
+
+        return '{}-{}'.format(sha.hexdigest(), PARSER_VERSION)
+
+    def load(self, excel_file):
+        """Load the data of an excel file from the cache.
+
+        Args:
+            excel_file (str): the excel file
+
+        Returns:
+            tuple: the data frame and its metadata or None if the file is not cached
+        """
+
+        if not self._enabled:
+            return None
+
+        try:
+            return self._load(self.key(excel_file))
+        except OSError:
+            self.misses += 1
+            return None
+
+    def log_statistics(self):
+        """Write the number of hits and misses of the cache to the logger.
+        """
+
+        logging.info('Workbook cache: {} hit(s) and {} miss(es)'.format(self.hits, self.misses))
+
+    def read_excel_file(self, excel_file, callback=None):
+        """Read an excel file from the cache or from the file itself if it is not cached yet.
+
+        Args:
+            excel_file (str): the excel file
+            callback (callable): the callback passed to read_excel_file
+
+        Returns:
+            tuple: the data frame and its metadata
+        """
+
+        try:
+            key = self.key(excel_file) if self._enabled else None
+        except OSError:
+            key = None
+
+        if key is None:
+            return read_excel_file(excel_file, callback=callback)
+
+        cached = self._load(key)
+        if cached is not None:
+            return cached
+
+        data_frame, metadata = read_excel_file(excel_file, callback=callback)
+
+        self._save(key, data_frame, metadata)
+
+        return data_frame, metadata
+
+    def read_excel_files(self, excel_files, parallel=True, n_workers=None, callback=None):
+        """Read several excel files. The files found in the cache are yielded first and the other ones are read
+        sequentially or in parallel and then saved to the cache.
+
+        Closing the generator stops the reading of the remaining files.
+
+        Args:
+            excel_files (list of str): the excel files
+            parallel (bool): whether the files which are not cached should be read in parallel
+            n_workers (int): the number of worker processes. If None, use the number of processors.
+            callback (callable): a function called with the index of the file, the index of the sheet read so far and
+                the number of sheets of the file
+
+        Yields:
+            tuple: the index of the file and the data frame and its metadata or the exception raised while reading the
+            file
+        """
+
+        uncached_files = []
+        for index, excel_file in enumerate(excel_files):
+            result = self.load(excel_file)
+            if result is None:
+                uncached_files.append(index)
+            else:
+                if callback is not None:
+                    callback(index, 1, 1)
+                yield index, result
+                # The data of a file is not kept while the next one is read
+                del result
+
+        if parallel and len(uncached_files) > 1:
+            def report_progress(i, sheet, n_sheets):
+                if callback is not None:
+                    callback(uncached_files[i], sheet, n_sheets)
+
+            results = read_excel_files([excel_files[index] for index in uncached_files], n_workers=n_workers, callback=report_progress)
+            for i, result in results:
+                index = uncached_files[i]
+                if not isinstance(result, Exception):
+                    self.save(excel_files[index], *result)
+                yield index, result
+                del result
+
+        else:
+            for index in uncached_files:
+                def report_progress(sheet, n_sheets):
+                    if callback is not None:
+                        callback(index, sheet, n_sheets)
+
+                try:
+                    result = read_excel_file(excel_files[index], callback=report_progress)
+                except Exception as error:
+                    result = error
+                else:
+                    self.save(excel_files[index], *result)
+                yield index, result
+                del result
+
+    def save(self, excel_file, data_frame, metadata):
+        """Save the data of an excel file to the cache.
+
+        Args:
+            excel_file (str): the excel file
+            data_frame (pandas.DataFrame): the data read from the excel file
+            metadata (dict): the metadata of the data
+        """
+
+        if not self._enabled:
+            return
+
+        try:
+            key = self.key(excel_file)
+        except OSError:
+            return
+
+        self._save(key, data_frame, metadata)
+
+
+workbook_cache = WorkbookCache()
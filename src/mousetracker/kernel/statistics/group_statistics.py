@@ -0,0 +1,642 @@
+"""This module implements the following classes and functions:
+    - get_confidence_intervals_batch
+    - get_statistics
+    - get_statistics_batch
+    - get_statistics_zones
+    - get_permutation_tests
+    - get_student_tests
+    - get_student_tests_zones
+
+The functions of this module do not depend on Qt such as they can be used by the GUI and by the batch processing.
+The data and the groups are passed through a GroupIndex.
+"""
+
+import collections
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import warnings
+
+import numpy as np
+
+import pandas as pd
+
+import scipy.stats
+
+# The default memory used by the resamples of a chunk in get_confidence_intervals_batch
+CONFIDENCE_INTERVALS_MEMORY_BUDGET = 64*1024**2
+
+# The default memory used by a chunk of label shuffles of all the pairs of groups in get_permutation_tests
+PERMUTATION_TESTS_MEMORY_BUDGET = 64*1024**2
+
+# The moments of the groups per zone shipped once to each process of the pool used by get_student_tests
+_student_tests_moments = None
+
+
+def _bootstrap_means(sums, counts, n_resamples, rng, memory_budget):
+    """Compute the means of bootstrap resamples of animals.
+
+    The resamples are drawn as a matrix of animal indexes which is turned into the number of times each animal is
+    drawn in each resample. The means of a chunk of resamples are then computed at once as matrix products with the
+    sums and the numbers of valid values of the animals. The chunk size is bounded by the memory budget.
+
+    Args:
+        sums (numpy.ndarray): the sum of the valid values of each animal with shape (n_animals, n_columns)
+        counts (numpy.ndarray): the number of valid values of each animal with shape (n_animals, n_columns)
+        n_resamples (int): the number of resamples
+        rng (numpy.random.Generator): the random generator
+        memory_budget (int): the memory in bytes used by the resamples of a chunk
+
+    Returns:
+        numpy.ndarray: the means of the resamples with shape (n_resamples, n_columns). NaN if a resample has no valid
+            value.
+    """
+
+    n_animals, n_columns = sums.shape
+
+    # The drawn indexes, their counts and the weights of the animals and the sums of a chunk
+    chunk_size = max(1, memory_budget//(8*(3*n_animals + 2*n_columns)))
+
+    means = np.empty((n_resamples, n_columns))
+
+    for start in range(0, n_resamples, chunk_size):
+        size = min(chunk_size, n_resamples - start)
+        draws = rng.integers(0, n_animals, (size, n_animals))
+        draws += n_animals*np.arange(size)[:, np.newaxis]
+        weights = np.bincount(draws.ravel(), minlength=size*n_animals).reshape(size, n_animals).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[start:start + size] = (weights @ sums)/(weights @ counts)
+
+    return means
+
+
+def _holm(p_values):
+    """Adjust p values with the Holm step-down method. The NaN are not taken into account for the adjustment of the
+    other p values and stay NaN.
+
+    Args:
+        p_values (numpy.ndarray): the p values. The adjustment is performed along the last axis.
+
+    Returns:
+        numpy.ndarray: the adjusted p values
+    """
+
+    # Only the valid p values of a row take part to its adjustment
+    n_tests = np.sum(~np.isnan(p_values), axis=-1, keepdims=True)
+
+    # The NaN are sorted last hence their multipliers, which are not positive, do not matter
+    order = np.argsort(p_values, axis=-1)
+    sorted_p_values = np.take_along_axis(p_values, order, axis=-1)
+
+    adjusted_p_values = np.maximum.accumulate(sorted_p_values*(n_tests - np.arange(p_values.shape[-1])), axis=-1)
+    adjusted_p_values = np.minimum(adjusted_p_values, 1.0)
+
+    p_values = np.empty_like(adjusted_p_values)
+    np.put_along_axis(p_values, order, adjusted_p_values, axis=-1)
+
+    return p_values
+
+
+def _init_student_tests_worker(moments):
+    """Initialize a process of the pool used by get_student_tests.
+
+    Args:
+        moments (list of 3-tuples): the number of values, the mean and the sum of the squared deviations to the mean
+            of each group with shape (n_groups, n_days) per zone
+    """
+
+    global _student_tests_moments
+
+    _student_tests_moments = moments
+
+
+def _pairwise_permutation_tests(values_per_group, n_days, n_permutations, seed, memory_budget):
+    """Compute the two-sided permutation tests on the difference of means between all pairs of groups with Holm
+    adjustment.
+
+    For each pair of groups, the labels of the pooled values are shuffled n_permutations times. The shuffles of all the
+    pairs are processed together as a (pair, shuffle, value) matrix of random orders, the pooled values of the pairs
+    being padded to the largest pair. Their memberships to the first group of each pair are multiplied with the pooled
+    values such as the sums of all the pairs and all the days are computed with a single batched matrix product. The
+    shuffles are processed by chunks whose size is bounded by the memory budget. The random keys of a pair are drawn
+    from a stream which depends only on the seed and on the indexes of the groups such as the p values do not depend
+    on the chunks, on the other groups nor on the days.
+
+    Args:
+        values_per_group (list of numpy.ndarray): the values of each group with shape (n_values, n_days)
+        n_days (int): the number of days
+        n_permutations (int): the number of label shuffles
+        seed (int): the seed of the random generator
+        memory_budget (int): the memory in bytes used by the shuffles of a chunk
+
+    Returns:
+        numpy.ndarray: the adjusted p values matrices with shape (n_days, n_groups, n_groups)
+    """
+
+    n_groups = len(values_per_group)
+
+    first, second = np.triu_indices(n_groups, 1)
+    n_pairs = len(first)
+
+    matrices = np.ones((n_days, n_groups, n_groups))
+    if n_pairs == 0:
+        return matrices
+
+    n_first = np.array([len(values_per_group[i]) for i in first], dtype=np.intp)
+    n_second = np.array([len(values_per_group[j]) for j in second], dtype=np.intp)
+    n_pools = n_first + n_second
+    max_pool = n_pools.max()
+
+    # The pooled values of each pair padded with zeros to the largest pair
+    pooled = np.zeros((n_pairs, max_pool, n_days))
+    for pair, (i, j) in enumerate(zip(first, second)):
+        pooled[pair, :n_pools[pair]] = np.vstack([values_per_group[i], values_per_group[j]])
+
+    first_sums = np.array([values_per_group[i].sum(axis=0) for i in first]).reshape(n_pairs, n_days)
+    second_sums = np.array([values_per_group[j].sum(axis=0) for j in second]).reshape(n_pairs, n_days)
+    totals = np.array([pooled[pair, :n_pools[pair]].sum(axis=0) for pair in range(n_pairs)]).reshape(n_pairs, n_days)
+
+    # The shuffles as extreme as the observed difference up to the rounding errors of the sums are counted
+    observed = np.abs(first_sums/n_first[:, np.newaxis] - second_sums/n_second[:, np.newaxis])
+    observed -= 1.0e-9*np.abs(pooled).max(axis=1, initial=0.0)
+
+    scales = 1.0/n_first + 1.0/n_second
+    offsets = totals/n_second[:, np.newaxis]
+
+    rngs = [np.random.default_rng([seed, i, j]) for i, j in zip(first, second)]
+
+    # The random keys, their orders and the memberships and the sums and the differences of a chunk
+    chunk_size = max(1, memory_budget//(8*n_pairs*(3*max_pool + 2*n_days)))
+
+    n_extremes = np.zeros((n_pairs, n_days), dtype=np.intp)
+    for start in range(0, n_permutations, chunk_size):
+        size = min(chunk_size, n_permutations - start)
+
+        # The padding is sorted last hence never belongs to the first group
+        keys = np.full((n_pairs, size, max_pool), np.inf)
+        for pair, rng in enumerate(rngs):
+            keys[pair, :, :n_pools[pair]] = rng.random((size, n_pools[pair]))
+        memberships = (np.argsort(keys, axis=2) < n_first[:, np.newaxis, np.newaxis]).astype(np.float64)
+
+        # The difference of means is sums/n_first - (totals - sums)/n_second, computed in place
+        differences = memberships @ pooled
+        differences *= scales[:, np.newaxis, np.newaxis]
+        differences -= offsets[:, np.newaxis, :]
+        np.abs(differences, out=differences)
+        n_extremes += (differences >= observed[:, np.newaxis, :]).sum(axis=1)
+
+    p_values = _holm(((n_extremes + 1)/(n_permutations + 1)).T)
+
+    matrices[:, first, second] = p_values
+    matrices[:, second, first] = p_values
+
+    return matrices
+
+
+def _pairwise_student_tests(n, mean, m2):
+    """Compute the two-sided Student tests (equal variances) between all pairs of groups with Holm adjustment.
+
+    Args:
+        n (numpy.ndarray): the number of values of each group with shape (n_groups, n_days)
+        mean (numpy.ndarray): the mean of each group with shape (n_groups, n_days)
+        m2 (numpy.ndarray): the sum of the squared deviations to the mean of each group with shape (n_groups, n_days)
+
+    Returns:
+        numpy.ndarray: the adjusted p values matrices with shape (n_days, n_groups, n_groups)
+    """
+
+    n_groups, n_days = n.shape
+
+    first, second = np.triu_indices(n_groups, 1)
+
+    # The pooled variance is (m2_i + m2_j)/(n_i + n_j - 2)
+    dof = (n[first] + n[second] - 2).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pooled_variance = (m2[first] + m2[second])/dof
+        denominator = np.sqrt(pooled_variance*(1.0/n[first] + 1.0/n[second]))
+        t = (mean[first] - mean[second])/denominator
+        p_values = 2.0*scipy.stats.t.sf(np.abs(t), dof)
+
+    p_values = _holm(p_values.T)
+
+    matrices = np.ones((n_days, n_groups, n_groups))
+    matrices[:, first, second] = p_values
+    matrices[:, second, first] = p_values
+
+    return matrices
+
+
+def _parallel_student_tests(moments_per_zone, n_days, callback=None, n_workers=None):
+    """Compute the student tests of several zones with a pool of processes. The days of each zone are split in chunks
+    such as each process gets several tasks.
+
+    Args:
+        moments_per_zone (list of 3-tuples): the number of values, the mean and the sum of the squared deviations to
+            the mean of each group with shape (n_groups, n_days) per zone
+        n_days (int): the number of days
+        callback (callable): a function called with the number of zones processed so far
+        n_workers (int): the number of processes. If None, use as many processes as available cores.
+
+    Returns:
+        list of numpy.ndarray: the p values matrices with shape (n_days, n_groups, n_groups) per zone
+    """
+
+    n_zones = len(moments_per_zone)
+
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, n_zones*n_days))
+
+    # About four tasks per process
+    n_chunks_per_zone = max(1, min(n_days, (4*n_workers + n_zones - 1)//n_zones))
+    bounds = np.linspace(0, n_days, n_chunks_per_zone + 1).astype(int)
+    chunks = [(first_day, last_day) for first_day, last_day in zip(bounds[:-1], bounds[1:]) if last_day > first_day]
+
+    p_values_per_zone = [np.empty((n_days,) + (n.shape[0],)*2) for n, _, _ in moments_per_zone]
+    n_pending_chunks = [len(chunks)]*n_zones
+    n_processed_zones = 0
+
+    # Spawn the processes rather than forking the (possibly multi-threaded) application
+    context = multiprocessing.get_context('spawn')
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers,
+                                                mp_context=context,
+                                                initializer=_init_student_tests_worker,
+                                                initargs=(moments_per_zone,)) as executor:
+        futures = [executor.submit(_student_tests_in_worker, izone, first_day, last_day)
+                   for izone in range(n_zones) for first_day, last_day in chunks]
+        for future in concurrent.futures.as_completed(futures):
+            izone, first_day, p_values = future.result()
+            p_values_per_zone[izone][first_day:first_day + len(p_values)] = p_values
+
+            n_pending_chunks[izone] -= 1
+            if n_pending_chunks[izone] == 0:
+                n_processed_zones += 1
+                if callback is not None:
+                    callback(n_processed_zones)
+
+    return p_values_per_zone
+
+
+def _student_tests_in_worker(izone, first_day, last_day):
+    """Compute the student tests for some days of a zone from a process of the pool used by get_student_tests.
+
+    Args:
+        izone (int): the index of the zone
+        first_day (int): the index of the first day
+        last_day (int): the index after the last day
+
+    Returns:
+        tuple: the index of the zone, the index of the first day and the p values matrices of the days
+    """
+
+    n, mean, m2 = _student_tests_moments[izone]
+
+    return izone, first_day, _pairwise_student_tests(n[:, first_day:last_day], mean[:, first_day:last_day], m2[:, first_day:last_day])
+
+
+def get_statistics(group_index, selected_property, zones):
+    """Average the data for a selected property for different zones
+
+    The statistics of each union of zones are combined from the per-zone statistics of the groups which are computed
+    once for all properties.
+
+    Args:
+        group_index (mousetracker.kernel.data.group_index.GroupIndex): the data and the groups
+        selected_property (str): the selected property
+        zones (list of tuples): the zones for which the average should be computed
+
+    Returns:
+        collections.OrderedDict: the average data per group
+    """
+
+    return get_statistics_batch(group_index, [selected_property], zones)[selected_property]
+
+
+def get_statistics_batch(group_index, selected_properties, zones):
+    """Average the data for several properties for different zones.
+
+    The statistics of all the properties are combined together for each group.
+
+    Args:
+        group_index (mousetracker.kernel.data.group_index.GroupIndex): the data and the groups
+        selected_properties (list of str): the selected properties
+        zones (list of tuples): the zones for which the average should be computed
+
+    Returns:
+        collections.OrderedDict: the average data per group for each property
+    """
+
+    cube = group_index.cube
+
+    days = cube.days
+
+    zone_names = [''.join(tz) for tz in zones]
+
+    zone_indexes = [cube.zone_indexes(tz) for tz in zones]
+
+    property_indexes = [cube.property_index(prop) for prop in selected_properties]
+
+    zone_statistics = group_index.zone_statistics
+
+    statistics = collections.OrderedDict()
+    for prop in selected_properties:
+        statistics[prop] = {}
+        statistics[prop]['mean'] = collections.OrderedDict()
+        statistics[prop]['std'] = collections.OrderedDict()
+        statistics[prop]['n'] = collections.OrderedDict()
+
+    for i, (group_name, _, selected) in enumerate(group_index.groups):
+
+        # If the group is not selected, skip it
+        if not selected:
+            continue
+
+        mean, std, n = zone_statistics.combine(i, zone_indexes, property_indexes)
+
+        for j, prop in enumerate(selected_properties):
+            statistics[prop]['mean'][group_name] = pd.DataFrame(mean[:, :, j], index=zone_names, columns=days)
+            statistics[prop]['std'][group_name] = pd.DataFrame(std[:, :, j], index=zone_names, columns=days)
+            statistics[prop]['n'][group_name] = pd.DataFrame(n[:, :, j], index=zone_names, columns=days)
+
+    return statistics
+
+
+def get_statistics_zones(animal):
+    """Return the zones used for the statistics.
+
+    Args:
+        animal (str): the type of the animal (e.g. Souris, Lapins)
+
+    Returns:
+        list of tuples: the zones
+    """
+
+    if animal == 'Souris':
+        return [('A', 'B', 'C', 'D', 'E'), ('A', 'B', 'C', 'D'), ('A', 'B'), ('C', 'D'), ('E',)]
+    elif animal == 'Lapins':
+        return [('G', 'D'), ('G',), ('D',)]
+    else:
+        return []
+
+
+def get_confidence_intervals_batch(group_index, selected_properties, zones, n_resamples=2000, confidence_level=0.95,
+                                   seed=0, memory_budget=CONFIDENCE_INTERVALS_MEMORY_BUDGET):
+    """Compute the bootstrap confidence intervals of the averages of several properties for different zones.
+
+    The animals of a group are resampled with replacement such as the values of the zones of an animal are kept
+    together. The intervals are the percentiles of the means of the resamples and are computed for all the days and
+    all the properties at once. The random stream of a group and a set of zones depends only on the seed such as the
+    intervals do not depend on the chunks nor on the other properties.
+
+    Args:
+        group_index (mousetracker.kernel.data.group_index.GroupIndex): the data and the groups
+        selected_properties (list of str): the selected properties
+        zones (list of tuples): the zones for which the confidence intervals should be computed
+        n_resamples (int): the number of bootstrap resamples
+        confidence_level (float): the confidence level of the intervals
+        seed (int): the seed of the random generator
+        memory_budget (int): the memory in bytes used by the resamples of a chunk
+
+    Returns:
+        collections.OrderedDict: the lower and upper bounds per group for each property
+    """
+
+    cube = group_index.cube
+
+    n_animals, n_zones, n_days, n_properties = cube.shape
+
+    days = cube.days
+
+    zone_names = [''.join(tz) for tz in zones]
+
+    property_indexes = [cube.property_index(prop) for prop in selected_properties]
+
+    values = cube.values.reshape(n_animals*n_zones, n_days, n_properties)
+
+    quantiles = [(1.0 - confidence_level)/2.0, (1.0 + confidence_level)/2.0]
+
+    confidence_intervals = collections.OrderedDict()
+    for prop in selected_properties:
+        confidence_intervals[prop] = {}
+        confidence_intervals[prop]['lower'] = collections.OrderedDict()
+        confidence_intervals[prop]['upper'] = collections.OrderedDict()
+
+    for i, (group_name, _, selected) in enumerate(group_index.groups):
+
+        # If the group is not selected, skip it
+        if not selected:
+            continue
+
+        bounds = np.full((2, len(zones), n_days, len(property_indexes)), np.nan)
+
+        for izone, zone in enumerate(zones):
+
+            rows = group_index.rows(i, zone)
+            if len(rows) == 0:
+                continue
+
+            zone_values = values[rows][:, :, property_indexes].reshape(len(rows), -1)
+            valid = ~np.isnan(zone_values)
+
+            # The rows of an animal are contiguous
+            _, starts = np.unique(rows//n_zones, return_index=True)
+            sums = np.add.reduceat(np.where(valid, zone_values, 0.0), starts, axis=0)
+            counts = np.add.reduceat(valid.astype(np.float64), starts, axis=0)
+
+            rng = np.random.default_rng([seed, i] + list(cube.zone_indexes(zone)))
+
+            means = _bootstrap_means(sums, counts, n_resamples, rng, memory_budget)
+
+            with warnings.catch_warnings():
+                # The days without any valid value give NaN bounds
+                warnings.simplefilter('ignore', RuntimeWarning)
+                bounds[:, izone] = np.nanquantile(means, quantiles, axis=0).reshape(2, n_days, len(property_indexes))
+
+        for j, prop in enumerate(selected_properties):
+            confidence_intervals[prop]['lower'][group_name] = pd.DataFrame(bounds[0, :, :, j], index=zone_names, columns=days)
+            confidence_intervals[prop]['upper'][group_name] = pd.DataFrame(bounds[1, :, :, j], index=zone_names, columns=days)
+
+    return confidence_intervals
+
+
+def get_permutation_tests(group_index, selected_property, zones, callback=None, days=None, n_permutations=10000, seed=0,
+                          memory_budget=PERMUTATION_TESTS_MEMORY_BUDGET):
+    """Compute the permutation tests for a selected property.
+
+    The tests on the difference of means between all the pairs of groups are computed for all the days of a zone at
+    once. The labels of the values of both groups are shuffled in batches with a fixed seed such as the p values are
+    reproducible. The p values are adjusted with the Holm method. A day for which a value is missing is skipped.
+
+    Args:
+        group_index (mousetracker.kernel.data.group_index.GroupIndex): the data and the groups
+        selected_property (str): the selected property
+        zones (list of tuples): the zones for which the permutation tests should be computed
+        callback (callable): a function called with the number of zones processed so far
+        days (list of str): the days for which the permutation tests should be computed. If None, the permutation tests
+            are computed for all the days.
+        n_permutations (int): the number of label shuffles per pair of groups
+        seed (int): the seed of the random generator
+        memory_budget (int): the memory in bytes used by the shuffles of a chunk
+
+    Returns:
+        collections.OrderedDict: the p values matrix per zone and per day
+    """
+
+    cube = group_index.cube
+
+    if days is None:
+        day_indexes = np.arange(len(cube.days))
+    else:
+        day_indexes = np.array([i for i, day in enumerate(cube.days) if day in days], dtype=np.intp)
+
+    days = [cube.days[i] for i in day_indexes]
+
+    selected_groups = [(i, group_name) for i, (group_name, _, selected) in enumerate(group_index.groups) if selected]
+    selected_group_names = [group_name for _, group_name in selected_groups]
+
+    permutation_tests = collections.OrderedDict()
+
+    for izone, zone in enumerate(zones):
+
+        name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+
+        permutation_tests[name] = collections.OrderedDict()
+
+        # The groups without any (animal, zone) couple do not take part to the tests
+        values_per_group = [(group_name, group_index.sample(i, selected_property, zone)[:, day_indexes]) for i, group_name in selected_groups]
+        values_per_group = [(group_name, values) for group_name, values in values_per_group if len(values) > 0]
+        group_names = [group_name for group_name, _ in values_per_group]
+
+        # A day with missing values can not be tested
+        complete_days = np.ones(len(days), dtype=bool)
+        for _, values in values_per_group:
+            complete_days &= ~np.isnan(values).any(axis=0)
+
+        p_values = _pairwise_permutation_tests([np.nan_to_num(values) for _, values in values_per_group],
+                                               len(days),
+                                               n_permutations,
+                                               seed,
+                                               memory_budget)
+
+        for iday, day in enumerate(days):
+
+            if not complete_days[iday]:
+                logging.error('Can not compute permutation test for group {} and day {}. Skip it.'.format(name, day))
+                permutation_tests[name][day] = pd.DataFrame(np.nan, index=selected_group_names, columns=selected_group_names)
+                continue
+
+            permutation_tests[name][day] = pd.DataFrame(p_values[iday], index=group_names, columns=group_names)
+
+        if callback is not None:
+            callback(izone+1)
+
+    return permutation_tests
+
+
+def get_student_tests(group_index, selected_property, zones, callback=None, parallel=False, n_workers=None, days=None):
+    """Compute the student test for a selected property.
+
+    The tests between all the pairs of groups are computed for all the days of a zone at once from the moments of the
+    groups. The p values are adjusted with the Holm method. A day for which a value is missing is skipped.
+
+    In parallel mode, the (zone, day) grid is split across a pool of processes. The moments of the groups are sent
+    once to each process.
+
+    Args:
+        group_index (mousetracker.kernel.data.group_index.GroupIndex): the data and the groups
+        selected_property (str): the selected property
+        zones (list of tuples): the zones for which the student tests should be computed
+        callback (callable): a function called with the number of zones processed so far
+        parallel (bool): whether the tests should be computed by a pool of processes
+        n_workers (int): the number of processes. If None, use as many processes as available cores.
+        days (list of str): the days for which the student tests should be computed. If None, the student tests are
+            computed for all the days.
+
+    Returns:
+        collections.OrderedDict: the p values matrix per zone and per day
+    """
+
+    cube = group_index.cube
+
+    if days is None:
+        day_indexes = np.arange(len(cube.days))
+    else:
+        day_indexes = np.array([i for i, day in enumerate(cube.days) if day in days], dtype=np.intp)
+
+    days = [cube.days[i] for i in day_indexes]
+
+    property_index = cube.property_index(selected_property)
+
+    zone_statistics = group_index.zone_statistics
+
+    selected_groups = [(i, group_name) for i, (group_name, _, selected) in enumerate(group_index.groups) if selected]
+    selected_group_names = [group_name for _, group_name in selected_groups]
+
+    group_names_per_zone = []
+    moments_per_zone = []
+    complete_days_per_zone = []
+    for zone in zones:
+
+        zone_indexes = [cube.zone_indexes(zone)]
+
+        # The groups without any (animal, zone) couple do not take part to the tests
+        n_rows = np.array([len(group_index.rows(i, zone)) for i, _ in selected_groups], dtype=np.intp)
+        groups = [group for group, n_group_rows in zip(selected_groups, n_rows) if n_group_rows > 0]
+        group_names_per_zone.append([group_name for _, group_name in groups])
+
+        moments = [zone_statistics.moments(i, zone_indexes, [property_index]) for i, _ in groups]
+        n = np.array([group_n[0, day_indexes, 0] for group_n, _, _ in moments], dtype=np.intp).reshape(len(groups), len(days))
+        mean = np.array([group_mean[0, day_indexes, 0] for _, group_mean, _ in moments]).reshape(len(groups), len(days))
+        m2 = np.array([group_m2[0, day_indexes, 0] for _, _, group_m2 in moments]).reshape(len(groups), len(days))
+        moments_per_zone.append((n, mean, m2))
+
+        # A day with missing values can not be tested
+        complete_days_per_zone.append((n == n_rows[n_rows > 0][:, np.newaxis]).all(axis=0))
+
+    if parallel and zones and days:
+        p_values_per_zone = _parallel_student_tests(moments_per_zone, len(days), callback, n_workers)
+    else:
+        p_values_per_zone = []
+        for izone, (n, mean, m2) in enumerate(moments_per_zone):
+            p_values_per_zone.append(_pairwise_student_tests(n, mean, m2))
+            if callback is not None:
+                callback(izone+1)
+
+    student_tests = collections.OrderedDict()
+
+    for izone, zone in enumerate(zones):
+
+        name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+
+        student_tests[name] = collections.OrderedDict()
+
+        group_names = group_names_per_zone[izone]
+
+        for iday, day in enumerate(days):
+
+            if not complete_days_per_zone[izone][iday]:
+                logging.error('Can not compute student test for group {} and day {}. Skip it.'.format(name, day))
+                student_tests[name][day] = pd.DataFrame(np.nan, index=selected_group_names, columns=selected_group_names)
+                continue
+
+            student_tests[name][day] = pd.DataFrame(p_values_per_zone[izone][iday], index=group_names, columns=group_names)
+
+    return student_tests
+
+
+def get_student_tests_zones(animal):
+    """Return the zones used for the student tests.
+
+    Args:
+        animal (str): the type of the animal (e.g. Souris, Lapins)
+
+    Returns:
+        list of tuples: the zones
+    """
+
+    if animal == 'Souris':
+        return [('A', 'B', 'C', 'D'), ('A', 'B'), ('C', 'D'), ('E',)]
+    elif animal == 'Lapins':
+        return [('G',), ('D',)]
+    else:
+        return []
@@ -0,0 +1,93 @@
+"""This module implements the following classes and functions:
+    - StatisticsCache
+"""
+
+import collections
+import logging
+
+
+class StatisticsCache:
+    """This class implements an in-memory least recently used cache for the statistics computed for the groups.
+
+    The cache is shared by all the views of the results of an excel file (statistics tables, plots, exports ...). The
+    entries are keyed by the excel file, the kind of result, the property, the zones and the version of the membership
+    of the groups such as the results computed before a change of the groups are never returned. Those entries are
+    evicted when the cache is full.
+    """
+
+    def __init__(self, max_size=4096):
+        """Constructor.
+
+        Args:
+            max_size (int): the maximum number of entries of the cache
+        """
+
+        self._max_size = max_size
+
+        self._entries = collections.OrderedDict()
+
+        self.hits = 0
+
+        self.misses = 0
+
+    def clear(self):
+        """Remove all the entries of the cache.
+        """
+
+        self._entries.clear()
+
+    def get(self, key):
+        """Return an entry of the cache.
+
+        Args:
+            key (hashable): the key of the entry
+
+        Returns:
+            object: the entry or None if the key is not cached
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entry
+
+    @property
+    def hit_rate(self):
+        """Return the fraction of the requests which were found in the cache.
+
+        Returns:
+            float: the hit rate
+        """
+
+        n_requests = self.hits + self.misses
+
+        return self.hits/n_requests if n_requests else 0.0
+
+    def log_statistics(self):
+        """Write the number of hits and misses of the cache to the logger.
+        """
+
+        logging.info('Statistics cache: {} hit(s) and {} miss(es) ({:.0%} hit rate, {} entries)'.format(
+            self.hits, self.misses, self.hit_rate, len(self._entries)))
+
+    def put(self, key, entry):
+        """Store an entry in the cache. The least recently used entry is evicted if the cache is full.
+
+        Args:
+            key (hashable): the key of the entry
+            entry (object): the entry
+        """
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+statistics_cache = StatisticsCache()
@@ -0,0 +1,239 @@
+"""This module implements the following classes and functions:
+    - ZoneStatistics
+"""
+
+import numpy as np
+
+
+class ZoneStatistics:
+    """This class stores the sufficient statistics of each group for each zone, day and property.
+
+    For each (group, zone, day, property) cell, the number of valid values, their mean and the sum of their squared
+    deviations to the mean are stored. The statistics of any union of zones are combined from those of its zones
+    (Chan et al. pairwise formula) without going back to the data. When animals are added to or removed from a group,
+    only their rows are merged into or taken out of the statistics of the group.
+    """
+
+    def __init__(self, n, mean, m2):
+        """Constructor.
+
+        Args:
+            n (numpy.ndarray): the number of valid values with shape (n_groups, n_zones, n_days, n_properties)
+            mean (numpy.ndarray): the mean of the valid values with the same shape. NaN if there is no valid value.
+            m2 (numpy.ndarray): the sum of the squared deviations to the mean with the same shape
+        """
+
+        self._n = n
+
+        self._mean = mean
+
+        self._m2 = m2
+
+    @classmethod
+    def from_group_index(cls, group_index):
+        """Build the statistics of the groups of a group index.
+
+        The (animal, zone) rows of all groups and zones are gathered at once and reduced in a single pass over all the
+        days and properties.
+
+        Args:
+            group_index (mousetracker.kernel.data.group_index.GroupIndex): the data and the groups
+
+        Returns:
+            ZoneStatistics: the statistics
+        """
+
+        cube = group_index.cube
+
+        n_animals, n_zones, n_days, n_properties = cube.shape
+        n_groups = len(group_index.groups)
+
+        # One segment of rows per (group, zone)
+        segments = [group_index.rows(group, (zone,)) for group in range(n_groups) for zone in cube.zones]
+        lengths = np.array([len(segment) for segment in segments], dtype=np.intp)
+        rows = np.concatenate(segments) if segments else np.empty(0, dtype=np.intp)
+
+        values = cube.values.reshape(n_animals*n_zones, n_days*n_properties)[rows]
+
+        n, mean, m2 = ZoneStatistics.reduce(values, lengths)
+
+        shape = (n_groups, n_zones, n_days, n_properties)
+
+        return cls(n.reshape(shape), mean.reshape(shape), m2.reshape(shape))
+
+    def add(self, group, n, mean, m2):
+        """Merge the statistics of some rows into the statistics of a group.
+
+        Args:
+            group (int): the index of the group
+            n (numpy.ndarray): the number of valid values of the rows with shape (n_zones, n_days, n_properties)
+            mean (numpy.ndarray): the mean of the valid values of the rows with the same shape
+            m2 (numpy.ndarray): the sum of the squared deviations to the mean of the rows with the same shape
+        """
+
+        n_a = self._n[group]
+        mean_a = np.nan_to_num(self._mean[group])
+
+        n_ab = n_a + n
+        delta = np.nan_to_num(mean) - mean_a
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = np.where(n_ab > 0, n/n_ab, 0.0)
+
+        self._mean[group] = np.where(n_ab > 0, mean_a + delta*ratio, np.nan)
+        self._m2[group] = self._m2[group] + m2 + delta**2*n_a*ratio
+        self._n[group] = n_ab
+
+    def combine(self, group, zone_indexes, property_indexes):
+        """Combine the statistics of some zones of a group for some properties.
+
+        Args:
+            group (int): the index of the group
+            zone_indexes (list of numpy.ndarray): the indexes of the zones of each union of zones
+            property_indexes (list of int): the indexes of the properties
+
+        Returns:
+            3-tuple of numpy.ndarray: the mean, the standard deviation and the number of valid values of each union
+                with shape (n_unions, n_days, n_properties)
+        """
+
+        n, mean, m2 = self.moments(group, zone_indexes, property_indexes)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(m2/n)
+
+        return mean, std, n
+
+    def moments(self, group, zone_indexes, property_indexes):
+        """Combine the sufficient statistics of some zones of a group for some properties.
+
+        Args:
+            group (int): the index of the group
+            zone_indexes (list of numpy.ndarray): the indexes of the zones of each union of zones
+            property_indexes (list of int): the indexes of the properties
+
+        Returns:
+            3-tuple of numpy.ndarray: the number of valid values, the mean and the sum of the squared deviations to the
+                mean of each union with shape (n_unions, n_days, n_properties)
+        """
+
+        n_zones = self._n.shape[1]
+
+        # Membership matrix of the zones in each union
+        weights = np.zeros((len(zone_indexes), n_zones))
+        for i, indexes in enumerate(zone_indexes):
+            weights[i, indexes] = 1.0
+
+        property_indexes = np.asarray(property_indexes, dtype=np.intp)
+
+        n_z = self._n[group][:, :, property_indexes]
+        mean_z = np.nan_to_num(self._mean[group][:, :, property_indexes])
+        m2_z = self._m2[group][:, :, property_indexes]
+
+        n = np.tensordot(weights, n_z, axes=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.tensordot(weights, n_z*mean_z, axes=1)/n
+
+        # The squared deviations of the zone means to the union mean are added to the zone sums of squares
+        deviations = np.nan_to_num(mean_z[np.newaxis] - mean[:, np.newaxis])
+        m2 = np.einsum('uz,uzdp->udp', weights, m2_z[np.newaxis] + n_z[np.newaxis]*deviations**2)
+
+        return n.astype(np.intp), mean, m2
+
+    @staticmethod
+    def of_animals(cube, animal_indexes):
+        """Compute the statistics per zone of the rows of some animals.
+
+        Args:
+            cube (mousetracker.kernel.data.monitoring_cube.MonitoringCube): the data
+            animal_indexes (numpy.ndarray): the indexes of the animals
+
+        Returns:
+            3-tuple of numpy.ndarray: the number of valid values, the mean and the sum of the squared deviations to the
+                mean with shape (n_zones, n_days, n_properties)
+        """
+
+        n_animals, n_zones, n_days, n_properties = cube.shape
+
+        segments = [cube.rows(animal_indexes, np.array([zone], dtype=np.intp)) for zone in range(n_zones)]
+        lengths = np.array([len(segment) for segment in segments], dtype=np.intp)
+        rows = np.concatenate(segments)
+
+        values = cube.values.reshape(n_animals*n_zones, n_days*n_properties)[rows]
+
+        n, mean, m2 = ZoneStatistics.reduce(values, lengths)
+
+        shape = (n_zones, n_days, n_properties)
+
+        return n.reshape(shape), mean.reshape(shape), m2.reshape(shape)
+
+    @staticmethod
+    def reduce(values, lengths):
+        """Compute the number of valid values, the mean and the sum of the squared deviations to the mean of
+        consecutive segments of rows. The NaN are skipped.
+
+        Args:
+            values (numpy.ndarray): the values with shape (n_rows, n_columns)
+            lengths (numpy.ndarray): the number of rows of each segment. The segments may be empty.
+
+        Returns:
+            3-tuple of numpy.ndarray: the number of valid values, the mean and the sum of the squared deviations of
+                each segment with shape (n_segments, n_columns)
+        """
+
+        n_columns = values.shape[1]
+
+        if len(lengths) == 0:
+            return np.zeros((0, n_columns), dtype=np.intp), np.zeros((0, n_columns)), np.zeros((0, n_columns))
+
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+
+        # A zero row is appended such as the empty segments at the end of the values have a valid start
+        starts = (np.cumsum(lengths) - lengths).astype(np.intp)
+        empty = lengths == 0
+        padding = np.zeros((1, n_columns))
+
+        n = np.add.reduceat(np.vstack([valid.astype(np.intp), padding.astype(np.intp)]), starts, axis=0)
+        n[empty] = 0
+
+        sums = np.add.reduceat(np.vstack([filled, padding]), starts, axis=0)
+        sums[empty] = 0.0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sums/n
+
+        # The deviations are taken from the mean of their segment for a numerically stable variance
+        deviations = np.where(valid, values - np.repeat(mean, lengths, axis=0), 0.0)
+        m2 = np.add.reduceat(np.vstack([deviations**2, padding]), starts, axis=0)
+        m2[empty] = 0.0
+
+        return n, mean, m2
+
+    def remove(self, group, n, mean, m2):
+        """Take the statistics of some rows out of the statistics of a group. The rows must have been merged before.
+
+        Args:
+            group (int): the index of the group
+            n (numpy.ndarray): the number of valid values of the rows with shape (n_zones, n_days, n_properties)
+            mean (numpy.ndarray): the mean of the valid values of the rows with the same shape
+            m2 (numpy.ndarray): the sum of the squared deviations to the mean of the rows with the same shape
+        """
+
+        n_ab = self._n[group]
+        mean_ab = np.nan_to_num(self._mean[group])
+        mean_b = np.nan_to_num(mean)
+
+        n_a = n_ab - n
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_a = np.where(n_a > 0, (n_ab*mean_ab - n*mean_b)/n_a, np.nan)
+            correction = np.where(n_a > 0, (mean_b - np.nan_to_num(mean_a))**2*n_a*n/n_ab, 0.0)
+
+        # The differences below the rounding errors of the sum of squares of the group are zeroed such as they do not
+        # leave a residue (e.g. for a single or for equal values)
+        m2_a = self._m2[group] - m2 - correction
+        tolerance = 1.0e3*np.finfo(np.float64).eps*self._m2[group]
+        self._m2[group] = np.where((n_a > 1) & (m2_a > tolerance), m2_a, 0.0)
+        self._mean[group] = mean_a
+        self._n[group] = n_a
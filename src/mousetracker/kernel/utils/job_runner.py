@@ -0,0 +1,85 @@
+"""This module implements the following classes and functions:
+    - JobRunner
+"""
+
+import threading
+
+from PyQt5 import QtCore
+
+
+class JobRunner(QtCore.QThread):
+    """This class runs a job in a background thread so that the GUI remains responsive.
+
+    A job is a callable whose first argument is the runner. The job reports its progress with report_progress, sends
+    its results with send_result and should check regularly is_cancelled to stop cleanly when the user cancels it.
+    The signals are emitted from the background thread, hence the connected slots are run in the GUI thread.
+    """
+
+    progress = QtCore.pyqtSignal(int, int)
+
+    result_ready = QtCore.pyqtSignal(object)
+
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, job, *args, parent=None, **kwargs):
+        """Constructor.
+
+        Args:
+            job (callable): the job to run
+            args (list): the positional arguments passed to the job after the runner
+            parent (QtCore.QObject): the parent object
+            kwargs (dict): the keyword arguments passed to the job
+        """
+
+        super(JobRunner, self).__init__(parent)
+
+        self._job = job
+
+        self._args = args
+
+        self._kwargs = kwargs
+
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask the job to stop.
+        """
+
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        """Return true if the job has been cancelled.
+
+        Returns:
+            bool: whether the job has been cancelled
+        """
+
+        return self._cancelled.is_set()
+
+    def report_progress(self, step, n_steps):
+        """Report the progress of the job.
+
+        Args:
+            step (int): the current step
+            n_steps (int): the total number of steps
+        """
+
+        self.progress.emit(step, n_steps)
+
+    def run(self):
+        """Run the job. Any exception raised by the job is sent through the failed signal.
+        """
+
+        try:
+            self._job(self, *self._args, **self._kwargs)
+        except Exception as error:
+            self.failed.emit(str(error))
+
+    def send_result(self, result):
+        """Send a result of the job.
+
+        Args:
+            result (any): the result
+        """
+
+        self.result_ready.emit(result)
@@ -2,9 +2,13 @@
     - ProgressBar
 """
 
+from PyQt5 import QtCore
+
 
 class ProgressBar:
     """This class implements as a singleton a progress bar for the whole application.
+
+    The progress bar can be updated from a background thread, the update being then queued to the GUI thread.
     """
 
     _instance = None
@@ -22,6 +26,16 @@ class ProgressBar:
 
         self._progress_widget = progress_widget
 
+    def _invoke(self, method, value):
+        """Call a slot of the progress widget from whatever thread.
+
+        Args:
+            method (str): the name of the slot
+            value (int): the argument of the slot
+        """
+
+        QtCore.QMetaObject.invokeMethod(self._progress_widget, method, QtCore.Qt.AutoConnection, QtCore.Q_ARG(int, value))
+
     def reset(self, n_steps):
         """Initializes the progress bar.
 
@@ -33,9 +47,9 @@ class ProgressBar:
             return
 
         try:
-            self._progress_widget.setMinimum(0)
-            self._progress_widget.setMaximum(n_steps)
-        except AttributeError:
+            self._invoke('setMinimum', 0)
+            self._invoke('setMaximum', n_steps)
+        except (AttributeError, TypeError):
             return
 
     def update(self, step):
@@ -49,8 +63,8 @@ class ProgressBar:
             return
 
         try:
-            self._progress_widget.setValue(step)
-        except AttributeError:
+            self._invoke('setValue', step)
+        except (AttributeError, TypeError):
             return
 
 
@@ -0,0 +1,166 @@
+"""This module implements the following classes and functions:
+    - export_columnar_bundle
+
+The export does not depend on Qt such as it can be used by the GUI and by the batch processing.
+"""
+
+import json
+import os
+
+import numpy as np
+
+import pandas as pd
+
+# The version of the layout of the bundle written in its manifest
+COLUMNAR_BUNDLE_VERSION = 1
+
+
+def _groups_table(groups):
+    """Build the table of the membership of the groups.
+
+    Args:
+        groups (list of 3-tuples): the name, the animals and the selection state of each group
+
+    Returns:
+        pandas.DataFrame: the table with one row per (group, animal)
+    """
+
+    rows = [(group, str(animal), selected) for group, animals, selected in groups for animal in animals]
+
+    return pd.DataFrame(rows, columns=['group', 'animal', 'selected'])
+
+
+def _statistics_table(statistics, confidence_intervals, days):
+    """Build the table of the statistics.
+
+    Args:
+        statistics (collections.OrderedDict): the statistics per property
+        confidence_intervals (collections.OrderedDict): the confidence intervals per property or None
+        days (list of str): the days
+
+    Returns:
+        pandas.DataFrame: the table with one row per (property, statistic, group, zones) and one column per day
+    """
+
+    labels = []
+    blocks = []
+    for prop, prop_statistics in statistics.items():
+        data_frames_per_statistic = [(s, prop_statistics[s]) for s in ['mean', 'std', 'n']]
+        if confidence_intervals is not None:
+            data_frames_per_statistic += [('ci {}'.format(s), confidence_intervals[prop][s]) for s in ['lower', 'upper']]
+
+        for statistic, data_frames in data_frames_per_statistic:
+            for group, df in data_frames.items():
+                labels.extend((prop, statistic, group, zones) for zones in df.index)
+                blocks.append(df.to_numpy(dtype=np.float64))
+
+    table = pd.DataFrame(labels, columns=['property', 'statistic', 'group', 'zones'])
+
+    values = np.vstack(blocks) if blocks else np.empty((0, len(days)))
+    for i, day in enumerate(days):
+        table[day] = values[:, i]
+
+    return table
+
+
+def _student_tests_table(student_tests):
+    """Build the table of the p values of the student tests.
+
+    Args:
+        student_tests (collections.OrderedDict): the student tests per property
+
+    Returns:
+        pandas.DataFrame: the table with one row per (property, zones, day, group, versus)
+    """
+
+    labels = []
+    groups = []
+    versus = []
+    p_values = []
+    for prop, prop_student_tests in student_tests.items():
+        for zones, p_values_per_day in prop_student_tests.items():
+            for day, df in p_values_per_day.items():
+                names = np.asarray(df.index, dtype=object)
+                labels.append(((prop, zones, day), len(names)**2))
+                groups.append(np.repeat(names, len(names)))
+                versus.append(np.tile(names, len(names)))
+                p_values.append(df.to_numpy(dtype=np.float64).ravel())
+
+    counts = [count for _, count in labels]
+
+    table = pd.DataFrame({'property': np.repeat(np.array([label[0] for label, _ in labels], dtype=object), counts),
+                          'zones': np.repeat(np.array([label[1] for label, _ in labels], dtype=object), counts),
+                          'day': np.repeat(np.array([label[2] for label, _ in labels], dtype=object), counts),
+                          'group': np.concatenate(groups) if groups else np.empty(0, dtype=object),
+                          'versus': np.concatenate(versus) if versus else np.empty(0, dtype=object),
+                          'p_value': np.concatenate(p_values) if p_values else np.empty(0)})
+
+    return table
+
+
+def export_columnar_bundle(directory, data_frame, metadata, groups, statistics, student_tests, confidence_intervals=None,
+                           callback=None):
+    """Export the data, the groups, the statistics and the student tests to a directory of columnar files.
+
+    Each table is written as an uncompressed feather file such as it can be memory-mapped when read back. A JSON
+    manifest describes the data (animal type, days, zones, properties) and the files and columns of each table:
+        - data: the data read from the excel file, with the same columns as the data sheet of the excel export
+        - groups: one row per (group, animal) with the selection state of the group
+        - statistics: one row per (property, statistic, group, zones) and one column per day
+        - student_tests: one row per (property, zones, day, group, versus) with the adjusted p value
+
+    The manifest of a bundle exported before into the same directory is removed first such as an interrupted export
+    does not leave a manifest describing the tables of another export.
+
+    Args:
+        directory (str): the directory of the bundle. It is created if it does not exist.
+        data_frame (pandas.DataFrame): the data read from the excel file
+        metadata (dict): the metadata of the data (days, properties, zones, animal ...)
+        groups (list of 3-tuples): the name, the animals and the selection state of each group
+        statistics (collections.OrderedDict): the statistics per property
+        student_tests (collections.OrderedDict): the student tests per property
+        confidence_intervals (collections.OrderedDict): the confidence intervals per property. If given, their lower
+            and upper bounds are written with the statistics.
+        callback (callable): a function called with the number of steps done so far. The steps are the tables and the
+            manifest.
+
+    Raises:
+        ImportError: if pyarrow is not installed
+        PermissionError: if the bundle can not be written
+    """
+
+    os.makedirs(directory, exist_ok=True)
+
+    # The manifest of a previous export would describe tables which are about to be overwritten
+    manifest_filename = os.path.join(directory, 'manifest.json')
+    if os.path.exists(manifest_filename):
+        os.remove(manifest_filename)
+
+    days = list(metadata['days'])
+
+    tables = [('data', data_frame.reset_index(drop=True)),
+              ('groups', _groups_table(groups)),
+              ('statistics', _statistics_table(statistics, confidence_intervals, days)),
+              ('student_tests', _student_tests_table(student_tests))]
+
+    manifest = {'version': COLUMNAR_BUNDLE_VERSION,
+                'animal': metadata['animal'],
+                'days': days,
+                'zones': list(metadata['zones']),
+                'properties': list(statistics.keys()),
+                'tables': {}}
+
+    for i, (name, table) in enumerate(tables):
+        filename = '{}.feather'.format(name)
+        table.to_feather(os.path.join(directory, filename), compression='uncompressed')
+        manifest['tables'][name] = {'file': filename, 'columns': [str(c) for c in table.columns], 'n_rows': len(table)}
+        if callback is not None:
+            callback(i + 1)
+
+    # The manifest is written last and moved into place such as a bundle with a manifest is complete
+    with open(manifest_filename + '.tmp', 'w') as fout:
+        json.dump(manifest, fout, indent=4)
+    os.replace(manifest_filename + '.tmp', manifest_filename)
+
+    if callback is not None:
+        callback(len(tables) + 1)
@@ -0,0 +1,142 @@
+"""This module implements the following classes and functions:
+    - export_excel_file
+
+The export does not depend on Qt such as it can be used by the GUI and by the batch processing.
+"""
+
+import itertools
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+
+def _append_data_frames(sheet, data_frames):
+    """Append a dictionary of data frames to a sheet, one data frame below the other. Each data frame is preceded by
+    its name and followed by an empty row.
+
+    Args:
+        sheet (openpyxl.worksheet._write_only.WriteOnlyWorksheet): the sheet
+        data_frames (dict): the data frames
+    """
+
+    for name, df in data_frames.items():
+        sheet.append([name])
+        sheet.append([None] + list(df.columns))
+        for label, values in zip(df.index, df.to_numpy().tolist()):
+            sheet.append([label] + values)
+        sheet.append([])
+
+
+def _append_header(sheet, values):
+    """Append a header row to a sheet with the style used by pandas.
+
+    Args:
+        sheet (openpyxl.worksheet._write_only.WriteOnlyWorksheet): the sheet
+        values (list): the values of the header
+    """
+
+    thin = Side(style='thin')
+
+    row = []
+    for value in values:
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal='center', vertical='top')
+        row.append(cell)
+
+    sheet.append(row)
+
+
+def _append_sheets(workbook, data_frame, groups, statistics, student_tests, confidence_intervals, callback):
+    """Append the sheets of the export to a write-only workbook.
+
+    Args:
+        workbook (openpyxl.Workbook): the workbook
+        data_frame (pandas.DataFrame): the data read from the excel file
+        groups (list of 3-tuples): the name, the animals and the selection state of each group
+        statistics (collections.OrderedDict): the statistics per property
+        student_tests (collections.OrderedDict): the student tests per property
+        confidence_intervals (collections.OrderedDict): the confidence intervals per property or None
+        callback (callable): the function called with the number of sheets appended so far
+    """
+
+    # Export the current data to 'data' sheet
+    data_sheet = workbook.create_sheet('data')
+    _append_header(data_sheet, list(data_frame.columns))
+    for values in data_frame.astype(object).where(data_frame.notna(), None).to_numpy().tolist():
+        data_sheet.append(values)
+    callback(1)
+
+    # Export the groups, one group per column
+    groups_sheet = workbook.create_sheet('groups')
+    selected_groups = [(group, mice) for group, mice, selected in groups if selected]
+    groups_sheet.append([group for group, _ in selected_groups])
+    for mice in itertools.zip_longest(*[mice for _, mice in selected_groups]):
+        groups_sheet.append(list(mice))
+    callback(2)
+
+    # Export the statistics
+    for i, (prop, prop_statistics) in enumerate(statistics.items()):
+        statistics_sheet = workbook.create_sheet('statistics {}'.format(prop))
+
+        statistics_sheet.append(['selected property', prop])
+        for s in ['mean', 'std', 'n']:
+            statistics_sheet.append([s])
+            _append_data_frames(statistics_sheet, prop_statistics[s])
+
+        if confidence_intervals is not None:
+            for s in ['lower', 'upper']:
+                statistics_sheet.append(['ci {}'.format(s)])
+                _append_data_frames(statistics_sheet, confidence_intervals[prop][s])
+
+        # Export the student test to 'student test' sheet
+        student_test_sheet = workbook.create_sheet('student tests {}'.format(prop))
+
+        student_test_sheet.append(['selected property', prop])
+        for zone, df_dict in student_tests[prop].items():
+            student_test_sheet.append([zone])
+            _append_data_frames(student_test_sheet, df_dict)
+
+        callback(3 + i)
+
+
+def export_excel_file(filename, data_frame, groups, statistics, student_tests, confidence_intervals=None, callback=None):
+    """Export the data, the groups, the statistics and the student tests to an excel file.
+
+    The sheets are streamed row by row to a write-only workbook such as the file is written in a single pass.
+
+    Args:
+        filename (str): the excel file
+        data_frame (pandas.DataFrame): the data read from the excel file
+        groups (list of 3-tuples): the name, the animals and the selection state of each group
+        statistics (collections.OrderedDict): the statistics per property
+        student_tests (collections.OrderedDict): the student tests per property
+        confidence_intervals (collections.OrderedDict): the confidence intervals per property. If given, their lower
+            and upper bounds are written below the statistics.
+        callback (callable): a function called with the number of steps done so far. The steps are the data sheet,
+            the groups sheet, the statistics and student tests sheets of each property and the saving of the file.
+
+    Raises:
+        PermissionError: if the excel file can not be written
+    """
+
+    if callback is None:
+        def callback(step):
+            pass
+
+    workbook = Workbook(write_only=True)
+
+    try:
+        _append_sheets(workbook, data_frame, groups, statistics, student_tests, confidence_intervals, callback)
+        workbook.save(filename)
+    except Exception:
+        # The sheets which are still open are closed such as the discarded workbook does not try to write them when
+        # it is garbage collected
+        for sheet in workbook.worksheets:
+            if not sheet.closed:
+                sheet.close()
+        raise
+
+    callback(3 + len(statistics))
@@ -0,0 +1,121 @@
+"""This module implements the following classes and functions:
+    - read_excel_file_baseline
+
+The reader of the monitoring excel files as it was implemented in ExcelFilesModel.add_excel_file before the streaming
+reader and the vectorized normalisation. It is slow but simple and serves as a reference for the regression tests of
+mousetracker.kernel.readers.excel_reader.
+
+The renaming of the duplicate animal names took only the animals of the last group sheet into account and hence failed
+for the workbooks with several group sheets. The names of the animals of all the sheets are now renamed. Otherwise, only
+the calls deprecated by pandas have been replaced by equivalent ones.
+"""
+
+import collections
+import re
+
+import openpyxl
+
+import pandas as pd
+
+
+def read_excel_file_baseline(excel_file):
+    """Read a monitoring excel file with the baseline implementation.
+
+    Args:
+        excel_file (str): the excel file
+
+    Returns:
+        tuple: the data frame and its metadata (days, properties, zones, animal ...)
+    """
+
+    sheet_names = openpyxl.load_workbook(excel_file).sheetnames
+    group_sheets = [sheet for sheet in sheet_names if re.match(r'^groupe.*', sheet.strip(), re.I)]
+
+    data_frame = pd.DataFrame([])
+
+    for group_sheet in group_sheets:
+
+        df = pd.read_excel(excel_file, sheet_name=group_sheet, header=(0, 1))
+
+        # Find the number of zones (this must always be the 3rd column of the file)
+        zones = list(collections.OrderedDict.fromkeys(df.iloc[:, 2]))
+        n_zones = len(zones)
+
+        # Retrieve the name of the animal (e.g. Lapin, Souris). Take care this is a 2-level column name
+        animal = df.columns[1][1]
+
+        # For rabbit files there is an extra header column (Exposé)
+        n_header_properties = 3 if animal == 'Lapins' else 2
+
+        n_animals = len(df.index)//n_zones
+
+        # Drop the first column
+        df = df.drop(('Unnamed: 0_level_0', 'Num expé'), axis=1)
+
+        # Expand the animal number for all zones and not only the first one
+        for i in range(n_animals):
+            df.loc[n_zones*i+1:n_zones*(i+1)-1, ('Unnamed: 1_level_0', animal)] = df.loc[n_zones*i, ('Unnamed: 1_level_0', animal)]
+        df[('Unnamed: 1_level_0', animal)] = df[('Unnamed: 1_level_0', animal)].astype(int)
+
+        # Find the unique days
+        days = [col[0] for col in df.columns[n_header_properties:]]
+        days = list(collections.OrderedDict.fromkeys(days))
+        n_days = len(days)
+
+        # Find the duplicate properties i.e. the ones which are written through two columns in the excel file
+        duplicate_properties = []
+        for _, prop in df.columns[n_header_properties:]:
+            if prop.strip()[-2:] == '.1':
+                prop = prop.split('.1')[0]
+                if prop not in duplicate_properties:
+                    duplicate_properties.append(prop)
+
+        for day in days:
+
+            # Expand the weight which is written in only one cell
+            for i in range(n_animals):
+                df.loc[n_zones*i+1:n_zones*(i+1)-1, (day, 'Poids')] = df.loc[n_zones*i, (day, 'Poids')]
+
+            # For each duplicate property, compute the average
+            for p in duplicate_properties:
+                df[(day, p)] = df[[(day, p), (day, '{}.1'.format(p))]].mean(axis=1)
+
+        # Remove the second instance of the duplicate (the one that ends with .1)
+        for p in duplicate_properties:
+            df = df.drop('{}.1'.format(p), axis=1, level=1)
+
+        columns = ['-'.join(col) for col in df.columns]
+        columns[0] = animal
+        columns[1] = 'Zone'
+        if animal == 'Lapins':
+            columns[2] = 'Exposé'
+        df.columns = columns
+
+        # Retrieve all the unique properties
+        properties = list(collections.OrderedDict.fromkeys([col.split('-')[-1] for col in df.columns[n_header_properties:]]))
+        n_properties = len(properties)
+
+        data_frame = pd.concat([data_frame, df])
+
+    n_total_animals = len(data_frame.index)//n_zones
+
+    # Check and correct for redundant animal names
+    data_frame[animal] = data_frame[animal].astype(int).astype(object)
+    animal_names = [data_frame.iloc[n_zones*i, 0] for i in range(n_total_animals)]
+    animal_names = [str(v) + '_' + str(animal_names[:i].count(v) + 1) if animal_names.count(v) > 1 else str(v)
+                    for i, v in enumerate(animal_names)]
+    for i in range(n_total_animals):
+        data_frame.iloc[n_zones*i:n_zones*i+n_zones, 0] = animal_names[i]
+
+    data_frame = data_frame.round(1)
+
+    metadata = collections.OrderedDict([('n_days', n_days),
+                                        ('days', days),
+                                        ('n_properties', n_properties),
+                                        ('properties', properties),
+                                        ('n_zones', n_zones),
+                                        ('zones', zones),
+                                        ('animal', animal),
+                                        ('n_header_properties', n_header_properties)])
+
+    return data_frame, metadata
@@ -0,0 +1,104 @@
+"""This module implements the following classes and functions:
+    - export_excel_file_baseline
+
+The excel export as it was implemented before the sheets were streamed to a write-only workbook: the data sheet was
+written by pandas and the file was loaded again such as the other sheets were filled one cell at a time. It is slow
+but simple and serves as a reference for the regression tests of mousetracker.kernel.writers.excel_writer.
+"""
+
+from openpyxl import load_workbook
+
+
+def _write_data_frames(sheet, comp, data_frames):
+    """Write a dictionary of data frames to a sheet, one data frame below the other.
+
+    Args:
+        sheet (openpyxl.worksheet.worksheet.Worksheet): the sheet
+        comp (int): the last row written so far
+        data_frames (dict): the data frames
+
+    Returns:
+        int: the last row written
+    """
+
+    for name, df in data_frames.items():
+        comp += 1
+        sheet.cell(row=comp, column=1).value = name
+        # Write the column of the dataframe
+        comp += 1
+        for i, c in enumerate(df.columns):
+            sheet.cell(row=comp, column=i+2).value = c
+        # Write the index and data of the dataframe
+        for i in range(len(df.index)):
+            comp += 1
+            sheet.cell(row=comp, column=1).value = df.index[i]
+            for j in range(len(df.columns)):
+                sheet.cell(row=comp, column=j+2).value = df.iloc[i, j]
+        comp += 1
+
+    return comp
+
+
+def export_excel_file_baseline(filename, data_frame, groups, statistics, student_tests, confidence_intervals=None):
+    """Export the data, the groups, the statistics and the student tests to an excel file with the baseline
+    implementation.
+
+    Args:
+        filename (str): the excel file
+        data_frame (pandas.DataFrame): the data read from the excel file
+        groups (list of 3-tuples): the name, the animals and the selection state of each group
+        statistics (collections.OrderedDict): the statistics per property
+        student_tests (collections.OrderedDict): the student tests per property
+        confidence_intervals (collections.OrderedDict): the confidence intervals per property. If given, their lower
+            and upper bounds are written below the statistics.
+
+    Raises:
+        PermissionError: if the excel file can not be written
+    """
+
+    # Export the current data to 'data' sheet
+    data_frame.to_excel(filename, sheet_name='data', index=False)
+
+    workbook = load_workbook(filename=filename)
+
+    # Export the groups
+    groups_sheet = workbook.create_sheet('groups')
+    comp = 0
+    for group, mice, selected in groups:
+        if not selected:
+            continue
+        comp += 1
+        groups_sheet.cell(row=1, column=comp).value = group
+        for i, mouse in enumerate(mice):
+            groups_sheet.cell(row=i+2, column=comp).value = mouse
+
+    # Export the statistics
+    for prop, prop_statistics in statistics.items():
+        statistics_sheet = workbook.create_sheet('statistics {}'.format(prop))
+
+        comp = 1
+        statistics_sheet.cell(row=comp, column=1).value = 'selected property'
+        statistics_sheet.cell(row=comp, column=2).value = prop
+        for s in ['mean', 'std', 'n']:
+            comp += 1
+            statistics_sheet.cell(row=comp, column=1).value = s
+            comp = _write_data_frames(statistics_sheet, comp, prop_statistics[s])
+
+        if confidence_intervals is not None:
+            for s in ['lower', 'upper']:
+                comp += 1
+                statistics_sheet.cell(row=comp, column=1).value = 'ci {}'.format(s)
+                comp = _write_data_frames(statistics_sheet, comp, confidence_intervals[prop][s])
+
+        # Export the student test to 'student test' sheet
+        student_test_sheet = workbook.create_sheet('student tests {}'.format(prop))
+        comp = 1
+        student_test_sheet.cell(row=comp, column=1).value = 'selected property'
+        student_test_sheet.cell(row=comp, column=2).value = prop
+
+        for zone, df_dict in student_tests[prop].items():
+            comp += 1
+            student_test_sheet.cell(row=comp, column=1).value = zone
+            comp = _write_data_frames(student_test_sheet, comp, df_dict)
+
+    workbook.save(filename)
@@ -0,0 +1,136 @@
+"""Fixtures shared by the tests.
+
+The workbooks are generated with the layout of the mousetracker files: one sheet per group of animals, two header rows
+(the days and the properties), one row per animal and zone, the weight being written only for the first zone of each
+animal and some properties being written through two columns.
+"""
+
+import os
+import random
+import sys
+
+import openpyxl
+
+import pytest
+
+# The tests run against the sources without having to install the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+PROPERTIES = ('Poids', 'Temp', 'Temp', 'Score', 'Score', 'Resp')
+
+
+def make_workbook(filename, n_sheets, n_animals, n_days, zones='ABCDE', animal='Souris', seed=0, missing_rate=0.1):
+    """Write a workbook with the layout of the mousetracker files.
+
+    The fourth animal of each sheet is numbered 1 such as the workbook has duplicate animal numbers.
+
+    Args:
+        filename (str): the excel file
+        n_sheets (int): the number of group sheets
+        n_animals (int): the number of animals per group sheet
+        n_days (int): the number of days
+        zones (str): the zones
+        animal (str): the animal type (Souris or Lapins)
+        seed (int): the seed of the random values
+        missing_rate (float): the fraction of the values which are missing
+    """
+
+    rng = random.Random(seed)
+
+    workbook = openpyxl.Workbook()
+    workbook.active.title = 'Notes'
+    workbook.active.append(['this sheet is not a group sheet'])
+
+    n_header_columns = 4 if animal == 'Lapins' else 3
+
+    animal_number = 1
+    for s in range(n_sheets):
+        sheet = workbook.create_sheet('Groupe {}'.format(s + 1))
+
+        days_row = [None]*n_header_columns
+        properties_row = ['Num expé', animal, 'Zone'] + (['Exposé'] if animal == 'Lapins' else [])
+        for d in range(n_days):
+            days_row += ['J{}'.format(d)] + [None]*(len(PROPERTIES) - 1)
+            properties_row += list(PROPERTIES)
+        sheet.append(days_row)
+        sheet.append(properties_row)
+
+        for d in range(n_days):
+            first_column = n_header_columns + 1 + d*len(PROPERTIES)
+            sheet.merge_cells(start_row=1, start_column=first_column, end_row=1, end_column=first_column + len(PROPERTIES) - 1)
+
+        for a in range(n_animals):
+            number = 1 if a == 3 else animal_number
+            animal_number += 1
+            weight = rng.uniform(20, 30)
+            for z, zone in enumerate(zones):
+                row = [1000*s + a if z == 0 else None, number if z == 0 else None, zone]
+                if animal == 'Lapins':
+                    row.append('oui' if a % 2 else 'non')
+                for d in range(n_days):
+                    for prop in PROPERTIES:
+                        if prop == 'Poids':
+                            row.append(round(weight - rng.uniform(0, 3)*d, 2) if z == 0 else None)
+                        elif rng.random() < missing_rate:
+                            row.append(None)
+                        elif rng.random() < 0.2:
+                            row.append(rng.randint(0, 10))
+                        else:
+                            row.append(rng.uniform(0, 10))
+                sheet.append(row)
+
+    workbook.save(filename)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def workbook_cache_directory(tmp_path_factory):
+    """Store the entries of the workbook cache shared by the application in a temporary directory."""
+
+    from mousetracker.kernel.readers.workbook_cache import workbook_cache
+
+    directory = workbook_cache.directory
+    workbook_cache.directory = str(tmp_path_factory.mktemp('workbook_cache'))
+
+    yield workbook_cache.directory
+
+    workbook_cache.directory = directory
+
+
+@pytest.fixture(scope='session')
+def mice_excel_file(tmp_path_factory):
+    """A workbook of mice with a single group sheet."""
+
+    filename = str(tmp_path_factory.mktemp('workbooks') / 'mice.xlsx')
+    make_workbook(filename, n_sheets=1, n_animals=8, n_days=4, seed=1)
+
+    return filename
+
+
+@pytest.fixture(scope='session')
+def rabbits_excel_file(tmp_path_factory):
+    """A workbook of rabbits, which have an extra header column, with a single group sheet."""
+
+    filename = str(tmp_path_factory.mktemp('workbooks') / 'rabbits.xlsx')
+    make_workbook(filename, n_sheets=1, n_animals=7, n_days=3, zones='GD', animal='Lapins', seed=2)
+
+    return filename
+
+
+@pytest.fixture(scope='session')
+def multi_sheets_excel_file(tmp_path_factory):
+    """A workbook of mice with three group sheets sharing duplicate animal numbers."""
+
+    filename = str(tmp_path_factory.mktemp('workbooks') / 'multi_sheets.xlsx')
+    make_workbook(filename, n_sheets=3, n_animals=5, n_days=3, seed=3)
+
+    return filename
+
+
+@pytest.fixture(scope='session')
+def complete_excel_file(tmp_path_factory):
+    """A workbook of mice with two group sheets and without missing values."""
+
+    filename = str(tmp_path_factory.mktemp('workbooks') / 'complete.xlsx')
+    make_workbook(filename, n_sheets=2, n_animals=6, n_days=3, seed=4, missing_rate=0.0)
+
+    return filename
@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+
+import pytest
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.readers.excel_reader import read_excel_file
+from mousetracker.kernel.statistics.group_statistics import (get_confidence_intervals_batch, get_statistics_batch,
+                                                             get_statistics_zones, get_student_tests,
+                                                             get_student_tests_zones)
+from mousetracker.kernel.writers.columnar_writer import export_columnar_bundle
+
+pytest.importorskip('pyarrow')
+
+from mousetracker.kernel.readers.columnar_reader import read_columnar_bundle  # noqa: E402
+
+
+@pytest.fixture
+def results(mice_excel_file):
+    """The data frame, the metadata, the groups, the statistics, the student tests and the confidence intervals."""
+
+    data_frame, metadata = read_excel_file(mice_excel_file)
+
+    cube = MonitoringCube.from_data_frame(data_frame, metadata)
+
+    groups = [('g0', cube.animals[::2], True), ('g1', cube.animals[1::2], True)]
+
+    group_index = GroupIndex(cube, groups)
+
+    properties = metadata['properties']
+    statistics_zones = get_statistics_zones(metadata['animal'])
+
+    statistics = get_statistics_batch(group_index, properties, statistics_zones)
+    confidence_intervals = get_confidence_intervals_batch(group_index, properties, statistics_zones)
+    student_tests = {prop: get_student_tests(group_index, prop, get_student_tests_zones(metadata['animal']))
+                     for prop in properties}
+
+    return data_frame, metadata, groups, statistics, student_tests, confidence_intervals
+
+
+def test_round_trip(tmp_path, results):
+    """The tables read back from a bundle are the ones which were exported."""
+
+    data_frame, metadata, groups, statistics, student_tests, confidence_intervals = results
+
+    steps = []
+    export_columnar_bundle(str(tmp_path), data_frame, metadata, groups, statistics, student_tests,
+                           confidence_intervals=confidence_intervals, callback=steps.append)
+
+    assert steps == [1, 2, 3, 4, 5]
+
+    manifest, tables = read_columnar_bundle(str(tmp_path))
+
+    assert manifest['days'] == metadata['days']
+    assert manifest['properties'] == metadata['properties']
+    assert list(tables) == ['data', 'groups', 'statistics', 'student_tests']
+
+    pd.testing.assert_frame_equal(tables['data'].to_pandas(), data_frame.reset_index(drop=True))
+
+    groups_table = tables['groups'].to_pandas()
+    assert len(groups_table.index) == sum(len(animals) for _, animals, _ in groups)
+
+    statistics_table = tables['statistics'].to_pandas().set_index(['property', 'statistic', 'group', 'zones'])
+    for prop in metadata['properties']:
+        for group_name, df in statistics[prop]['mean'].items():
+            for zones, values in df.iterrows():
+                assert list(statistics_table.loc[(prop, 'mean', group_name, zones)]) == list(values)
+        for group_name, df in confidence_intervals[prop]['upper'].items():
+            for zones, values in df.iterrows():
+                pd.testing.assert_series_equal(statistics_table.loc[(prop, 'ci upper', group_name, zones)], values,
+                                               check_names=False)
+
+
+def test_stale_manifest_removed(tmp_path, results):
+    """An interrupted export into the directory of a previous bundle does not leave the previous manifest."""
+
+    data_frame, metadata, groups, statistics, student_tests, _ = results
+
+    export_columnar_bundle(str(tmp_path), data_frame, metadata, groups, statistics, student_tests)
+
+    def interrupt(step):
+        if step == 2:
+            raise RuntimeError('interrupted')
+
+    with pytest.raises(RuntimeError):
+        export_columnar_bundle(str(tmp_path), data_frame, metadata, groups[:1], statistics, student_tests, callback=interrupt)
+
+    assert not os.path.exists(os.path.join(str(tmp_path), 'manifest.json'))
+
+    with pytest.raises(FileNotFoundError):
+        read_columnar_bundle(str(tmp_path))
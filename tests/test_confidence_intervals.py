@@ -0,0 +1,122 @@
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+import scipy.stats
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.readers.excel_reader import read_excel_file
+from mousetracker.kernel.statistics.group_statistics import get_confidence_intervals_batch, get_statistics_batch, get_statistics_zones
+
+
+@pytest.fixture
+def data(multi_sheets_excel_file):
+    """The metadata and the group index of a workbook with missing values and three groups, the last one being
+    unselected."""
+
+    data_frame, metadata = read_excel_file(multi_sheets_excel_file)
+
+    cube = MonitoringCube.from_data_frame(data_frame, metadata)
+
+    groups = [('g{}'.format(i), cube.animals[i::3], i < 2) for i in range(3)]
+
+    return metadata, GroupIndex(cube, groups)
+
+
+def assert_confidence_intervals_equal(confidence_intervals, expected):
+    """The resamples are the same, only the rounding errors of the matrix products depend on the size of the chunks."""
+
+    assert list(confidence_intervals) == list(expected)
+    for prop, bounds in expected.items():
+        for bound in ['lower', 'upper']:
+            assert list(confidence_intervals[prop][bound]) == list(bounds[bound])
+            for group_name, df in bounds[bound].items():
+                pd.testing.assert_frame_equal(confidence_intervals[prop][bound][group_name], df, rtol=1e-12)
+
+
+@pytest.mark.parametrize('memory_budget', [1, 4096, 256*1024])
+def test_memory_budget(data, memory_budget):
+    """The intervals do not depend on the size of the chunks of resamples."""
+
+    metadata, group_index = data
+
+    zones = get_statistics_zones(metadata['animal'])
+
+    expected = get_confidence_intervals_batch(group_index, metadata['properties'], zones, n_resamples=300)
+
+    confidence_intervals = get_confidence_intervals_batch(group_index, metadata['properties'], zones, n_resamples=300,
+                                                          memory_budget=memory_budget)
+
+    assert_confidence_intervals_equal(confidence_intervals, expected)
+
+
+def test_reproducible(data):
+    """The intervals depend on the seed only and not on the other properties."""
+
+    metadata, group_index = data
+
+    zones = get_statistics_zones(metadata['animal'])
+    properties = metadata['properties']
+
+    confidence_intervals = get_confidence_intervals_batch(group_index, properties, zones, n_resamples=300, seed=2)
+
+    expected = get_confidence_intervals_batch(group_index, properties[1:2], zones, n_resamples=300, seed=2)
+    assert_confidence_intervals_equal({properties[1]: confidence_intervals[properties[1]]}, expected)
+
+    other_confidence_intervals = get_confidence_intervals_batch(group_index, properties[1:2], zones, n_resamples=300, seed=3)
+    assert not other_confidence_intervals[properties[1]]['lower']['g0'].equals(expected[properties[1]]['lower']['g0'])
+
+
+def test_bounds_around_mean(data):
+    """The intervals of the selected groups contain the averages of the groups."""
+
+    metadata, group_index = data
+
+    zones = get_statistics_zones(metadata['animal'])
+
+    statistics = get_statistics_batch(group_index, metadata['properties'], zones)
+    confidence_intervals = get_confidence_intervals_batch(group_index, metadata['properties'], zones, n_resamples=500)
+
+    for prop in metadata['properties']:
+        assert list(confidence_intervals[prop]['lower']) == ['g0', 'g1']
+        for group_name, mean in statistics[prop]['mean'].items():
+            lower = confidence_intervals[prop]['lower'][group_name]
+            upper = confidence_intervals[prop]['upper'][group_name]
+            assert list(lower.index) == list(mean.index)
+            assert (lower <= mean + 1.0e-9).all().all()
+            assert (mean <= upper + 1.0e-9).all().all()
+
+
+def test_coverage():
+    """The 95% intervals of the means of normal samples contain the true mean about 95% of the time and are close to
+    the intervals of the normal theory."""
+
+    rng = np.random.default_rng(0)
+
+    n_animals = 40
+    n_samples = 400
+    mu, sigma = 20.0, 3.0
+
+    # Each day is an independent sample of the animals
+    values = rng.normal(mu, sigma, size=(n_animals, 1, n_samples, 1))
+
+    animals = ['{}'.format(i) for i in range(n_animals)]
+    days = ['J{}'.format(i) for i in range(n_samples)]
+
+    cube = MonitoringCube(values, animals, ['E'], days, ['Temp'], 'Souris')
+
+    group_index = GroupIndex(cube, [('g0', animals, True)])
+
+    confidence_intervals = get_confidence_intervals_batch(group_index, ['Temp'], [('E',)], n_resamples=2000)
+
+    lower = confidence_intervals['Temp']['lower']['g0'].loc['E'].to_numpy()
+    upper = confidence_intervals['Temp']['upper']['g0'].loc['E'].to_numpy()
+
+    coverage = np.mean((lower <= mu) & (mu <= upper))
+    assert 0.90 <= coverage <= 0.99
+
+    half_widths = scipy.stats.norm.ppf(0.975)*values[:, 0, :, 0].std(axis=0)/np.sqrt(n_animals)
+    np.testing.assert_allclose(np.mean((upper - lower)/2.0/half_widths), 1.0, atol=0.05)
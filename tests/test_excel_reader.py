@@ -0,0 +1,87 @@
+import re
+
+import openpyxl
+
+import pandas as pd
+
+import pytest
+
+from baseline_reader import read_excel_file_baseline
+
+from mousetracker.kernel.readers.excel_reader import normalize_sheet, read_excel_file, read_sheet, rename_duplicates
+
+EXCEL_FILES = ['mice_excel_file', 'rabbits_excel_file', 'multi_sheets_excel_file']
+
+
+@pytest.mark.parametrize('excel_file', EXCEL_FILES)
+def test_read_sheet(excel_file, request):
+    """The streamed contents of each group sheet are the ones read by pandas."""
+
+    excel_file = request.getfixturevalue(excel_file)
+
+    workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    group_sheets = [sheet for sheet in workbook.sheetnames if re.match(r'^groupe.*', sheet.strip(), re.I)]
+    assert group_sheets
+
+    for group_sheet in group_sheets:
+        expected = pd.read_excel(excel_file, sheet_name=group_sheet, header=(0, 1))
+        pd.testing.assert_frame_equal(read_sheet(workbook[group_sheet]), expected)
+
+
+@pytest.mark.parametrize('excel_file', EXCEL_FILES)
+def test_normalize_sheet(excel_file, request):
+    """Each normalized sheet has the animals, zones, days and properties of the baseline reader."""
+
+    excel_file = request.getfixturevalue(excel_file)
+
+    expected, expected_metadata = read_excel_file_baseline(excel_file)
+
+    workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    group_sheets = [sheet for sheet in workbook.sheetnames if re.match(r'^groupe.*', sheet.strip(), re.I)]
+
+    n_rows = 0
+    for group_sheet in group_sheets:
+        df, metadata = normalize_sheet(read_sheet(workbook[group_sheet]))
+        for key in ['days', 'properties', 'zones', 'animal', 'n_header_properties']:
+            assert metadata[key] == expected_metadata[key]
+        assert list(df.columns) == list(expected.columns)
+
+        # The animal names are renamed once all the sheets have been read
+        values = df.iloc[:, 1:].round(1).reset_index(drop=True)
+        expected_values = expected.iloc[n_rows:n_rows + len(df.index), 1:].reset_index(drop=True)
+        pd.testing.assert_frame_equal(values, expected_values, check_dtype=False)
+        n_rows += len(df.index)
+
+    assert n_rows == len(expected.index)
+
+
+@pytest.mark.parametrize('excel_file', EXCEL_FILES)
+def test_read_excel_file(excel_file, request):
+    """The data frame and the metadata are the ones of the baseline reader."""
+
+    excel_file = request.getfixturevalue(excel_file)
+
+    expected, expected_metadata = read_excel_file_baseline(excel_file)
+
+    data_frame, metadata = read_excel_file(excel_file)
+
+    pd.testing.assert_frame_equal(data_frame, expected)
+    for key, value in expected_metadata.items():
+        assert metadata[key] == value
+
+
+def test_read_excel_file_multi_sheets(multi_sheets_excel_file):
+    """The duplicate animal numbers are renamed across all the group sheets."""
+
+    data_frame, metadata = read_excel_file(multi_sheets_excel_file)
+
+    names = list(data_frame[metadata['animal']][::metadata['n_zones']])
+
+    assert len(names) == 15
+    assert len(set(names)) == len(names)
+    assert [name for name in names if name.startswith('1_')] == ['1_1', '1_2', '1_3', '1_4']
+
+
+def test_rename_duplicates():
+
+    assert rename_duplicates([1, 2, 1, 3, 1, 2]) == ['1_1', '2_1', '1_2', '3', '1_3', '2_2']
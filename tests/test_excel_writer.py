@@ -0,0 +1,87 @@
+import math
+
+import openpyxl
+
+import pytest
+
+from baseline_writer import export_excel_file_baseline
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.readers.excel_reader import read_excel_file
+from mousetracker.kernel.statistics.group_statistics import (get_confidence_intervals_batch, get_statistics_batch,
+                                                             get_statistics_zones, get_student_tests,
+                                                             get_student_tests_zones)
+from mousetracker.kernel.writers.excel_writer import export_excel_file
+
+
+@pytest.fixture(params=['mice_excel_file', 'rabbits_excel_file'])
+def results(request):
+    """The data frame, the groups, the statistics, the student tests and the confidence intervals of a workbook with
+    missing values and three groups, the last one being unselected."""
+
+    data_frame, metadata = read_excel_file(request.getfixturevalue(request.param))
+
+    cube = MonitoringCube.from_data_frame(data_frame, metadata)
+
+    groups = [('g{}'.format(i), cube.animals[i::3], i < 2) for i in range(3)]
+
+    group_index = GroupIndex(cube, groups)
+
+    properties = metadata['properties'][:3]
+    statistics_zones = get_statistics_zones(metadata['animal'])
+
+    statistics = get_statistics_batch(group_index, properties, statistics_zones)
+    confidence_intervals = get_confidence_intervals_batch(group_index, properties, statistics_zones, n_resamples=200)
+    student_tests = {prop: get_student_tests(group_index, prop, get_student_tests_zones(metadata['animal']))
+                     for prop in properties}
+
+    return data_frame, groups, statistics, student_tests, confidence_intervals
+
+
+def cell_value(cell):
+    """Return the value of a cell, the NaN being compared as such."""
+
+    value = cell.value
+    if isinstance(value, float) and math.isnan(value):
+        return 'nan'
+
+    return value
+
+
+@pytest.mark.parametrize('with_confidence_intervals', [True, False])
+def test_same_workbook_as_baseline(tmp_path, results, with_confidence_intervals):
+    """The sheets, the cells, the types of the values and the style of the header are the ones of the baseline writer."""
+
+    data_frame, groups, statistics, student_tests, confidence_intervals = results
+    if not with_confidence_intervals:
+        confidence_intervals = None
+
+    filename = str(tmp_path / 'export.xlsx')
+    baseline_filename = str(tmp_path / 'baseline_export.xlsx')
+
+    steps = []
+    export_excel_file(filename, data_frame, groups, statistics, student_tests, confidence_intervals, callback=steps.append)
+    export_excel_file_baseline(baseline_filename, data_frame, groups, statistics, student_tests, confidence_intervals)
+
+    assert steps == list(range(1, 4 + len(statistics)))
+
+    workbook = openpyxl.load_workbook(filename)
+    baseline_workbook = openpyxl.load_workbook(baseline_filename)
+
+    assert workbook.sheetnames == baseline_workbook.sheetnames
+
+    for sheet_name in baseline_workbook.sheetnames:
+        sheet = workbook[sheet_name]
+        baseline_sheet = baseline_workbook[sheet_name]
+
+        rows = [[(cell_value(cell), type(cell.value)) for cell in row] for row in sheet.iter_rows()]
+        baseline_rows = [[(cell_value(cell), type(cell.value)) for cell in row] for row in baseline_sheet.iter_rows()]
+        assert rows == baseline_rows, sheet_name
+
+    for cell, baseline_cell in zip(workbook['data'][1], baseline_workbook['data'][1]):
+        assert cell.font.b == baseline_cell.font.b
+        for side in ['left', 'right', 'top', 'bottom']:
+            assert getattr(cell.border, side).style == getattr(baseline_cell.border, side).style
+        assert (cell.alignment.horizontal, cell.alignment.vertical) == (baseline_cell.alignment.horizontal,
+                                                                        baseline_cell.alignment.vertical)
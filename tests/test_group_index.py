@@ -0,0 +1,71 @@
+import numpy as np
+
+import pytest
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.readers.excel_reader import read_excel_file
+from mousetracker.kernel.statistics.group_statistics import get_statistics_batch, get_statistics_zones
+
+
+@pytest.fixture
+def data(multi_sheets_excel_file):
+    """The metadata, the cube and two groups of a workbook."""
+
+    data_frame, metadata = read_excel_file(multi_sheets_excel_file)
+
+    cube = MonitoringCube.from_data_frame(data_frame, metadata)
+
+    groups = [('g0', cube.animals[:5], True), ('g1', cube.animals[5:10], True)]
+
+    return metadata, cube, groups
+
+
+def test_update_group(data):
+    """The statistics updated with the moved animals only are the ones of an index built from scratch."""
+
+    metadata, cube, groups = data
+
+    zones = get_statistics_zones(metadata['animal'])
+
+    group_index = GroupIndex(cube, groups)
+    get_statistics_batch(group_index, metadata['properties'], zones)
+
+    # Move two animals from g0 to g1 and add an animal which was not in any group to g0
+    moved = groups[0][1][:2]
+    group_index.update_group(0, groups[0][1][2:] + [cube.animals[-1]])
+    group_index.update_group(1, groups[1][1] + moved)
+
+    statistics = get_statistics_batch(group_index, metadata['properties'], zones)
+
+    expected = get_statistics_batch(GroupIndex(cube, group_index.groups), metadata['properties'], zones)
+
+    for prop in metadata['properties']:
+        for s in ['mean', 'std', 'n']:
+            for group_name, df in expected[prop][s].items():
+                np.testing.assert_allclose(statistics[prop][s][group_name], df, rtol=1e-9, atol=1e-12)
+
+
+def test_contents_updated_after_groups_change():
+    """The views are notified of the changes of the animals of a group even after the index has been dropped."""
+
+    QtCore = pytest.importorskip('PyQt5.QtCore')
+
+    from mousetracker.kernel.models.groups_model import GroupsModel
+
+    groups_model = GroupsModel(None, {'days': []}, None)
+
+    calls = []
+    groups_model.contents_updated.connect(lambda: calls.append(groups_model.version))
+
+    groups_model.add_group('g0')
+    group_model = groups_model.data(groups_model.index(0, 0), GroupsModel.model)
+
+    group_model.add_item('1')
+    assert len(calls) == 1
+
+    # Renaming the group drops the index
+    groups_model.setData(groups_model.index(0, 0), 'g1', QtCore.Qt.EditRole)
+    group_model.add_item('2')
+    assert len(calls) == 2
+    assert calls[1] == groups_model.version
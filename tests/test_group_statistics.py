@@ -0,0 +1,92 @@
+import numpy as np
+
+import pytest
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.readers.excel_reader import read_excel_file
+from mousetracker.kernel.statistics.group_statistics import get_statistics, get_statistics_batch, get_statistics_zones
+
+
+@pytest.fixture(params=['mice_excel_file', 'rabbits_excel_file', 'multi_sheets_excel_file'])
+def data(request):
+    """The data frame, the metadata, the cube and three groups of a workbook, the last one being unselected."""
+
+    data_frame, metadata = read_excel_file(request.getfixturevalue(request.param))
+
+    cube = MonitoringCube.from_data_frame(data_frame, metadata)
+
+    groups = [('g{}'.format(i), cube.animals[i::3], i < 2) for i in range(3)]
+
+    return data_frame, metadata, cube, groups
+
+
+def expected_statistics(data_frame, metadata, animals, zones, prop):
+    """Compute the statistics of a group with pandas, the way the statistics used to be computed.
+
+    Returns:
+        tuple: the mean, the standard deviation and the number of valid values per day
+    """
+
+    fylter = data_frame[metadata['animal']].isin(animals) & data_frame['Zone'].isin(zones)
+    values = data_frame[fylter][['{}-{}'.format(day, prop) for day in metadata['days']]].to_numpy(dtype=np.float64)
+
+    return np.nanmean(values, axis=0), np.nanstd(values, axis=0), np.sum(~np.isnan(values), axis=0)
+
+
+def test_get_statistics(data):
+    """The statistics of each group and zone are the ones computed with pandas on the data frame."""
+
+    data_frame, metadata, cube, groups = data
+
+    zones = get_statistics_zones(metadata['animal'])
+
+    for prop in metadata['properties']:
+        statistics = get_statistics(GroupIndex(cube, groups), prop, zones)
+
+        assert list(statistics['mean']) == ['g0', 'g1']
+
+        for group_name, animals, _ in groups[:2]:
+            assert list(statistics['mean'][group_name].index) == [''.join(zone) for zone in zones]
+            assert list(statistics['mean'][group_name].columns) == metadata['days']
+            for zone in zones:
+                mean, std, n = expected_statistics(data_frame, metadata, animals, zone, prop)
+                name = ''.join(zone)
+                np.testing.assert_allclose(statistics['mean'][group_name].loc[name], mean, rtol=1e-12)
+                np.testing.assert_allclose(statistics['std'][group_name].loc[name], std, rtol=1e-9, atol=1e-12)
+                np.testing.assert_array_equal(statistics['n'][group_name].loc[name], n)
+
+
+def test_get_statistics_batch(data):
+    """The statistics of several properties computed together are the ones of each property computed alone."""
+
+    _, metadata, cube, groups = data
+
+    zones = get_statistics_zones(metadata['animal'])
+
+    group_index = GroupIndex(cube, groups)
+
+    statistics = get_statistics_batch(group_index, metadata['properties'], zones)
+
+    for prop in metadata['properties']:
+        expected = get_statistics(GroupIndex(cube, groups), prop, zones)
+        for s in ['mean', 'std', 'n']:
+            for group_name, df in expected[s].items():
+                np.testing.assert_allclose(statistics[prop][s][group_name], df, rtol=1e-12)
+
+
+def test_any_zones_combination(data):
+    """The statistics of a combination of zones which is not one of the default ones are combined as well."""
+
+    data_frame, metadata, cube, groups = data
+
+    zone = (metadata['zones'][-1], metadata['zones'][0])
+    prop = metadata['properties'][-1]
+
+    statistics = get_statistics(GroupIndex(cube, groups), prop, [zone])
+
+    mean, std, n = expected_statistics(data_frame, metadata, groups[0][1], zone, prop)
+
+    np.testing.assert_allclose(statistics['mean']['g0'].iloc[0], mean, rtol=1e-12)
+    np.testing.assert_allclose(statistics['std']['g0'].iloc[0], std, rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(statistics['n']['g0'].iloc[0], n)
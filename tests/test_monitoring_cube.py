@@ -0,0 +1,90 @@
+import warnings
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.readers.excel_reader import read_excel_file
+
+
+@pytest.fixture(params=['mice_excel_file', 'rabbits_excel_file', 'multi_sheets_excel_file'])
+def data(request):
+    """The data frame, the metadata and the cube of a workbook."""
+
+    data_frame, metadata = read_excel_file(request.getfixturevalue(request.param))
+
+    return data_frame, metadata, MonitoringCube.from_data_frame(data_frame, metadata)
+
+
+def test_shape(data):
+
+    data_frame, metadata, cube = data
+
+    n_animals = len(data_frame.index)//metadata['n_zones']
+
+    assert cube.shape == (n_animals, metadata['n_zones'], metadata['n_days'], metadata['n_properties'])
+    assert cube.animals == list(data_frame[metadata['animal']][::metadata['n_zones']])
+    assert cube.present.all()
+
+
+def test_to_data_frame(data):
+    """The data frame rebuilt from the cube and its metadata are the ones the cube was built from."""
+
+    data_frame, metadata, cube = data
+
+    with warnings.catch_warnings():
+        # No attribute is set on the data frame, which pandas would warn about
+        warnings.simplefilter('error')
+        cube_data_frame, cube_metadata = cube.to_data_frame()
+
+    pd.testing.assert_frame_equal(cube_data_frame, data_frame, check_dtype=False)
+    assert cube_metadata == {k: v for k, v in metadata.items() if k != 'sheets'}
+
+
+def test_to_data_frame_selection(data):
+    """The metadata of a partial data frame describes the selected properties."""
+
+    data_frame, metadata, cube = data
+
+    properties = metadata['properties'][1:3]
+
+    cube_data_frame, cube_metadata = cube.to_data_frame(animals=cube.animals[:2], properties=properties)
+
+    assert cube_metadata['properties'] == properties
+    assert cube_metadata['n_properties'] == 2
+    assert list(cube_data_frame.columns[cube_metadata['n_header_properties']:]) == \
+        ['{}-{}'.format(day, prop) for day in metadata['days'] for prop in properties]
+
+
+def test_sample(data):
+    """The values of a property for some animals and zones are the ones filtered from the data frame."""
+
+    data_frame, metadata, cube = data
+
+    animals = cube.animals[::2]
+    zones = metadata['zones'][:2]
+    prop = metadata['properties'][1]
+
+    fylter = data_frame[metadata['animal']].isin(animals) & data_frame['Zone'].isin(zones)
+    expected = data_frame[fylter][['{}-{}'.format(day, prop) for day in metadata['days']]].to_numpy(dtype=np.float64)
+
+    np.testing.assert_array_equal(cube.sample(prop, animals, zones), expected)
+
+
+def test_select(data):
+
+    data_frame, metadata, cube = data
+
+    day = metadata['days'][-1]
+    prop = metadata['properties'][0]
+    animal = cube.animals[-1]
+
+    values = cube.select(animals=[animal], days=[day], properties=[prop])
+
+    expected = data_frame[data_frame[metadata['animal']] == animal]['{}-{}'.format(day, prop)].to_numpy(dtype=np.float64)
+
+    assert values.shape == (1, metadata['n_zones'], 1, 1)
+    np.testing.assert_array_equal(values.ravel(), expected)
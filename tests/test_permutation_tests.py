@@ -0,0 +1,120 @@
+import itertools
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.statistics.group_statistics import get_permutation_tests, get_student_tests_zones
+
+
+def build_group_index(group_sizes, n_days=6, zones='ABCDE', seed=0):
+    """Build a group index over random data.
+
+    Args:
+        group_sizes (list of int): the number of animals of each group
+        n_days (int): the number of days
+        zones (str): the zones
+        seed (int): the seed of the random generator
+
+    Returns:
+        mousetracker.kernel.data.group_index.GroupIndex: the group index
+    """
+
+    rng = np.random.default_rng(seed)
+
+    n_animals = sum(group_sizes)
+
+    values = rng.normal(20.0, 3.0, size=(n_animals, len(zones), n_days, 1))
+    # Shift the first group such as some of the differences are significant
+    values[:group_sizes[0]] += 4.0
+
+    animals = ['{}'.format(i) for i in range(n_animals)]
+    days = ['J{}'.format(i) for i in range(n_days)]
+
+    cube = MonitoringCube(values, animals, list(zones), days, ['Temp'], 'Souris')
+
+    bounds = np.cumsum([0] + list(group_sizes))
+    groups = [('g{}'.format(i), animals[bounds[i]:bounds[i+1]], True) for i in range(len(group_sizes))]
+
+    return GroupIndex(cube, groups)
+
+
+def assert_permutation_tests_equal(permutation_tests, expected):
+
+    assert list(permutation_tests) == list(expected)
+    for name, p_values_per_day in expected.items():
+        assert list(permutation_tests[name]) == list(p_values_per_day)
+        for day, p_values in p_values_per_day.items():
+            pd.testing.assert_frame_equal(permutation_tests[name][day], p_values, check_exact=True)
+
+
+@pytest.fixture
+def group_index():
+
+    return build_group_index([5, 8, 6, 7])
+
+
+def test_reproducible(group_index):
+    """The p values only depend on the seed."""
+
+    zones = get_student_tests_zones('Souris')
+
+    permutation_tests = get_permutation_tests(group_index, 'Temp', zones, n_permutations=2000, seed=3)
+
+    assert_permutation_tests_equal(get_permutation_tests(group_index, 'Temp', zones, n_permutations=2000, seed=3), permutation_tests)
+
+    other_permutation_tests = get_permutation_tests(group_index, 'Temp', zones, n_permutations=2000, seed=4)
+    assert not np.array_equal(other_permutation_tests['E vs E']['J0'].to_numpy(), permutation_tests['E vs E']['J0'].to_numpy())
+
+
+@pytest.mark.parametrize('memory_budget', [1, 4096, 256*1024])
+def test_memory_budget(group_index, memory_budget):
+    """The p values do not depend on the size of the chunks of shuffles."""
+
+    zones = [('A', 'B'), ('E',)]
+
+    expected = get_permutation_tests(group_index, 'Temp', zones, n_permutations=500)
+
+    permutation_tests = get_permutation_tests(group_index, 'Temp', zones, n_permutations=500, memory_budget=memory_budget)
+
+    assert_permutation_tests_equal(permutation_tests, expected)
+
+
+def test_days(group_index):
+    """The p values of a day do not depend on the other days requested."""
+
+    zones = [('C', 'D')]
+
+    expected = get_permutation_tests(group_index, 'Temp', zones, n_permutations=1000)
+
+    permutation_tests = get_permutation_tests(group_index, 'Temp', zones, n_permutations=1000, days=['J2', 'J4'])
+
+    for day in ['J2', 'J4']:
+        pd.testing.assert_frame_equal(permutation_tests['CD vs CD'][day], expected['CD vs CD'][day], check_exact=True)
+
+
+def test_exact_enumeration():
+    """The p value of two groups is close to the one of the enumeration of all the label splits."""
+
+    group_index = build_group_index([3, 5], n_days=3, zones='E', seed=1)
+
+    permutation_tests = get_permutation_tests(group_index, 'Temp', [('E',)], n_permutations=20000)
+
+    values = group_index.cube.sample('Temp', group_index.cube.animals, ['E'])
+    n_first = 3
+
+    for iday, day in enumerate(group_index.cube.days):
+        observed = abs(values[:n_first, iday].mean() - values[n_first:, iday].mean())
+        n_extremes = 0
+        n_splits = 0
+        for first in itertools.combinations(range(len(values)), n_first):
+            mask = np.zeros(len(values), dtype=bool)
+            mask[list(first)] = True
+            n_extremes += abs(values[mask, iday].mean() - values[~mask, iday].mean()) >= observed - 1.0e-9
+            n_splits += 1
+
+        assert permutation_tests['E vs E'][day].loc['g0', 'g1'] == pytest.approx(n_extremes/n_splits, abs=0.01)
@@ -0,0 +1,44 @@
+from mousetracker.kernel.statistics.statistics_cache import StatisticsCache
+
+
+def test_get_put():
+
+    cache = StatisticsCache()
+
+    assert cache.get(('file', 'statistics', 'Poids', 0)) is None
+
+    cache.put(('file', 'statistics', 'Poids', 0), 'statistics')
+
+    assert cache.get(('file', 'statistics', 'Poids', 0)) == 'statistics'
+
+    # The entries of another version of the groups are not returned
+    assert cache.get(('file', 'statistics', 'Poids', 1)) is None
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.hit_rate == 1/3
+
+
+def test_least_recently_used_eviction():
+
+    cache = StatisticsCache(max_size=2)
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+
+    # Using a makes b the least recently used entry
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_clear():
+
+    cache = StatisticsCache()
+
+    cache.put('a', 1)
+    cache.clear()
+
+    assert cache.get('a') is None
@@ -0,0 +1,144 @@
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+import scipy.stats
+
+from mousetracker.kernel.data.group_index import GroupIndex
+from mousetracker.kernel.data.monitoring_cube import MonitoringCube
+from mousetracker.kernel.readers.excel_reader import read_excel_file
+from mousetracker.kernel.statistics.group_statistics import _holm, get_student_tests, get_student_tests_zones
+
+
+@pytest.fixture
+def data(complete_excel_file):
+    """The data frame, the metadata, the cube and four groups of a workbook, the last one being unselected."""
+
+    data_frame, metadata = read_excel_file(complete_excel_file)
+
+    cube = MonitoringCube.from_data_frame(data_frame, metadata)
+
+    groups = [('g{}'.format(i), cube.animals[i::4], i < 3) for i in range(4)]
+
+    return data_frame, metadata, cube, groups
+
+
+def expected_student_tests(data_frame, metadata, groups, zone, day, prop):
+    """Compute the student tests of a day with scikit_posthocs, the way the student tests used to be computed.
+
+    Returns:
+        pandas.DataFrame: the p values matrix
+    """
+
+    sk = pytest.importorskip('scikit_posthocs')
+
+    group_names = []
+    values = []
+    for group_name, animals, selected in groups:
+        if not selected:
+            continue
+        fylter = data_frame[metadata['animal']].isin(animals) & data_frame['Zone'].isin(zone)
+        group_values = data_frame[fylter]['{}-{}'.format(day, prop)].to_numpy(dtype=np.float64)
+        group_names.extend([group_name]*len(group_values))
+        values.extend(group_values)
+
+    value_per_group = pd.DataFrame({'groups': np.array(group_names, dtype=object), 'values': values})
+
+    return sk.posthoc_ttest(value_per_group, val_col='values', group_col='groups', p_adjust='holm')
+
+
+def test_get_student_tests(data):
+    """The p values of each zone and day are the ones computed by scikit_posthocs."""
+
+    data_frame, metadata, cube, groups = data
+
+    zones = get_student_tests_zones(metadata['animal'])
+
+    for prop in metadata['properties']:
+        student_tests = get_student_tests(GroupIndex(cube, groups), prop, zones)
+
+        for zone in zones:
+            name = '{} vs {}'.format(''.join(zone), ''.join(zone))
+            assert list(student_tests[name]) == metadata['days']
+            for day in metadata['days']:
+                expected = expected_student_tests(data_frame, metadata, groups, zone, day, prop)
+                pd.testing.assert_frame_equal(student_tests[name][day], expected, check_names=False, rtol=1e-7)
+
+
+def test_parallel_student_tests(data):
+    """The p values computed by a pool of processes are the ones computed sequentially."""
+
+    _, metadata, cube, groups = data
+
+    zones = get_student_tests_zones(metadata['animal'])
+    prop = metadata['properties'][1]
+
+    expected = get_student_tests(GroupIndex(cube, groups), prop, zones)
+    student_tests = get_student_tests(GroupIndex(cube, groups), prop, zones, parallel=True, n_workers=2)
+
+    for name, p_values_per_day in expected.items():
+        for day, p_values in p_values_per_day.items():
+            pd.testing.assert_frame_equal(student_tests[name][day], p_values)
+
+
+def test_missing_values(multi_sheets_excel_file):
+    """A day with missing values is given a matrix of NaN."""
+
+    data_frame, metadata = read_excel_file(multi_sheets_excel_file)
+
+    cube = MonitoringCube.from_data_frame(data_frame, metadata)
+
+    groups = [('g0', cube.animals[::2], True), ('g1', cube.animals[1::2], True)]
+
+    zone = ('A', 'B', 'C', 'D')
+    prop = metadata['properties'][1]
+
+    student_tests = get_student_tests(GroupIndex(cube, groups), prop, [zone])
+
+    for day, p_values in student_tests['ABCD vs ABCD'].items():
+        values = data_frame[data_frame['Zone'].isin(zone)]['{}-{}'.format(day, prop)]
+        assert p_values.isnull().all().all() == values.isnull().any()
+
+
+def test_holm():
+    """The NaN p values stay NaN and do not take part to the adjustment of the other p values."""
+
+    p_values = np.array([[0.01, np.nan, 0.04, 0.03],
+                         [0.01, 0.02, 0.04, 0.03],
+                         [np.nan, np.nan, 0.5, np.nan]])
+
+    expected = np.array([[0.03, np.nan, 0.06, 0.06],
+                         [0.04, 0.06, 0.06, 0.06],
+                         [np.nan, np.nan, 0.5, np.nan]])
+
+    np.testing.assert_allclose(_holm(p_values), expected, rtol=1e-12)
+
+
+def test_untestable_pair():
+    """The pair of groups of a single value each can not be tested and the other pairs are adjusted without it."""
+
+    rng = np.random.default_rng(0)
+
+    values = rng.normal(20.0, 1.0, size=(6, 1, 2, 1))
+    # Shift the third group such as the p values of its pairs are not clipped to 1 by the adjustment
+    values[2:] += 6.0
+
+    animals = ['{}'.format(i) for i in range(6)]
+
+    cube = MonitoringCube(values, animals, ['E'], ['J0', 'J1'], ['Temp'], 'Souris')
+
+    groups = [('g0', animals[:1], True), ('g1', animals[1:2], True), ('g2', animals[2:], True)]
+
+    student_tests = get_student_tests(GroupIndex(cube, groups), 'Temp', [('E',)])
+
+    for iday, day in enumerate(cube.days):
+        p_values = student_tests['E vs E'][day]
+
+        assert np.isnan(p_values.loc['g0', 'g1'])
+
+        raw_p_values = [scipy.stats.ttest_ind(values[i:i+1, 0, iday, 0], values[2:, 0, iday, 0]).pvalue for i in range(2)]
+        expected = np.minimum(np.maximum.accumulate(np.sort(raw_p_values)*[2, 1]), 1.0)[np.argsort(np.argsort(raw_p_values))]
+
+        np.testing.assert_allclose([p_values.loc['g0', 'g2'], p_values.loc['g1', 'g2']], expected, rtol=1e-7)
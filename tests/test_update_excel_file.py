@@ -0,0 +1,109 @@
+import random
+import shutil
+
+import openpyxl
+
+import pandas as pd
+
+import pytest
+
+from conftest import PROPERTIES
+
+from mousetracker.kernel.readers.excel_reader import read_excel_file, update_excel_file
+
+
+@pytest.fixture
+def excel_file(tmp_path, multi_sheets_excel_file):
+    """A copy of a workbook with three group sheets which can be edited by a test."""
+
+    filename = str(tmp_path / 'edited.xlsx')
+    shutil.copy(multi_sheets_excel_file, filename)
+
+    return filename
+
+
+def append_day(sheet, day, rng):
+    """Append the columns of a day to a group sheet with the layout of the mousetracker files.
+
+    Args:
+        sheet (openpyxl.worksheet.worksheet.Worksheet): the group sheet
+        day (str): the day
+        rng (random.Random): the generator of the values
+    """
+
+    first_column = sheet.max_column + 1
+    sheet.cell(row=1, column=first_column, value=day)
+    for j, prop in enumerate(PROPERTIES):
+        sheet.cell(row=2, column=first_column + j, value=prop)
+
+    for row in range(3, sheet.max_row + 1):
+        first_zone = sheet.cell(row=row, column=1).value is not None
+        for j, prop in enumerate(PROPERTIES):
+            if prop == 'Poids':
+                value = rng.uniform(20, 30) if first_zone else None
+            else:
+                value = rng.uniform(0, 10)
+            sheet.cell(row=row, column=first_column + j, value=value)
+
+
+def update_and_read(excel_file, edit):
+    """Edit a workbook and return the data updated by update_excel_file and the data read from scratch.
+
+    Returns:
+        tuple: the updated data frame, its metadata, the changed days, the data frame and the metadata read again
+    """
+
+    data_frame, metadata = read_excel_file(excel_file)
+
+    workbook = openpyxl.load_workbook(excel_file)
+    edit(workbook)
+    workbook.save(excel_file)
+
+    updated_data_frame, updated_metadata, changed_days = update_excel_file(excel_file, data_frame, metadata)
+
+    expected_data_frame, expected_metadata = read_excel_file(excel_file)
+
+    return updated_data_frame, updated_metadata, changed_days, expected_data_frame, expected_metadata
+
+
+def test_single_cell_edit(excel_file):
+    """Only the edited sheet and day are patched and the data is the one read from scratch."""
+
+    def edit(workbook):
+        workbook['Groupe 2'].cell(row=5, column=11, value=123.0)
+
+    data_frame, metadata, changed_days, expected_data_frame, expected_metadata = update_and_read(excel_file, edit)
+
+    assert changed_days == {'Groupe 2': ['J1']}
+    pd.testing.assert_frame_equal(data_frame, expected_data_frame)
+    assert metadata == expected_metadata
+
+
+def test_day_appended_to_all_sheets(excel_file):
+    """The day appended to every group sheet is patched for all the sheets and not only for the first one."""
+
+    rng = random.Random(0)
+
+    def edit(workbook):
+        for sheet in workbook.sheetnames[1:]:
+            append_day(workbook[sheet], 'J3', rng)
+
+    data_frame, metadata, changed_days, expected_data_frame, expected_metadata = update_and_read(excel_file, edit)
+
+    assert changed_days == {'Groupe {}'.format(s + 1): ['J3'] for s in range(3)}
+    assert data_frame['J3-Temp'].notnull().all()
+    pd.testing.assert_frame_equal(data_frame, expected_data_frame)
+    assert metadata == expected_metadata
+
+
+def test_structural_change(excel_file):
+    """An animal removed from a sheet makes the whole file be read again."""
+
+    def edit(workbook):
+        workbook['Groupe 3'].delete_rows(3, 5)
+
+    data_frame, metadata, changed_days, expected_data_frame, expected_metadata = update_and_read(excel_file, edit)
+
+    assert changed_days is None
+    pd.testing.assert_frame_equal(data_frame, expected_data_frame)
+    assert metadata == expected_metadata
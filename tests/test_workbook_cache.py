@@ -0,0 +1,137 @@
+import os
+import shutil
+
+import openpyxl
+
+import pandas as pd
+
+import pytest
+
+from mousetracker.kernel.readers import workbook_cache as workbook_cache_module
+from mousetracker.kernel.readers.excel_reader import read_excel_file
+from mousetracker.kernel.readers.workbook_cache import WorkbookCache, default_cache_directory
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """An empty cache in a temporary directory."""
+
+    return WorkbookCache(directory=str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def excel_file(tmp_path, mice_excel_file):
+    """A copy of a workbook which can be edited by a test."""
+
+    filename = str(tmp_path / 'mice.xlsx')
+    shutil.copy(mice_excel_file, filename)
+
+    return filename
+
+
+def n_entries(cache):
+
+    return len([filename for filename in os.listdir(cache.directory) if filename.endswith('.feather')])
+
+
+def test_default_directory(monkeypatch, tmp_path):
+
+    monkeypatch.setenv('MOUSETRACKER_CACHE_DIR', str(tmp_path))
+
+    assert default_cache_directory() == str(tmp_path)
+    assert WorkbookCache().directory == str(tmp_path)
+
+
+def test_hit_and_miss(cache, excel_file):
+    """A file is read from the cache once it has been read and the data is the one read from the file."""
+
+    data_frame, metadata = cache.read_excel_file(excel_file)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    cached_data_frame, cached_metadata = cache.read_excel_file(excel_file)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    pd.testing.assert_frame_equal(cached_data_frame, data_frame)
+    assert cached_metadata == dict(metadata)
+
+    expected_data_frame, _ = read_excel_file(excel_file)
+    pd.testing.assert_frame_equal(cached_data_frame, expected_data_frame)
+
+
+def test_key(cache, excel_file, monkeypatch):
+    """The key of a file depends on its contents and on the version of the parser but not on its name."""
+
+    key = cache.key(excel_file)
+
+    copy = excel_file.replace('mice', 'copy')
+    shutil.copy(excel_file, copy)
+    assert cache.key(copy) == key
+
+    monkeypatch.setattr(workbook_cache_module, 'PARSER_VERSION', workbook_cache_module.PARSER_VERSION + 1)
+    assert cache.key(excel_file) != key
+    monkeypatch.undo()
+
+    workbook = openpyxl.load_workbook(excel_file)
+    workbook['Groupe 1'].cell(row=3, column=5, value=123.0)
+    workbook.save(excel_file)
+    assert cache.key(excel_file) != key
+
+
+def test_modified_file_not_served(cache, excel_file):
+    """A file modified after it has been cached is read again."""
+
+    cache.read_excel_file(excel_file)
+
+    workbook = openpyxl.load_workbook(excel_file)
+    workbook['Groupe 1'].cell(row=3, column=5, value=123.0)
+    workbook.save(excel_file)
+
+    assert cache.load(excel_file) is None
+
+    data_frame, _ = cache.read_excel_file(excel_file)
+    expected_data_frame, _ = read_excel_file(excel_file)
+    pd.testing.assert_frame_equal(data_frame, expected_data_frame)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_eviction(tmp_path, mice_excel_file, rabbits_excel_file, multi_sheets_excel_file):
+    """The least recently used entries are evicted when the size of the cache exceeds its limit."""
+
+    cache = WorkbookCache(directory=str(tmp_path / 'cache'))
+
+    excel_files = [mice_excel_file, rabbits_excel_file, multi_sheets_excel_file]
+    for excel_file in excel_files:
+        cache.read_excel_file(excel_file)
+
+    sizes = {}
+    for i, excel_file in enumerate(excel_files):
+        data_file, metadata_file = cache._entry(cache.key(excel_file))
+        sizes[excel_file] = os.path.getsize(data_file) + os.path.getsize(metadata_file)
+        # Make the mice entry the most recently used and the rabbits entry the least recently used one
+        os.utime(data_file, (1000, [3000, 1000, 2000][i]))
+
+    # A cache which can only hold the two most recently used entries
+    cache = WorkbookCache(directory=cache.directory, max_size=sizes[mice_excel_file] + sizes[multi_sheets_excel_file])
+    cache._evict()
+
+    assert cache.load(rabbits_excel_file) is None
+    assert cache.load(mice_excel_file) is not None
+    assert cache.load(multi_sheets_excel_file) is not None
+    assert n_entries(cache) == 2
+
+
+def test_invalidate_and_clear(cache, mice_excel_file, rabbits_excel_file):
+
+    cache.read_excel_file(mice_excel_file)
+    cache.read_excel_file(rabbits_excel_file)
+    assert n_entries(cache) == 2
+
+    cache.invalidate(mice_excel_file)
+    assert cache.load(mice_excel_file) is None
+    assert cache.load(rabbits_excel_file) is not None
+
+    cache.clear()
+    assert n_entries(cache) == 0
+    assert os.listdir(cache.directory) == []